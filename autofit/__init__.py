@@ -46,7 +46,9 @@ from .non_linear.abstract_search import Result
 from autofit.non_linear.grid.grid_search import GridSearch as SearchGridSearch
 # from autofit.non_linear.grid.sensitivity import Sensitivity
 from autofit.non_linear.grid.grid_search import GridSearchResult
+from .non_linear.parallel import FileJobQueue
 from .non_linear.initializer import InitializerBall
+from .non_linear.initializer import InitializerFromSamples
 from .non_linear.initializer import InitializerPrior
 from .non_linear.mcmc.emcee import Emcee
 from .mock.mock_search import MockResult
@@ -54,6 +56,8 @@ from .mock.mock_search import MockSearch
 from .non_linear.nest.dynesty import DynestyDynamic
 from .non_linear.nest.dynesty import DynestyStatic
 from .non_linear.nest.multi_nest import MultiNest
+from .non_linear.optimize.cmaes import CMAES
+from .non_linear.optimize.multi_start import MultiStartOptimizer
 from .non_linear.optimize.pyswarms import PySwarmsGlobal
 from .non_linear.optimize.pyswarms import PySwarmsLocal
 from .non_linear.paths import Paths
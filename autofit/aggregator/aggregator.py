@@ -13,8 +13,9 @@ Example:
 """
 
 import os
-from os import path
+import posixpath
 import zipfile
+from os import path
 from collections import defaultdict
 from shutil import rmtree
 from typing import List, Union, Iterator, Tuple
@@ -23,6 +24,50 @@ from .phase_output import PhaseOutput
 from .predicate import AttributePredicate
 
 
+def phases_in_archive(zip_path: str, completed_only=False) -> List[PhaseOutput]:
+    """
+    A phase output for every metadata file in a .zip archive, which are read from the archive without extracting it.
+
+    Only the directory of the archive is read, except for the metadata files of the phases found.
+
+    Parameters
+    ----------
+    zip_path
+        The path of the archive
+    completed_only
+        If `True` only phases with a .completed file are included.
+    """
+    try:
+        with zipfile.ZipFile(zip_path, "r") as f:
+            names = set(f.namelist())
+    except (zipfile.BadZipFile, OSError):
+        return []
+
+    phases = []
+
+    for name in sorted(names):
+
+        folder, filename = posixpath.split(name)
+
+        if filename != "metadata" or "__MACOSX" in folder.split("/"):
+            continue
+
+        prefix = f"{folder}/" if folder else ""
+
+        if completed_only and f"{prefix}.completed" not in names and f"/{prefix}.completed" not in names:
+            continue
+
+        phases.append(
+            PhaseOutput(
+                path.join(zip_path[:-4], *folder.lstrip("/").split("/")) if folder.strip("/") else zip_path[:-4],
+                zip_path=zip_path,
+                prefix=prefix.lstrip("/")
+            )
+        )
+
+    return phases
+
+
 class AggregatorGroup:
     def __init__(self, groups: ["AbstractAggregator"]):
         """
@@ -93,18 +138,24 @@ class AbstractAggregator:
         """
         self.phases = phases
 
-    def remove_unzipped(self):
+    def extract(self):
         """
-        Removes the unzipped output directory for each phase.
+        Extract the archive of every zipped phase, after which their output is read from their directories.
         """
         for phase in self.phases:
+            phase.extract()
 
-            split_path = path.split(phase.directory)[0]
+    def remove_unzipped(self):
+        """
+        Removes the output directory extracted from the archive of each zipped phase.
+        """
+        for phase in self.phases:
 
-            unzipped_path = path.join(split_path)
+            if phase.archive_path is None or phase.is_zipped:
+                continue
 
             rmtree(
-                unzipped_path,
+                phase.archive_path[:-4],
                 ignore_errors=True
             )
 
@@ -283,13 +334,15 @@ class Aggregator(AbstractAggregator):
     def __init__(
             self,
             directory: str,
-            completed_only=False
+            completed_only=False,
+            extract=False
     ):
         """
         Class to aggregate phase results for all subdirectories in a given directory.
 
-        The whole directory structure is traversed and a Phase object created for each directory that contains a
-        metadata file.
+        The whole directory structure is traversed once and a Phase object created for each directory that contains a
+        metadata file, and for each metadata file in a .zip archive. The output of a zipped phase is read from inside
+        its archive when it is used, so archives are not extracted unless *extract* is `True`.
 
         Parameters
         ----------
@@ -298,6 +351,9 @@ class Aggregator(AbstractAggregator):
         completed_only
             If `True` only phases with a .completed file (indicating the phase was completed)
             are included in the aggregator.
+        extract
+            If `True` the archive of every zipped phase is extracted, after which its output is
+            read from its directory.
         """
 
         # TODO : Progress bar here
@@ -305,21 +361,30 @@ class Aggregator(AbstractAggregator):
         print("Aggregator loading phases... could take some time.")
 
         self._directory = directory
-        phases = []
+        phases = {}
 
         for root, _, filenames in os.walk(directory):
-            for filename in filenames:
-                if filename.endswith(".zip"):
-                    with zipfile.ZipFile(path.join(root, filename), "r") as f:
-                        f.extractall(path.join(root, filename[:-4]))
 
-        for root, _, filenames in os.walk(directory):
             if "metadata" in filenames:
                 if not completed_only or ".completed" in filenames:
-                    phases.append(PhaseOutput(root))
+                    phases[path.normpath(root)] = PhaseOutput(root)
+
+            for filename in filenames:
+                if filename.endswith(".zip"):
+                    for phase in phases_in_archive(
+                            path.join(root, filename),
+                            completed_only=completed_only
+                    ):
+                        phases.setdefault(path.normpath(phase.directory), phase)
+
+        phases = [phases[key] for key in sorted(phases)]
+
+        super().__init__(phases)
+
+        if extract:
+            self.extract()
 
         if len(phases) == 0:
             print(f"\nNo phases found in {directory}\n")
         else:
             print(f"\n A total of {str(len(phases))} phases and results were found.")
-        super().__init__(phases)
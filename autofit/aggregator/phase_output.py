@@ -1,6 +1,9 @@
+import io
 import os
-from os import path
 import pickle
+import zipfile
+from contextlib import contextmanager
+from os import path
 
 import dill
 
@@ -12,20 +15,30 @@ class PhaseOutput:
     @DynamicAttrs
     """
 
-    def __init__(self, directory: str):
+    def __init__(self, directory: str, zip_path: str = None, prefix: str = ""):
         """
         Represents the output of a single phase. Comprises a metadata file and other dataset files.
 
+        The output of a phase which has been zipped is read from inside the .zip archive, where every file is read
+        from its member of the archive when it is used, so the archive is never extracted unless `extract` is called.
+
         Parameters
         ----------
         directory
-            The directory of the phase
+            The directory of the phase, which for a zipped phase is the directory it is extracted to
+        zip_path
+            The .zip archive the output of the phase is in, if it is zipped
+        prefix
+            The folder of the output of the phase in the archive, e.g. "phase/"
         """
         self.directory = directory
+        self.zip_path = zip_path
+        self.archive_path = zip_path
+        self.prefix = prefix
         self.__search = None
         self.__model = None
         self.file_path = os.path.join(directory, "metadata")
-        with open(self.file_path) as f:
+        with self.open("metadata") as f:
             self.text = f.read()
             pairs = [
                 line.split("=")
@@ -39,12 +52,59 @@ class PhaseOutput:
     def pickle_path(self):
         return path.join(self.directory, "pickles")
 
+    @property
+    def is_zipped(self) -> bool:
+        return self.zip_path is not None
+
+    def member_for(self, archive: zipfile.ZipFile, *names) -> str:
+        """
+        The name of the member of the archive of a file of the phase output, where archives written by `Paths.zip`
+        name the members in folders of the output with a leading slash.
+        """
+        name = self.prefix + "/".join(names)
+
+        for member in (name, f"/{name}"):
+            try:
+                archive.getinfo(member)
+                return member
+            except KeyError:
+                pass
+
+        raise FileNotFoundError(f"{name} is not in the archive {self.zip_path}")
+
+    @contextmanager
+    def open(self, *names, mode="r"):
+        """
+        Open a file of the phase output by its path relative to the output folder, e.g. open("pickles",
+        "model.pickle", mode="rb"), reading it from the archive if the phase is zipped.
+        """
+        if not self.is_zipped:
+            with open(path.join(self.directory, *names), mode) as f:
+                yield f
+            return
+
+        with zipfile.ZipFile(self.zip_path, "r") as archive:
+            with archive.open(self.member_for(archive, *names)) as f:
+                yield f if "b" in mode else io.TextIOWrapper(f)
+
+    def extract(self):
+        """
+        Extract the archive of a zipped phase, after which its output is read from its directory.
+        """
+        if not self.is_zipped:
+            return
+
+        with zipfile.ZipFile(self.zip_path, "r") as f:
+            f.extractall(self.zip_path[:-4])
+
+        self.zip_path = None
+
     @property
     def model_results(self) -> str:
         """
         Reads the model.results file
         """
-        with open(os.path.join(self.directory, "model.results")) as f:
+        with self.open("model.results") as f:
             return f.read()
 
     @property
@@ -52,9 +112,7 @@ class PhaseOutput:
         """
         A pickled mask object
         """
-        with open(
-                os.path.join(self.pickle_path, "mask.pickle"), "rb"
-        ) as f:
+        with self.open("pickles", "mask.pickle", mode="rb") as f:
             return dill.load(f)
 
     def __getattr__(self, item):
@@ -63,10 +121,11 @@ class PhaseOutput:
 
         dataset.pickle, meta_dataset.pickle etc.
         """
+        if item.startswith("__") or item in ("zip_path", "archive_path", "prefix", "directory"):
+            raise AttributeError(item)
+
         try:
-            with open(
-                    os.path.join(self.pickle_path, f"{item}.pickle"), "rb"
-            ) as f:
+            with self.open("pickles", f"{item}.pickle", mode="rb") as f:
                 return pickle.load(f)
         except FileNotFoundError:
             pass
@@ -88,7 +147,7 @@ class PhaseOutput:
         """
         if self.__search is None:
             try:
-                with open(os.path.join(self.pickle_path, "search.pickle"), "r+b") as f:
+                with self.open("pickles", "search.pickle", mode="rb") as f:
                     self.__search = pickle.loads(f.read())
             except FileNotFoundError:
                 pass
@@ -100,7 +159,7 @@ class PhaseOutput:
         The model that was used in this phase
         """
         if self.__model is None:
-            with open(os.path.join(self.pickle_path, "model.pickle"), "r+b") as f:
+            with self.open("pickles", "model.pickle", mode="rb") as f:
                 self.__model = pickle.loads(f.read())
         return self.__model
 
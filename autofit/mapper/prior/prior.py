@@ -6,7 +6,7 @@ from typing import Union, Tuple
 
 import numpy as np
 from scipy import stats
-from scipy.special import erfcinv
+from scipy.special import erfc, erfcinv
 
 from autoconf import conf
 from autofit import exc
@@ -212,6 +212,21 @@ class Prior(Variable, ABC, ArithmeticMixin):
         A physical value.
         """
 
+    def unit_value_for(self, value: float) -> float:
+        """
+        Return the unit value between 0 and 1 which this prior maps to a physical value, the inverse of `value_for`.
+
+        Parameters
+        ----------
+        value
+            A physical value.
+
+        Returns
+        -------
+        A hypercube value between 0 and 1.
+        """
+        raise NotImplementedError()
+
     def instance_for_arguments(self, arguments):
         return arguments[self]
 
@@ -319,6 +334,20 @@ class GaussianPrior(Prior):
         """
         return self.mean + (self.sigma * math.sqrt(2) * erfcinv(2.0 * (1.0 - unit)))
 
+    def unit_value_for(self, value):
+        """
+
+        Parameters
+        ----------
+        value: Float
+            A physical value of the attribute
+        Returns
+        -------
+        unit: Float
+            The unit hypercube value between 0 and 1 the gaussian distribution maps to this value
+        """
+        return 1.0 - 0.5 * erfc((value - self.mean) / (self.sigma * math.sqrt(2)))
+
     def log_prior_from_value(self, value):
         """
     Returns the log prior of a physical value, so the log likelihood of a model evaluation can be converted to a
@@ -372,6 +401,20 @@ class UniformPrior(Prior):
         """
         return self.lower_limit + unit * (self.upper_limit - self.lower_limit)
 
+    def unit_value_for(self, value):
+        """
+
+        Parameters
+        ----------
+        value: Float
+            A physical value of the attribute
+        Returns
+        -------
+        unit: Float
+            The unit hypercube value between 0 and 1 which maps to this value
+        """
+        return (value - self.lower_limit) / (self.upper_limit - self.lower_limit)
+
     def log_prior_from_value(self, value):
         """
     Returns the log prior of a physical value, so the log likelihood of a model evaluation can be converted to a
@@ -447,6 +490,22 @@ class LogUniformPrior(UniformPrior):
                 + unit * (np.log10(self.upper_limit) - np.log10(self.lower_limit))
         )
 
+    def unit_value_for(self, value):
+        """
+
+        Parameters
+        ----------
+        value: Float
+            A physical value of the attribute
+        Returns
+        -------
+        unit: Float
+            The unit hypercube value between 0 and 1 which maps to this value
+        """
+        return (np.log10(value) - np.log10(self.lower_limit)) / (
+                np.log10(self.upper_limit) - np.log10(self.lower_limit)
+        )
+
     def log_prior_from_value(self, value):
         """
     Returns the log prior of a physical value, so the log likelihood of a model evaluation can be converted to a
@@ -249,6 +249,78 @@ class AbstractPriorModel(AbstractModel):
             )
         )
 
+    def vectors_from_unit_vectors(self, unit_vectors):
+        """
+        Vectorized version of `vector_from_unit_vector`, which maps a batch of unit hypercube vectors to physical
+        values by passing each column of unit values to its prior at once.
+
+        Parameters
+        ----------
+        unit_vectors: np.ndarray
+            An array of shape (total_vectors, prior_count) of unit hypercube vectors.
+        Returns
+        -------
+        values: np.ndarray
+            An array of shape (total_vectors, prior_count) of values output by priors.
+        """
+        unit_vectors = np.asarray(unit_vectors, dtype="float")
+
+        vectors = np.zeros(shape=unit_vectors.shape)
+
+        for index, prior_tuple in enumerate(self.prior_tuples_ordered_by_id):
+            vectors[:, index] = prior_tuple.prior.value_for(unit_vectors[:, index])
+
+        return vectors
+
+    def unit_vectors_from_vectors(self, vectors):
+        """
+        The inverse of `vectors_from_unit_vectors`, which maps a batch of physical vectors to the unit hypercube vectors
+        the priors map to them.
+
+        Parameters
+        ----------
+        vectors: np.ndarray
+            An array of shape (total_vectors, prior_count) of physical parameter values.
+        Returns
+        -------
+        unit_vectors: np.ndarray
+            An array of shape (total_vectors, prior_count) of unit hypercube vectors.
+        """
+        vectors = np.asarray(vectors, dtype="float")
+
+        unit_vectors = np.zeros(shape=vectors.shape)
+
+        for index, prior_tuple in enumerate(self.prior_tuples_ordered_by_id):
+            unit_vectors[:, index] = prior_tuple.prior.unit_value_for(vectors[:, index])
+
+        return unit_vectors
+
+    def vectors_within_prior_limits(self, vectors):
+        """
+        Returns a boolean mask which is `True` for every vector in a batch whose physical values are all within the
+        limits of their priors, which are the vectors `instance_from_vector` does not raise a `PriorLimitException` for.
+
+        If ignore_prior_limits is true in configuration then every vector is within limits.
+
+        Parameters
+        ----------
+        vectors: np.ndarray
+            An array of shape (total_vectors, prior_count) of physical parameter values.
+        """
+        vectors = np.asarray(vectors, dtype="float")
+
+        mask = np.full(shape=vectors.shape[0], fill_value=True)
+
+        if conf.instance["general"]["model"]["ignore_prior_limits"]:
+            return mask
+
+        for index, prior_tuple in enumerate(self.prior_tuples_ordered_by_id):
+            mask &= (prior_tuple.prior.lower_limit <= vectors[:, index]) & (
+                    vectors[:, index] <= prior_tuple.prior.upper_limit
+            )
+
+        return mask
+
     def random_unit_vector_within_limits(self, lower_limit=0.0, upper_limit=1.0):
         """ Generate a random vector of unit values by drawing uniform random values between 0 and 1.
         Returns
@@ -513,6 +585,29 @@ class AbstractPriorModel(AbstractModel):
             )
         )
 
+    def log_priors_from_vectors(self, vectors):
+        """
+        Vectorized version of `log_priors_from_vector`, which computes the sum of the log priors of every vector in a
+        batch by passing each column of physical values to its prior at once.
+
+        Parameters
+        ----------
+        vectors: np.ndarray
+            An array of shape (total_vectors, prior_count) of physical parameter values.
+        Returns
+        -------
+        log_priors: np.ndarray
+            The sum of the log priors of every vector.
+        """
+        vectors = np.asarray(vectors, dtype="float")
+
+        log_priors = np.zeros(shape=vectors.shape[0])
+
+        for index, prior_tuple in enumerate(self.prior_tuples_ordered_by_id):
+            log_priors += prior_tuple.prior.log_prior_from_value(value=vectors[:, index])
+
+        return log_priors
+
     def random_instance(self):
         """
         Returns a random instance of the model.
@@ -24,6 +24,16 @@ class MockAnalysis(af.Analysis):
         pass
 
 
+class MockPaths:
+    def __init__(self, samples_path, output_path=None, name="search"):
+        """
+        The paths of a search which components of a search (e.g. its budget or profiler) output to.
+        """
+        self.samples_path = samples_path
+        self.output_path = output_path
+        self.name = name
+
+
 class MockResult:
     def __init__(
             self,
@@ -5,8 +5,8 @@ from os import path
 import os
 import pickle
 import shutil
+import time
 from abc import ABC, abstractmethod
-from time import sleep
 from typing import Dict
 
 import numpy as np
@@ -14,16 +14,32 @@ import numpy as np
 from autoconf import conf
 from autofit import exc
 from autofit.mapper import model_mapper as mm
+from autofit.non_linear import best_fit as bf
+from autofit.non_linear.best_fit import BestFit
+from autofit.non_linear.budget import Budget
+from autofit.non_linear.fidelity import FidelityScheduler
 from autofit.non_linear.initializer import Initializer
+from autofit.non_linear.metrics import Metrics
 from autofit.non_linear.log import logger
 from autofit.non_linear.paths import Paths, convert_paths
+from autofit.non_linear import profiling
+from autofit.non_linear.profiling import Profiler
 from autofit.non_linear import samples as samps
+from autofit.non_linear.surrogate import Surrogate
 from autofit.non_linear.timer import Timer
+from autofit.non_linear import tracing
+from autofit.non_linear.tracing import Tracer
+from autofit.non_linear.update import BackgroundUpdate, UpdateScheduler
 from autofit.text import formatter
 from autofit.text import text_util
 
 
 class NonLinearSearch(ABC):
+
+    # The pool made by `make_pool` for the current run, which is closed when the run finishes.
+
+    _pool = None
+
     @convert_paths
     def __init__(
             self,
@@ -93,6 +109,54 @@ class NonLinearSearch(ABC):
             "updates", "remove_state_files_at_end",
         )
 
+        self.background_updates = conf.instance["general"]["updates"]["background"]
+        self.background_update = BackgroundUpdate()
+
+        self.update_scheduler = UpdateScheduler(
+            time_fraction=conf.instance["general"]["updates"]["time_fraction"]
+        )
+
+        self.budget = Budget(
+            max_time=conf.instance["general"]["budget"]["max_time"],
+            max_evaluations=conf.instance["general"]["budget"]["max_evaluations"],
+        )
+
+        self.fidelity = FidelityScheduler(
+            switch_evaluations=conf.instance["general"]["fidelity"]["switch_evaluations"],
+            switch_dlogz=conf.instance["general"]["fidelity"]["switch_dlogz"],
+            stall_tolerance=conf.instance["general"]["fidelity"]["stall_tolerance"],
+        )
+
+        self.surrogate = Surrogate(
+            enabled=conf.instance["general"]["surrogate"]["enabled"],
+            min_samples=conf.instance["general"]["surrogate"]["min_samples"],
+            max_samples=conf.instance["general"]["surrogate"]["max_samples"],
+            neighbours=conf.instance["general"]["surrogate"]["neighbours"],
+            sigma=conf.instance["general"]["surrogate"]["sigma"],
+            log_likelihood_offset=conf.instance["general"]["surrogate"]["log_likelihood_offset"],
+            calibration_interval=conf.instance["general"]["surrogate"]["calibration_interval"],
+            error_tolerance=conf.instance["general"]["surrogate"]["error_tolerance"],
+        )
+
+        self.profiler = Profiler(
+            enabled=conf.instance["general"]["profiling"]["enabled"],
+            output_interval=conf.instance["general"]["profiling"]["output_interval"],
+        )
+
+        self.tracer = Tracer(
+            enabled=conf.instance["general"]["tracing"]["enabled"],
+            buffer_size=conf.instance["general"]["tracing"]["buffer_size"],
+            max_events=conf.instance["general"]["tracing"]["max_events"],
+        )
+
+        self.metrics = Metrics(
+            enabled=conf.instance["general"]["metrics"]["enabled"],
+            interval=conf.instance["general"]["metrics"]["interval"],
+            format=conf.instance["general"]["metrics"]["format"],
+        )
+
+        self.best_fit = BestFit()
+
         self.iterations = 0
         self.should_log = IntervalCounter(self.log_every_update)
         self.should_visualize = IntervalCounter(self.visualize_every_update)
@@ -119,7 +183,19 @@ class NonLinearSearch(ABC):
         return search_instance
 
     class Fitness:
-        def __init__(self, paths, model, analysis, samples_from_model, log_likelihood_cap=None, pool_ids=None):
+        def __init__(
+                self,
+                paths,
+                model,
+                analysis,
+                samples_from_model,
+                log_likelihood_cap=None,
+                best_fit=None,
+                surrogate=None,
+                profiler=None,
+                tracer=None,
+                metrics=None,
+        ):
 
             self.paths = paths
             self.max_log_likelihood = -np.inf
@@ -129,34 +205,129 @@ class NonLinearSearch(ABC):
             self.samples_from_model = samples_from_model
 
             self.log_likelihood_cap = log_likelihood_cap
-            self.pool_ids = pool_ids
+            self.best_fit = best_fit
+            self.surrogate = surrogate
+            self.profiler = profiler
+            self.tracer = tracer
+            self.metrics = metrics
 
         def fit_instance(self, instance):
 
-            log_likelihood = self.analysis.log_likelihood_function(instance=instance)
+            start = time.perf_counter()
+
+            with profiling.section("log_likelihood_function"):
+                log_likelihood = self.analysis.log_likelihood_function(instance=instance)
+
+            if self.metrics is not None:
+                self.metrics.add_evaluation(log_likelihood=log_likelihood, elapsed=time.perf_counter() - start)
 
             if self.log_likelihood_cap is not None:
                 if log_likelihood > self.log_likelihood_cap:
                     log_likelihood = self.log_likelihood_cap
 
             if log_likelihood > self.max_log_likelihood:
-
-                if self.pool_ids is not None:
-                    if mp.current_process().pid != min(self.pool_ids):
-                        return log_likelihood
-
                 self.max_log_likelihood = log_likelihood
 
             return log_likelihood
 
         def log_likelihood_from_parameters(self, parameters):
-            instance = self.model.instance_from_vector(vector=parameters)
+
+            with profiling.section("log_likelihood_from_parameters"):
+
+                if self.surrogate is not None and self.surrogate.is_active:
+                    return self.surrogate.log_likelihood_from(
+                        parameters=parameters, log_likelihood_function=self.evaluate_log_likelihood
+                    )
+
+                return self.evaluate_log_likelihood(parameters=parameters)
+
+        def evaluate_log_likelihood(self, parameters):
+
+            with profiling.section("instance_from_vector"):
+                instance = self.model.instance_from_vector(vector=parameters)
+
             log_likelihood = self.fit_instance(instance)
+
+            if self.best_fit is not None:
+                self.best_fit.update(log_likelihood=log_likelihood, parameters=parameters)
+
             return log_likelihood
 
+        def log_likelihoods_from_parameters(self, parameters) -> np.ndarray:
+            """Compute the log likelihoods of a batch of points in this process, where points rejected by a
+            `FitException` have a log likelihood of NaN.
+
+            If the analysis evaluates batches of instances at once (see `Analysis.log_likelihoods_from_instances`) the
+            instances of every point are passed to it in one call. Otherwise, or if the surrogate is active and decides
+            which points to evaluate, every point is evaluated by `log_likelihood_from_parameters`.
+
+            Parameters
+            ----------
+            parameters : np.ndarray
+                An array of shape (total_points, prior_count) of physical parameter values.
+            """
+            log_likelihoods = np.full(len(parameters), np.nan)
+
+            if not self.analysis.has_batch_log_likelihood or (
+                    self.surrogate is not None and self.surrogate.is_active
+            ):
+
+                for index, vector in enumerate(parameters):
+                    try:
+                        log_likelihoods[index] = self.log_likelihood_from_parameters(parameters=list(vector))
+                    except exc.FitException:
+                        pass
+
+                return log_likelihoods
+
+            indexes = []
+            instances = []
+
+            for index, vector in enumerate(parameters):
+                try:
+                    with profiling.section("instance_from_vector"):
+                        instances.append(self.model.instance_from_vector(vector=list(vector)))
+                    indexes.append(index)
+                except exc.FitException:
+                    pass
+
+            if len(instances) == 0:
+                return log_likelihoods
+
+            start = time.perf_counter()
+
+            with profiling.section("log_likelihood_function"):
+                batch = np.asarray(self.analysis.log_likelihoods_from_instances(instances=instances), dtype="float")
+
+            elapsed = (time.perf_counter() - start) / len(instances)
+
+            if self.log_likelihood_cap is not None:
+                batch = np.minimum(batch, self.log_likelihood_cap)
+
+            for index, log_likelihood in zip(indexes, batch):
+
+                if np.isnan(log_likelihood):
+                    continue
+
+                log_likelihoods[index] = log_likelihood
+
+                if log_likelihood > self.max_log_likelihood:
+                    self.max_log_likelihood = log_likelihood
+
+                if self.metrics is not None:
+                    self.metrics.add_evaluation(log_likelihood=log_likelihood, elapsed=elapsed)
+
+                if self.best_fit is not None:
+                    self.best_fit.update(log_likelihood=log_likelihood, parameters=parameters[index])
+
+            return log_likelihoods
+
         def log_posterior_from_parameters(self, parameters):
             log_likelihood = self.log_likelihood_from_parameters(parameters=parameters)
-            log_priors = self.model.log_priors_from_vector(vector=parameters)
+
+            with profiling.section("log_priors"):
+                log_priors = self.model.log_priors_from_vector(vector=parameters)
+
             return log_likelihood + sum(log_priors)
 
         def figure_of_merit_from_parameters(self, parameters):
@@ -169,6 +340,12 @@ class NonLinearSearch(ABC):
             """
             raise NotImplementedError()
 
+        def figure_of_merit_from_log_likelihood(self, parameters, log_likelihood):
+            """Convert an already known log likelihood of a point in parameter space to the figure of merit of this
+            `NonLinearSearch` (see `figure_of_merit_from_parameters`), without evaluating the log likelihood function.
+            """
+            raise NotImplementedError()
+
         @staticmethod
         def prior(cube, model):
 
@@ -219,6 +396,10 @@ class NonLinearSearch(ABC):
             Optional list of strings specifying the path and filename of .pickle files, that are copied to each
             model-fits pickles folder so they are accessible via the Aggregator.
 
+        If a wall-clock time or likelihood evaluation budget is set in the [budget] section of general.ini and it is
+        exhausted, the search checkpoints its state, performs a final update and returns a `Result` with *partial*
+        set to `True`. The search is not marked as completed, so running it again resumes it with a fresh budget.
+
         Returns
         -------
         An object encapsulating how well the model fit the data, the best fit instance
@@ -248,17 +429,38 @@ class NonLinearSearch(ABC):
 
         if not path.exists(self.paths.has_completed_path):
 
+            resumed = path.exists(path.join(self.paths.samples_path, ".start_time"))
+
             # TODO : Better way to handle?
             self.timer.paths = self.paths
             self.timer.start()
-
-            self._fit(model=model, analysis=analysis, log_likelihood_cap=log_likelihood_cap)
-            open(self.paths.has_completed_path, "w+").close()
+            self.update_scheduler.start()
+            self.budget.start(timer=self.timer)
+            self.surrogate.start(paths=self.paths)
+            self.fidelity.start(paths=self.paths, analysis=analysis)
+            self.profiler.start(paths=self.paths)
+            self.tracer.start(paths=self.paths)
+            self.metrics.start(paths=self.paths, number_of_cores=self.number_of_cores)
+            self.best_fit.start(dimensions=model.prior_count, shared=self.number_of_cores > 1)
+
+            with tracing.span(name="search", category="search", name_of_search=self.paths.name, resumed=resumed):
+                try:
+                    self._fit(model=model, analysis=analysis, log_likelihood_cap=log_likelihood_cap)
+                finally:
+                    self.close_pool()
+
+            if not self.budget.stopped:
+                open(self.paths.has_completed_path, "w+").close()
 
             samples = self.perform_update(
                 model=model, analysis=analysis, during_analysis=False
             )
 
+            self.profiler.stop()
+            self.tracer.stop()
+            self.metrics.stop()
+            self.best_fit.stop()
+
             analysis.save_results_for_aggregator(paths=self.paths, samples=samples)
 
         else:
@@ -271,7 +473,7 @@ class NonLinearSearch(ABC):
                 analysis.save_results_for_aggregator(paths=self.paths, samples=samples)
 
         self.paths.zip_remove()
-        return Result(samples=samples, previous_model=model, search=self)
+        return Result(samples=samples, previous_model=model, search=self, partial=self.budget.stopped)
 
     @abstractmethod
     def _fit(self, model, analysis, log_likelihood_cap=None):
@@ -335,6 +537,21 @@ class NonLinearSearch(ABC):
         These task are performed every n updates, set by the relevent *task_every_update* variable, for example
         *visualize_every_update*
 
+        If *background* is `True` in the [updates] section of general.ini, updates during the analysis take a
+        snapshot of the samples and perform the tasks above on a background thread, so that sampling continues
+        whilst they are performed. At most one update is in flight at once and the final update at the end of the
+        search is always performed synchronously, after any update in flight has finished.
+
+        If *time_fraction* is positive in the [updates] section of general.ini, the update time and sampling
+        throughput are measured and *iterations_per_update* is adapted so that this fraction of the wall-clock time is
+        spent performing updates (see `UpdateScheduler`). The update time includes the time the previous background
+        update took on the background thread.
+
+        If *enabled* is `True` in the [profiling] section of general.ini, the timings of every process are summed and
+        output to the files profile.json and profile.summary in the output folder (see `Profiler`). Similarly, if
+        *enabled* is `True` in the [tracing] section, the trace of every process is merged into the file trace.json
+        (see `Tracer`).
+
         Parameters
         ----------
         model : ModelMapper
@@ -350,39 +567,149 @@ class NonLinearSearch(ABC):
         self.iterations += self.iterations_per_update
         logger.info(f"{self.iterations} Iterations: Performing update (Visualization, outputting samples, etc.).")
 
-        self.timer.update()
+        update_start_time = time.time()
+
+        with profiling.section("perform_update"):
+
+            self.background_update.wait()
+
+            self.timer.update()
+
+            if self.background_updates and during_analysis:
+
+                with profiling.section("samples"):
+                    samples = self.samples_snapshot_via_sampler_from_model(model=model)
 
-        samples = self.samples_via_sampler_from_model(model=model)
-        samples.write_table(filename=self.paths.samples_file)
-        samples.info_to_json(filename=self.paths.info_file)
+                self.background_update.submit(
+                    self.output_update,
+                    samples=samples,
+                    analysis=analysis,
+                    during_analysis=during_analysis,
+                )
 
-        self.save_samples(samples=samples)
+            else:
+
+                with profiling.section("samples"):
+                    samples = self.samples_via_sampler_from_model(model=model)
+
+                if not during_analysis and self.fidelity.applied:
+                    samples = self.fidelity.samples_at_full_fidelity(samples=samples)
+
+                self.output_update(samples=samples, analysis=analysis, during_analysis=during_analysis)
+
+            if self.surrogate.enabled:
+                self.surrogate.output_summary(filename=path.join(self.paths.samples_path, "surrogate.json"))
+
+        if self.profiler.enabled:
+            self.profiler.output(
+                output_path=self.paths.output_path,
+                session_time=self.timer.session_time,
+                number_of_cores=self.number_of_cores,
+            )
+
+        if self.tracer.enabled:
+            self.tracer.output(output_path=self.paths.output_path)
+
+        if during_analysis and self.update_scheduler.is_active:
+            self.schedule_next_update(update_start_time=update_start_time)
+
+        return samples
+
+    def schedule_next_update(self, update_start_time):
+        """Adapt *iterations_per_update* using the timings of the update which has just been performed, so that the
+        target fraction of wall-clock time is spent performing updates. The chosen schedule is output to the file
+        update_schedule.json in the samples folder.
+
+        Parameters
+        ----------
+        update_start_time : float
+            The time the update began.
+        """
+        self.iterations_per_update = self.update_scheduler.iterations_for_next_update(
+            iterations=self.iterations_per_update,
+            update_start_time=update_start_time,
+            background_time=self.background_update.background_time,
+        )
+
+        logger.info(f"Next update scheduled after {self.iterations_per_update} iterations.")
+
+        self.update_scheduler.output_to_json(
+            filename=path.join(self.paths.samples_path, "update_schedule.json")
+        )
+
+    def output_update(self, samples, analysis, during_analysis):
+        """Output the results of an update, which is performed on the main thread or by the background update thread.
+
+        This writes the samples .csv, .json and .pickle files, visualizes the maximum log likelihood model and outputs
+        the model.results and search.summary files.
+
+        Parameters
+        ----------
+        samples : af.Samples
+            The samples of the `NonLinearSearch` at the time of the update.
+        analysis : Analysis
+            Contains the data and the log likelihood function which fits an instance of the model to the data, returning
+            the log likelihood the `NonLinearSearch` maximizes.
+        during_analysis : bool
+            If the update is during a non-linear search, in which case tasks are only performed after a certain number
+             of updates and only a subset of visualization may be performed.
+        """
+        with profiling.section("output_samples"):
+
+            samples.write_table(filename=self.paths.samples_file)
+            samples.info_to_json(filename=self.paths.info_file)
+
+            self.save_samples(samples=samples)
 
         try:
-            instance = samples.max_log_likelihood_instance
+            instance = self.max_log_likelihood_instance_from(samples=samples)
         except exc.FitException:
-            return samples
+            return
 
         if self.should_visualize() or not during_analysis:
-            analysis.visualize(paths=self.paths, instance=instance, during_analysis=during_analysis)
+            with profiling.section("visualize"):
+                analysis.visualize(paths=self.paths, instance=instance, during_analysis=during_analysis)
 
         if self.should_output_model_results() or not during_analysis:
 
-            text_util.results_to_file(
-                samples=samples,
-                filename=self.paths.file_results,
-                during_analysis=during_analysis,
-            )
+            with profiling.section("model_results"):
+
+                text_util.results_to_file(
+                    samples=samples,
+                    filename=self.paths.file_results,
+                    during_analysis=during_analysis,
+                )
 
-            text_util.search_summary_to_file(samples=samples, filename=self.paths.file_search_summary)
+                text_util.search_summary_to_file(
+                    samples=samples,
+                    filename=self.paths.file_search_summary,
+                    fidelity_switches=self.fidelity.switches,
+                )
 
-        if not during_analysis and self.remove_state_files_at_end:
+        if not during_analysis and self.remove_state_files_at_end and not self.budget.stopped:
             try:
                 self.remove_state_files()
             except FileNotFoundError:
                 pass
 
-        return samples
+    def max_log_likelihood_instance_from(self, samples):
+        """The maximum log likelihood instance evaluated so far, which is taken from the best fit shared by every
+        process of the search if it exceeds the maximum log likelihood of the samples (e.g. because the sampler has not
+        stored the evaluation yet or another process evaluated it). At a reduced fidelity the log likelihoods of the
+        best fit are not comparable to the samples of the final update, so the samples are used.
+
+        Parameters
+        ----------
+        samples : af.Samples
+            The samples of the `NonLinearSearch` at the time of the update.
+        """
+        log_likelihood, parameters = self.best_fit.read()
+
+        if parameters is not None and not self.fidelity.applied:
+            if log_likelihood > samples.max_log_likelihood_sample.log_likelihood:
+                return samples.model.instance_from_vector(vector=list(parameters))
+
+        return samples.max_log_likelihood_instance
 
     def setup_log_file(self):
 
@@ -441,23 +768,26 @@ class NonLinearSearch(ABC):
         """
         Save the seawrch associated with the phase as a pickle
         """
-        with open(self.paths.make_search_pickle_path(), "w+b") as f:
-            f.write(pickle.dumps(self))
+        with tracing.span(name="save_search", category="pickle"):
+            with open(self.paths.make_search_pickle_path(), "w+b") as f:
+                f.write(pickle.dumps(self))
 
     def save_model(self, model):
         """
         Save the model associated with the phase as a pickle
         """
-        with open(self.paths.make_model_pickle_path(), "w+b") as f:
-            f.write(pickle.dumps(model))
+        with tracing.span(name="save_model", category="pickle"):
+            with open(self.paths.make_model_pickle_path(), "w+b") as f:
+                f.write(pickle.dumps(model))
 
     def save_samples(self, samples):
         """
         Save the final-result samples associated with the phase as a pickle
         """
 
-        with open(self.paths.make_samples_pickle_path(), "w+b") as f:
-            f.write(pickle.dumps(samples))
+        with tracing.span(name="save_samples", category="pickle"):
+            with open(self.paths.make_samples_pickle_path(), "w+b") as f:
+                f.write(pickle.dumps(samples))
 
     def save_metadata(self):
         """
@@ -501,38 +831,55 @@ class NonLinearSearch(ABC):
     def samples_via_csv_json_from_model(self, model):
         raise NotImplementedError()
 
+    def samples_snapshot_via_sampler_from_model(self, model):
+        """Create the `Samples` used by an update performed on the background thread.
+
+        These must not read any state the `NonLinearSearch` continues to write to whilst sampling. By default the
+        samples are created via `samples_via_sampler_from_model`, which loads all quantities into memory."""
+        return self.samples_via_sampler_from_model(model=model)
+
     def make_pool(self):
-        """Make the pool instance used to parallelize a `NonLinearSearch` alongside a set of unique ids for every
-        process in the pool. If the specified number of cores is 1, a pool instance is not made and None is returned.
+        """Make the pool instance used to parallelize a `NonLinearSearch`. If the specified number of cores is 1, a
+        pool instance is not made and None is returned.
 
         The pool cannot be set as an attribute of the class itself because this prevents pickling, thus it is generated
         via this function before calling the non-linear search.
 
-        The pool instance is also set up with a list of unique pool ids, which are used during model-fitting to
-        identify a 'master core' (the one whose id value is lowest) which handles model result output, visualization,
-        etc."""
+        Every process of the pool is attached to the best fit of the search when it starts, so that all processes
+        update the maximum log likelihood and parameters in shared memory."""
 
         if self.number_of_cores == 1:
 
-            return None, None
+            return None
 
-        else:
+        self.close_pool()
 
-            manager = mp.Manager()
-            idQueue = manager.Queue()
+        self._pool = mp.Pool(
+            processes=self.number_of_cores,
+            initializer=bf.init_process,
+            initargs=self.best_fit.process_arguments,
+        )
 
-            [idQueue.put(i) for i in range(self.number_of_cores)]
+        return self._pool
 
-            pool = mp.Pool(
-                processes=self.number_of_cores, initializer=init, initargs=(idQueue,)
-            )
-            ids = pool.map(f, range(self.number_of_cores))
+    def close_pool(self):
+        """Close the pool made by `make_pool`, waiting for its processes to exit. Processes output anything they
+        buffer (e.g. the events of a trace) when they exit, so this is done before the final update of a search."""
 
-            return pool, [id[1] for id in ids]
+        pool = self.__dict__.pop("_pool", None)
+
+        if pool is not None:
+            pool.close()
+            pool.join()
 
     def __eq__(self, other):
         return isinstance(other, NonLinearSearch) and self.__dict__ == other.__dict__
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop("_pool", None)
+        return state
+
     def __setstate__(self, state):
         self.__dict__.update(state)
         self.paths.restore()
@@ -543,6 +890,40 @@ class Analysis(ABC):
     def log_likelihood_function(self, instance):
         raise NotImplementedError()
 
+    def log_likelihoods_from_instances(self, instances) -> np.ndarray:
+        """
+        The log likelihoods of a batch of instances, which searches that evaluate points in batches (e.g. PySwarms
+        evaluating its swarm) call once per batch.
+
+        An analysis whose log likelihood function can evaluate many instances at once (e.g. with array operations over
+        the batch) can override this, returning NaN for any instance which should be resampled. By default the log
+        likelihood function is called for every instance, with the usual per-evaluation profiling and resampling.
+        """
+        return np.asarray([self.log_likelihood_function(instance=instance) for instance in instances])
+
+    @property
+    def has_batch_log_likelihood(self) -> bool:
+        """
+        Whether this analysis overrides `log_likelihoods_from_instances` to evaluate batches of instances at once.
+        """
+        return type(self).log_likelihoods_from_instances is not Analysis.log_likelihoods_from_instances
+
+    @property
+    def fidelity_levels(self) -> list:
+        """
+        The approximate fidelity levels of the log likelihood function (e.g. binning factors of the data), ordered from
+        the cheapest to the most accurate. The full fidelity is this analysis itself, so is not included. If this list
+        is not empty, searches which support multi-fidelity fitting begin at the cheapest level (see
+        `FidelityScheduler`).
+        """
+        return []
+
+    def with_fidelity(self, fidelity) -> "Analysis":
+        """
+        Returns a copy of this analysis whose log likelihood function is evaluated at one of its fidelity levels.
+        """
+        return self
+
     def visualize(self, paths : Paths, instance, during_analysis):
         pass
 
@@ -558,7 +939,7 @@ class Result:
     @DynamicAttrs
     """
 
-    def __init__(self, samples, previous_model, search=None):
+    def __init__(self, samples, previous_model, search=None, partial=False):
         """
         The result of an optimization.
 
@@ -566,11 +947,15 @@ class Result:
         ----------
         previous_model
             The model mapper from the stage that produced this result
+        partial : bool
+            If `True` the search stopped early because its budget was exhausted and did not complete, meaning it
+            resumes from where it stopped when it is next run.
         """
 
         self.samples = samples
         self.previous_model = previous_model
         self.search = search
+        self.partial = partial
 
         self.__model = None
 
@@ -582,6 +967,10 @@ class Result:
     def log_likelihood(self):
         return max(self.samples.log_likelihoods)
 
+    @property
+    def log_evidence(self):
+        return self.samples.log_evidence
+
     @property
     def instance(self):
         return self._instance
@@ -755,15 +1144,3 @@ class PriorPasser:
         use_errors = config("prior_passer", "use_errors")
         use_widths = config("prior_passer", "use_widths")
         return PriorPasser(sigma=sigma, use_errors=use_errors, use_widths=use_widths)
-
-
-def init(queue):
-    global idx
-    idx = queue.get()
-
-
-def f(x):
-    global idx
-    process = mp.current_process()
-    sleep(1)
-    return idx, process.pid, x * x
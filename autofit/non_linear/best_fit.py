@@ -0,0 +1,169 @@
+import multiprocessing as mp
+import threading
+
+import numpy as np
+
+from autofit.non_linear.per_process import PerProcess, registry
+
+# The number of times `BestFit.read` retries a read which overlaps a write before it returns the last consistent value.
+
+MAX_READ_ATTEMPTS = 1000
+
+
+def init_process(run_id, shared_array, dimensions, lock):
+    """
+    The initializer of every process of a pool, which attaches the process to the shared array of the best fit with
+    the lock its processes use to update it.
+    """
+    if run_id is not None and run_id not in registry(BestFit.__name__):
+        BestFit().attach(run_id=run_id, shared_array=shared_array, dimensions=dimensions, lock=lock)
+
+
+class BestFit(PerProcess):
+    def __init__(self):
+        """
+        The maximum log likelihood and parameters evaluated by every process of a `NonLinearSearch`, which all
+        processes of a parallel search update in one shared array.
+
+        Processes of a pool made by `NonLinearSearch.make_pool` are attached to the best fit when they start and
+        processes forked from the search inherit it. In any other process the best fit is not active and ignores
+        updates.
+
+        The array holds the log likelihood, a sequence number and the parameter vector. A process only takes the lock
+        when its log likelihood exceeds the best fit, so most evaluations compare one float in shared memory and
+        return. Writers increment the sequence number before and after writing, so readers retry rather than read a
+        parameter vector which is partly written.
+        """
+        self.run_id = None
+        self.dimensions = 0
+
+        self._lock = None
+        self._shared_array = None
+        self._array = None
+
+        self._last_read = (-np.inf, None)
+
+    @property
+    def is_active(self) -> bool:
+        return self._array is not None
+
+    @property
+    def process_arguments(self) -> tuple:
+        """
+        The arguments of `init_process` for the processes of a pool.
+        """
+        return self.run_id, self._shared_array, self.dimensions, self._lock
+
+    def start(self, dimensions, shared=True):
+        """
+        Start tracking the best fit of a run, which is in shared memory if it is *shared* by the processes of a pool.
+
+        Parameters
+        ----------
+        dimensions : int
+            The number of free parameters of the model.
+        shared : bool
+            Whether the best fit is updated by the processes of a pool.
+        """
+        self.stop()
+
+        self.register()
+        self.dimensions = dimensions
+
+        if shared:
+            self._shared_array = mp.RawArray("d", dimensions + 2)
+            self._lock = mp.Lock()
+            self._array = np.frombuffer(self._shared_array, dtype="float64")
+        else:
+            self._lock = threading.Lock()
+            self._array = np.zeros(shape=(dimensions + 2,))
+
+        self._array[0] = -np.inf
+        self._array[1] = 0.0
+        self._array[2:] = np.nan
+
+    def attach(self, run_id, shared_array, dimensions, lock):
+
+        self.register(run_id=run_id)
+        self.dimensions = dimensions
+        self._lock = lock
+
+        self._shared_array = shared_array
+        self._array = np.frombuffer(shared_array, dtype="float64")
+
+    def stop(self):
+        """
+        Stop tracking the best fit, releasing its shared array.
+        """
+        self.unregister()
+
+        self.run_id = None
+        self._lock = None
+        self._shared_array = None
+        self._array = None
+
+        self._last_read = (-np.inf, None)
+
+    def update(self, log_likelihood, parameters) -> bool:
+        """
+        Update the best fit with an evaluation of the log likelihood function, if it exceeds the best fit.
+
+        Parameters
+        ----------
+        log_likelihood : float
+            The log likelihood of the evaluation.
+        parameters : [float]
+            The physical parameters of the evaluation.
+        """
+        array = self._array
+
+        if array is None or not log_likelihood > array[0]:
+            return False
+
+        with self._lock:
+
+            if not log_likelihood > array[0]:
+                return False
+
+            array[1] += 1.0
+            array[2:] = parameters
+            array[0] = log_likelihood
+            array[1] += 1.0
+
+        return True
+
+    @property
+    def log_likelihood(self) -> float:
+        return self.read()[0]
+
+    @property
+    def parameters(self) -> np.ndarray:
+        return self.read()[1]
+
+    def read(self) -> (float, np.ndarray):
+        """
+        The log likelihood and parameters of the best fit, where the parameters are None if no evaluation has updated
+        the best fit.
+
+        A read which overlaps a write is retried, up to `MAX_READ_ATTEMPTS` times. If every attempt overlaps a write,
+        for example because a process died while writing, the last consistent value this process read is returned.
+        """
+        array = self._array
+
+        if array is None:
+            return -np.inf, None
+
+        for _ in range(MAX_READ_ATTEMPTS):
+
+            sequence = array[1]
+
+            if sequence % 2 == 0:
+
+                log_likelihood = float(array[0])
+                parameters = array[2:].copy()
+
+                if array[1] == sequence:
+                    self._last_read = log_likelihood, parameters if sequence > 0 else None
+                    return self._last_read
+
+        return self._last_read
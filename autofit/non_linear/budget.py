@@ -0,0 +1,131 @@
+from os import path
+
+from autofit.non_linear.log import logger
+
+
+class Budget:
+    def __init__(self, max_time=None, max_evaluations=None):
+        """
+        A wall-clock time and likelihood evaluation budget for one run of a `NonLinearSearch`, which stops the search
+        gracefully when either is exhausted.
+
+        Budgets are per run, so a search which stops early and is resumed by a later job (e.g. on a batch queue with
+        a hard time limit) is given a fresh budget. The total number of evaluations performed across all runs is also
+        tracked and output to the file .evaluations in the samples folder.
+
+        Evaluations are counted by the search itself after every batch of iterations (e.g. walkers x steps for Emcee),
+        so the count is shared across all processes of a parallel search.
+
+        Parameters
+        ----------
+        max_time : float
+            The maximum wall-clock time in seconds the search runs for, where a value of None or less than or equal to
+            zero means there is no time limit.
+        max_evaluations : int
+            The maximum number of likelihood evaluations the search performs, where a value of None or less than or
+            equal to zero means there is no evaluation limit.
+        """
+        self.max_time = max_time if max_time is not None and max_time > 0 else None
+        self.max_evaluations = (
+            max_evaluations
+            if max_evaluations is not None and max_evaluations > 0
+            else None
+        )
+
+        self.timer = None
+
+        self.evaluations = 0
+        self.total_evaluations = 0
+
+        self.stopped = False
+
+    @property
+    def is_active(self) -> bool:
+        return self.max_time is not None or self.max_evaluations is not None
+
+    @property
+    def evaluations_path(self):
+        return path.join(self.timer.paths.samples_path, ".evaluations")
+
+    def start(self, timer):
+        """
+        Start the budget of a run of the `NonLinearSearch`, loading the total evaluations of any previous runs.
+
+        Parameters
+        ----------
+        timer : Timer
+            The timer of the search, whose session time is compared to the time budget.
+        """
+        self.timer = timer
+
+        self.evaluations = 0
+        self.stopped = False
+
+        try:
+            with open(self.evaluations_path) as f:
+                self.total_evaluations = int(f.read())
+        except (FileNotFoundError, ValueError):
+            self.total_evaluations = 0
+
+    def add_evaluations(self, evaluations):
+        """
+        Add a batch of likelihood evaluations performed by the search to the count.
+        """
+        self.evaluations += int(evaluations)
+        self.total_evaluations += int(evaluations)
+
+        with open(self.evaluations_path, "w+") as f:
+            f.write(str(self.total_evaluations))
+
+    @property
+    def is_exhausted(self) -> bool:
+        if self.max_evaluations is not None and self.evaluations >= self.max_evaluations:
+            return True
+        if self.max_time is not None and self.timer.session_time >= self.max_time:
+            return True
+        return False
+
+    def check(self) -> bool:
+        """
+        Returns `True` if the budget is exhausted, in which case the search should stop after checkpointing its
+        current state.
+        """
+        if self.is_active and self.is_exhausted:
+            if not self.stopped:
+                logger.info(
+                    f"Budget exhausted after {self.evaluations} evaluations in {self.timer.session_time:.1f}s, "
+                    f"stopping non-linear search early."
+                )
+            self.stopped = True
+        return self.stopped
+
+    def iterations_within_budget(self, iterations, evaluations_per_iteration=1) -> int:
+        """
+        Reduce the number of iterations of the next batch so that, based on the evaluations performed and the
+        evaluation rate so far, it does not exceed the remaining budget. At least one iteration is always performed.
+
+        Parameters
+        ----------
+        iterations : int
+            The number of iterations the search would perform in the next batch.
+        evaluations_per_iteration : int
+            The number of likelihood evaluations performed per iteration (e.g. the number of walkers or particles).
+        """
+        if not self.is_active:
+            return iterations
+
+        remaining = []
+
+        if self.max_evaluations is not None:
+            remaining.append(self.max_evaluations - self.evaluations)
+
+        if self.max_time is not None and self.evaluations > 0:
+            session_time = max(self.timer.session_time, 1.0e-8)
+            remaining.append(
+                (self.max_time - session_time) * self.evaluations / session_time
+            )
+
+        if len(remaining) == 0:
+            return iterations
+
+        return max(min(iterations, int(min(remaining) / evaluations_per_iteration)), 1)
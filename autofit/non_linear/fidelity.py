@@ -0,0 +1,304 @@
+import copy
+import json
+import time
+from os import path
+
+import numpy as np
+
+from autofit import exc
+from autofit.non_linear.log import logger
+from autofit.non_linear.samples import PDFSamples, Sample
+
+
+class FidelityScheduler:
+    def __init__(self, switch_evaluations=None, switch_dlogz=None, stall_tolerance=None):
+        """
+        Schedules the fidelity of the log likelihood function of an `Analysis` which exposes cheaper, approximate
+        fidelity levels (e.g. a fit to a binned or downsampled dataset) via its `fidelity_levels` and `with_fidelity`
+        methods.
+
+        The search begins at the cheapest fidelity level and switches to the next level (the last being the full
+        fidelity `Analysis` itself) when either:
+
+        - The number of evaluations performed at the current level exceeds *switch_evaluations*.
+
+        - The search signals convergence at the current level. Nested samplers signal convergence when their estimate
+          of the remaining log evidence falls below *switch_dlogz*, and optimizers when their best log posterior
+          improves by less than *stall_tolerance* between two updates.
+
+        The final samples are re-evaluated at full fidelity and, for samples with a PDF, importance reweighted by the
+        ratio of the full and approximate likelihoods. The fidelity level and every switch are output to the file
+        fidelity.json in the samples folder, so a resumed search continues at the fidelity it stopped at.
+
+        Parameters
+        ----------
+        switch_evaluations : int
+            The number of evaluations at a fidelity level after which the next level is used, where a value of None or
+            less than or equal to zero means the schedule only switches on convergence.
+        switch_dlogz : float
+            A nested sampler switches to the next level when its estimate of the remaining log evidence is below this
+            value, where a value of None or less than or equal to zero disables this signal.
+        stall_tolerance : float
+            An optimizer switches to the next level when its best log posterior improves by less than this value
+            between updates, where a value of None or below zero disables this signal.
+        """
+        self.switch_evaluations = (
+            switch_evaluations
+            if switch_evaluations is not None and switch_evaluations > 0
+            else None
+        )
+        self.switch_dlogz = (
+            switch_dlogz if switch_dlogz is not None and switch_dlogz > 0 else None
+        )
+        self.stall_tolerance = (
+            stall_tolerance if stall_tolerance is not None and stall_tolerance >= 0 else None
+        )
+
+        self.analysis = None
+        self.paths = None
+
+        self.applied = False
+
+        self.level = 0
+        self.evaluations_at_level = 0
+        self.switches = []
+
+    @property
+    def fidelity_levels(self) -> list:
+        if self.analysis is None:
+            return []
+        return list(self.analysis.fidelity_levels)
+
+    @property
+    def is_active(self) -> bool:
+        """
+        Is the analysis of this run multi-fidelity, such that the search begins at an approximate fidelity level?
+        """
+        return len(self.fidelity_levels) > 0
+
+    @property
+    def is_full_fidelity(self) -> bool:
+        return self.level >= len(self.fidelity_levels)
+
+    @property
+    def fidelity(self):
+        """
+        The fidelity level currently used, where None is the full fidelity of the `Analysis`.
+        """
+        if self.is_full_fidelity:
+            return None
+        return self.fidelity_levels[self.level]
+
+    @property
+    def analysis_at_fidelity(self):
+        if self.is_full_fidelity:
+            return self.analysis
+        return self.analysis.with_fidelity(self.fidelity)
+
+    @property
+    def fidelity_path(self):
+        return path.join(self.paths.samples_path, "fidelity.json")
+
+    def start(self, paths, analysis):
+        """
+        Start the schedule of a run of the `NonLinearSearch`, loading the fidelity level and switches of a previous
+        run if it is being resumed.
+
+        Parameters
+        ----------
+        paths : af.Paths
+            Manages all paths, e.g. where the search outputs are stored, the samples, etc.
+        analysis : Analysis
+            The full fidelity analysis of the fit.
+        """
+        self.paths = paths
+        self.analysis = analysis
+
+        self.applied = False
+
+        self.level = 0
+        self.evaluations_at_level = 0
+        self.switches = []
+
+        if not self.is_active:
+            return
+
+        try:
+            with open(self.fidelity_path) as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return
+
+        self.level = state["level"]
+        self.evaluations_at_level = state["evaluations_at_level"]
+        self.switches = state["switches"]
+
+    def apply(self, fitness_function):
+        """
+        Set the analysis of a fitness function to the current fidelity level. Searches which support multi-fidelity
+        fitting call this after creating their fitness function, and only their samples are re-evaluated at full
+        fidelity.
+        """
+        if self.is_active:
+            self.applied = True
+
+            fitness_function.analysis = self.analysis_at_fidelity
+
+            logger.info(f"Fitting at fidelity level {self.fidelity}.")
+
+    def update(self, fitness_function, evaluations, converged=False, reason="converged") -> bool:
+        """
+        Add the evaluations performed since the last update at the current fidelity level and switch the fitness
+        function to the next level if it is due, returning whether the fidelity was switched.
+
+        Parameters
+        ----------
+        fitness_function : NonLinearSearch.Fitness
+            The fitness function of the search, whose analysis is switched.
+        evaluations : int
+            The number of evaluations performed since the last update.
+        converged : bool
+            Whether the search signals convergence at the current fidelity level.
+        reason : str
+            A description of the convergence signal, recorded with the switch.
+        """
+        if not self.applied or self.is_full_fidelity:
+            return False
+
+        self.evaluations_at_level += int(evaluations)
+
+        if converged:
+            self.switch(fitness_function=fitness_function, reason=reason)
+            return True
+
+        if self.switch_evaluations is not None and self.evaluations_at_level >= self.switch_evaluations:
+            self.switch(fitness_function=fitness_function, reason="evaluations")
+            return True
+
+        self.output_to_json()
+
+        return False
+
+    def is_stalled(self, log_posterior, previous_log_posterior) -> bool:
+        """
+        Has the best log posterior of an optimizer improved by less than the stall tolerance between two updates?
+        """
+        if self.stall_tolerance is None or previous_log_posterior is None:
+            return False
+        return log_posterior - previous_log_posterior < self.stall_tolerance
+
+    def is_dlogz_converged(self, dlogz) -> bool:
+        """
+        Is the estimate of the remaining log evidence of a nested sampler below the switch threshold?
+        """
+        if self.switch_dlogz is None:
+            return False
+        return dlogz < self.switch_dlogz
+
+    def switch(self, fitness_function, reason):
+
+        previous_fidelity = self.fidelity
+
+        self.level += 1
+
+        self.switches.append(
+            {
+                "from_fidelity": previous_fidelity,
+                "to_fidelity": self.fidelity,
+                "reason": reason,
+                "evaluations": self.evaluations_at_level,
+                "time": time.time(),
+            }
+        )
+
+        self.evaluations_at_level = 0
+
+        fitness_function.analysis = self.analysis_at_fidelity
+
+        logger.info(
+            f"Switching from fidelity level {previous_fidelity} to {self.fidelity} ({reason})."
+        )
+
+        self.output_to_json()
+
+    def output_to_json(self):
+
+        with open(self.fidelity_path, "w") as outfile:
+            json.dump(
+                {
+                    "level": self.level,
+                    "evaluations_at_level": self.evaluations_at_level,
+                    "switches": self.switches,
+                },
+                outfile,
+                indent=4,
+            )
+
+    def samples_at_full_fidelity(self, samples):
+        """
+        Re-evaluate the log likelihood of every sample at full fidelity.
+
+        For samples which estimate the PDF (e.g. MCMC and nested sampling), every sample is importance reweighted by
+        the ratio of its full and approximate likelihoods, which corrects the PDF (and log evidence) for the part of
+        the search performed at approximate fidelity. Samples which raise a `FitException` at full fidelity are given
+        zero weight.
+
+        Parameters
+        ----------
+        samples : af.Samples
+            The samples of the search, whose log likelihoods were evaluated at the fidelity they were sampled at.
+        """
+        log_likelihoods = []
+
+        for sample in samples.samples:
+
+            instance = sample.instance_for_model(model=samples.model)
+
+            try:
+                log_likelihoods.append(self.analysis.log_likelihood_function(instance=instance))
+            except exc.FitException:
+                log_likelihoods.append(None)
+
+        samples = copy.copy(samples)
+
+        if isinstance(samples, PDFSamples):
+
+            weights = np.asarray([sample.weights for sample in samples.samples], dtype="float")
+
+            log_ratios = np.asarray(
+                [
+                    log_likelihood - sample.log_likelihood
+                    if log_likelihood is not None
+                    else -np.inf
+                    for sample, log_likelihood in zip(samples.samples, log_likelihoods)
+                ]
+            )
+
+            finite = np.isfinite(log_ratios) & (weights > 0.0)
+
+            ratios = np.zeros(len(weights))
+            ratios[finite] = np.exp(log_ratios[finite] - np.max(log_ratios[finite]))
+
+            new_weights = weights * ratios
+            new_weights *= np.sum(weights) / np.sum(new_weights)
+
+            if getattr(samples, "log_evidence", None) is not None:
+                samples.log_evidence += np.max(log_ratios[finite]) + np.log(
+                    np.sum(weights * ratios) / np.sum(weights)
+                )
+
+        else:
+
+            new_weights = [sample.weights for sample in samples.samples]
+
+        samples.samples = [
+            Sample(
+                log_likelihood=log_likelihood if log_likelihood is not None else sample.log_likelihood,
+                log_prior=sample.log_prior,
+                weights=float(weight) if log_likelihood is not None else 0.0,
+                **sample.kwargs
+            )
+            for sample, log_likelihood, weight in zip(samples.samples, log_likelihoods, new_weights)
+        ]
+
+        return samples
@@ -1,4 +1,8 @@
-import copy
+import itertools
+import json
+import os
+import pickle
+import uuid
 from os import path
 from typing import List, Tuple, Union
 
@@ -9,8 +13,37 @@ from autofit import exc
 from autofit.mapper import model_mapper as mm
 from autofit.mapper.prior import prior as p
 from autofit.non_linear.abstract_search import Result
-from autofit.non_linear.parallel import AbstractJob, Process, AbstractJobResult
+from autofit.non_linear.initializer import InitializerFromSamples
+from autofit.non_linear.log import logger
+from autofit.non_linear.parallel import AbstractJob, Process, AbstractJobResult, FileJobQueue, Shared, shared_value
 from autofit.non_linear.paths import Paths
+from autofit.non_linear import tracing
+from autofit.non_linear.tracing import Tracer
+
+
+class GridSearchLevel:
+    def __init__(
+            self,
+            step_size: float,
+            lower_limit_lists: List[List[float]],
+            results: List[Result],
+    ):
+        """
+        The cells of a grid search fitted at one level of refinement, where level 0 is the initial grid and the cells
+        of every following level are half the width of those of the previous level.
+
+        Parameters
+        ----------
+        step_size
+            The width of the cells in the unit hypercube
+        lower_limit_lists
+            The lower bounds of every cell in the unit hypercube
+        results
+            The result of every cell
+        """
+        self.step_size = step_size
+        self.lower_limit_lists = lower_limit_lists
+        self.results = results
 
 
 class GridSearchResult:
@@ -19,6 +52,7 @@ class GridSearchResult:
             results: List[Result],
             lower_limit_lists: List[List[float]],
             physical_lower_limits_lists: List[List[float]],
+            levels: List[GridSearchLevel] = None,
     ):
         """
         The result of a grid search.
@@ -32,10 +66,14 @@ class GridSearchResult:
         physical_lower_limits_lists
             A list of lists of values representing the lower physical bounds of the grid search values
             at each step.
+        levels
+            If the grid search was refined, the cells fitted at every level of refinement. The results are then those
+            of the finest grid, where the result of every step is that of the finest cell fitted which contains it.
         """
         self.lower_limit_lists = lower_limit_lists
         self.physical_lower_limits_lists = physical_lower_limits_lists
         self.results = results
+        self.levels = levels
         self.no_dimensions = len(self.lower_limit_lists[0])
         self.no_steps = len(self.lower_limit_lists)
         self.side_length = int(self.no_steps ** (1 / self.no_dimensions))
@@ -52,6 +90,14 @@ class GridSearchResult:
     def __setstate__(self, state):
         self.__dict__.update(state)
 
+    @classmethod
+    def from_output_path(cls, output_path) -> "GridSearchResult":
+        """
+        Load the result of a grid search from the records of its cells in its output folder (see
+        `GridSearchManifest`), where the full result of a cell is only unpickled when it is used.
+        """
+        return GridSearchManifest(output_path=output_path).grid_search_result()
+
     @property
     def shape(self):
         return tuple([
@@ -181,25 +227,62 @@ class GridSearchResult:
             each entry being the figure of merit taken from the optimization performed at that point.
         """
         return np.reshape(
-            np.array([result.samples.log_evidence for result in self.results]),
+            np.array([result.log_evidence for result in self.results]),
             tuple(self.side_length for _ in range(self.no_dimensions)),
         )
 
 
 class GridSearch:
 
-    def __init__(self, search, paths=None, number_of_steps=4, parallel=False):
+    def __init__(
+            self,
+            search,
+            paths=None,
+            number_of_steps=4,
+            parallel=False,
+            refinement_depth=None,
+            refinement_threshold=None,
+            refinement_figure_of_merit=None,
+            warm_start=None,
+            job_queue: FileJobQueue = None,
+    ):
         """
         Performs a non linear optimiser search for each square in a grid. The dimensionality of the search depends on
         the number of distinct priors passed to the fit function. (1 / step_size) ^ no_dimension steps are performed
         per an optimisation.
 
+        The grid can be refined adaptively, where after the grid is fitted every cell whose figure of merit is within
+        *refinement_threshold* of the best cell is divided into 2 ^ no_dimension cells of half its width, which are
+        fitted in turn, up to *refinement_depth* times.
+
+        The searches of the cells can be warm-started from the samples of a neighbouring cell which has completed,
+        where every cell of the grid is fitted after the neighbour before it in one dimension (see
+        `wavefront_parents`), so cells are fitted in parallel in a wavefront across the grid. The cells of a level of
+        refinement are warm-started from the cell they divide. The initializer of the search of a cell draws the
+        parameters which are not grid parameters from the samples of the neighbour (see `InitializerFromSamples`),
+        so this only applies to searches with an initializer (e.g. Emcee, PySwarms).
+
+        If a *job_queue* is input the cells are fitted through a queue on a shared filesystem, so that the same grid
+        search can be run on several nodes which each fit cells of the grid, on *number_of_cores* processes if the grid
+        search is parallel. Every node collects the results of every cell and returns the complete result.
+
         Parameters
         ----------
         number_of_steps: int
             The number of steps to go in each direction
         search: class
             The class of the search that is run at each step
+        refinement_depth: int
+            The number of times cells of the grid are refined, where 0 means the grid is not refined.
+        refinement_threshold: float
+            Cells whose figure of merit is within this value of the best cell are refined.
+        refinement_figure_of_merit: str
+            The figure of merit of a cell, "log_likelihood" for its maximum log likelihood or "log_evidence" for its
+            log evidence.
+        warm_start: bool
+            Whether the searches of cells are warm-started from the samples of a neighbouring cell.
+        job_queue: FileJobQueue
+            If input, the queue through which the cells are fitted by every node running the grid search.
         """
 
         if paths is None:
@@ -213,6 +296,40 @@ class GridSearch:
         self.number_of_steps = number_of_steps
         self.search = search
 
+        refinement_config = conf.instance["non_linear"]["GridSearch"]["refinement"]
+
+        self.refinement_depth = (
+            refinement_config["depth"] if refinement_depth is None else refinement_depth
+        )
+        self.refinement_threshold = (
+            refinement_config["threshold"] if refinement_threshold is None else refinement_threshold
+        )
+        self.refinement_figure_of_merit = (
+            refinement_config["figure_of_merit"]
+            if refinement_figure_of_merit is None
+            else refinement_figure_of_merit
+        )
+
+        if self.refinement_figure_of_merit not in ("log_likelihood", "log_evidence"):
+            raise exc.GridSearchException(
+                f"The figure of merit of a refined grid search must be log_likelihood or log_evidence, not "
+                f"{self.refinement_figure_of_merit}"
+            )
+
+        self.warm_start = (
+            conf.instance["non_linear"]["GridSearch"]["warm_start"]["enabled"]
+            if warm_start is None
+            else warm_start
+        )
+
+        self.job_queue = job_queue
+
+        self.tracer = Tracer(
+            enabled=conf.instance["general"]["tracing"]["enabled"],
+            buffer_size=conf.instance["general"]["tracing"]["buffer_size"],
+            max_events=conf.instance["general"]["tracing"]["max_events"],
+        )
+
     @property
     def hyper_step_size(self):
         """
@@ -248,7 +365,8 @@ class GridSearch:
             len(grid_priors), step_size=self.hyper_step_size, centre_steps=False
         )
 
-    def make_arguments(self, values, grid_priors):
+    def make_arguments(self, values, grid_priors, step_size=None):
+        step_size = step_size or self.hyper_step_size
         arguments = {}
         for value, grid_prior in zip(values, grid_priors):
             if (
@@ -261,7 +379,7 @@ class GridSearch:
             lower_limit = grid_prior.lower_limit + value * grid_prior.width
             upper_limit = (
                     grid_prior.lower_limit
-                    + (value + self.hyper_step_size) * grid_prior.width
+                    + (value + step_size) * grid_prior.width
             )
             prior = p.UniformPrior(lower_limit=lower_limit, upper_limit=upper_limit)
             arguments[grid_prior] = prior
@@ -287,22 +405,57 @@ class GridSearch:
         grid_priors: [p.Prior]
             A list of priors to be substituted for uniform priors across the grid.
 
+        If *enabled* is `True` in the [tracing] section of general.ini, every job of the grid search is traced and the
+        trace is output to the file trace.json in the output folder of the grid search (see `Tracer`).
+
+        Every completed cell of the grid is recorded in the manifest of the grid search (see `GridSearchManifest`), so
+        if the grid search is run again only the cells which did not complete are fitted.
+
+        If the grid search is parallel the analysis is shared by the jobs of every cell (see `Shared`), so it is sent
+        to every process once and the jobs of a process use the same analysis.
+
         Returns
         -------
         result: GridSearchResult
             An object that comprises the results from each individual fit
         """
-        func = self.fit_parallel if self.parallel else self.fit_sequential
-        return func(
-            model=model,
-            analysis=analysis,
-            grid_priors=grid_priors
-        )
+        self.tracer.start(paths=self.paths)
+
+        if self.parallel:
+            analysis = Shared(analysis)
+
+        try:
+
+            with tracing.span(name="grid_search", category="grid_search", parallel=self.parallel):
+                result = self.fit_grid(
+                    model=model,
+                    analysis=analysis,
+                    grid_priors=grid_priors
+                )
+
+                if self.refinement_depth > 0:
+                    result = self.refine(
+                        model=model,
+                        analysis=analysis,
+                        grid_priors=grid_priors,
+                        result=result,
+                    )
+
+        finally:
+            if isinstance(analysis, Shared):
+                analysis.close()
+
+        if self.tracer.enabled:
+            self.tracer.output(output_path=self.paths.output_path)
 
-    def fit_parallel(self, model, analysis, grid_priors):
+        self.tracer.stop()
+
+        return result
+
+    def fit_grid(self, model, analysis, grid_priors):
         """
-        Perform the grid search in parallel, with all the optimisation for each grid square being performed on a
-        different process.
+        Perform the grid search, with the optimisation for each grid square being performed on a different process if
+        the grid search is parallel and on this process otherwise.
 
         Parameters
         ----------
@@ -317,99 +470,281 @@ class GridSearch:
             The result of the grid search
         """
 
-        grid_priors = list(set(grid_priors))
-        results = []
+        grid_priors = list(sorted(set(grid_priors), key=lambda prior: prior.id))
         lists = self.make_lists(grid_priors)
         physical_lists = self.make_physical_lists(grid_priors)
 
-        results_list = [
-            ["index"]
-            + list(map(model.name_for_prior, grid_priors))
-            + ["likelihood_merit"]
-        ]
+        manifest = self.manifest_from(
+            model=model, grid_priors=grid_priors, lists=lists, physical_lists=physical_lists
+        )
 
-        jobs = list()
+        jobs = self.jobs_for_cells(
+            model=model,
+            analysis=analysis,
+            grid_priors=grid_priors,
+            lists=lists,
+            manifest=manifest,
+            parents=wavefront_parents(number_of_steps=self.number_of_steps, no_dimensions=len(grid_priors)),
+        )
 
-        for index, values in enumerate(lists):
-            jobs.append(
-                self.job_for_analysis_grid_priors_and_values(
-                    analysis=copy.deepcopy(analysis),
-                    model=model,
-                    grid_priors=grid_priors,
-                    values=values,
-                    index=index,
-                )
-            )
+        self.perform_cells(manifest=manifest, jobs=jobs)
 
-        for result in Process.run_jobs(
-                jobs,
-                self.number_of_cores
-        ):
-            results.append(result)
-            results = sorted(results)
-            results_list.append(result.result_list_row)
-            self.write_results(results_list)
+        figure_of_merit_label = "likelihood_merit" if self.parallel else "max_log_likelihood"
 
-        return GridSearchResult(
-            [
-                result.result
-                for result
-                in results
-            ],
-            lists,
-            physical_lists
+        self.write_results(
+            [["index"] + list(map(model.name_for_prior, grid_priors)) + [figure_of_merit_label]]
+            + manifest.result_list_rows
         )
 
-    def fit_sequential(self, model, analysis, grid_priors):
+        return GridSearchResult(manifest.results, lists, physical_lists)
+
+    def refine(self, model, analysis, grid_priors, result) -> GridSearchResult:
         """
-        Perform the grid search sequentially, with all the optimisation for each grid square being performed on the
-        same process.
+        Refine a grid search, by dividing every cell of the finest level fitted whose figure of merit is within the
+        threshold of the best cell into cells of half its width and fitting them, *refinement_depth* times.
 
-        Parameters
-        ----------
-        analysis
-            An analysis
-        grid_priors
-            Priors describing the position in the grid
+        The cells of every level are fitted in the folder refine_<level> of the output folder of the grid search, which
+        has its own results file and manifest.
 
         Returns
         -------
         result: GridSearchResult
-            The result of the grid search
+            The result on the finest grid, with the cells fitted at every level of refinement.
         """
-
         grid_priors = list(sorted(set(grid_priors), key=lambda prior: prior.id))
-        results = []
-        lists = self.make_lists(grid_priors)
-        physical_lists = self.make_physical_lists(grid_priors)
 
-        results_list = [
-            ["index"]
-            + list(map(model.name_for_prior, grid_priors))
-            + ["max_log_likelihood"]
+        levels = [
+            GridSearchLevel(
+                step_size=self.hyper_step_size,
+                lower_limit_lists=self.make_lists(grid_priors),
+                results=result.results,
+            )
         ]
 
-        for index, values in enumerate(lists):
-            job = self.job_for_analysis_grid_priors_and_values(
+        for level in range(1, self.refinement_depth + 1):
+
+            previous = levels[-1]
+
+            best = max(
+                self.figure_of_merit_from(result=cell_result)
+                for grid_level in levels
+                for cell_result in grid_level.results
+            )
+
+            step_size = previous.step_size / 2
+
+            lists = []
+            seeds = []
+
+            for lower_limit_list, cell_result in zip(previous.lower_limit_lists, previous.results):
+
+                if self.figure_of_merit_from(result=cell_result) < best - self.refinement_threshold:
+                    continue
+
+                for offsets in itertools.product((0.0, step_size), repeat=len(grid_priors)):
+                    lists.append([value + offset for value, offset in zip(lower_limit_list, offsets)])
+                    seeds.append(cell_result)
+
+            logger.info(
+                f"Grid search refinement level {level}, fitting {len(lists)} cells of width {step_size}"
+            )
+
+            output_path = path.join(self.paths.output_path, f"refine_{level}")
+
+            manifest = GridSearchManifest(
+                output_path=output_path,
+                grid_prior_names=list(map(model.name_for_prior, grid_priors)),
+                lists=lists,
+                physical_lists=[
+                    [prior.value_for(value) for prior, value in zip(grid_priors, values)]
+                    for values in lists
+                ],
+            )
+
+            jobs = self.jobs_for_cells(
+                model=model,
+                analysis=analysis,
+                grid_priors=grid_priors,
+                lists=lists,
+                manifest=manifest,
+                step_size=step_size,
+                level=level,
+                seeds=seeds,
+            )
+
+            self.perform_cells(manifest=manifest, jobs=jobs, level=level)
+
+            self.write_results(
+                [["index"] + list(map(model.name_for_prior, grid_priors)) + ["max_log_likelihood"]]
+                + manifest.result_list_rows,
+                output_path=output_path,
+            )
+
+            levels.append(
+                GridSearchLevel(step_size=step_size, lower_limit_lists=lists, results=manifest.results)
+            )
+
+        return self.grid_search_result_from_levels(grid_priors=grid_priors, levels=levels)
+
+    def grid_search_result_from_levels(self, grid_priors, levels) -> GridSearchResult:
+        """
+        The result of a refined grid search on the finest grid, where the result of every step of the finest grid is
+        that of the finest cell fitted which contains it.
+        """
+        steps = int(round(1 / levels[-1].step_size))
+
+        cell_results = {}
+
+        for level in levels:
+
+            width = int(round(level.step_size * steps))
+
+            for lower_limit_list, cell_result in zip(level.lower_limit_lists, level.results):
+
+                starts = [int(round(value * steps)) for value in lower_limit_list]
+
+                for index in itertools.product(*[range(start, start + width) for start in starts]):
+                    cell_results[index] = cell_result
+
+        lists = make_lists(len(grid_priors), step_size=1 / steps, centre_steps=False)
+
+        return GridSearchResult(
+            results=[
+                cell_results[index]
+                for index in itertools.product(range(steps), repeat=len(grid_priors))
+            ],
+            lower_limit_lists=lists,
+            physical_lower_limits_lists=[
+                [prior.value_for(value) for prior, value in zip(grid_priors, values)]
+                for values in lists
+            ],
+            levels=levels,
+        )
+
+    def figure_of_merit_from(self, result) -> float:
+        if self.refinement_figure_of_merit == "log_evidence":
+            figure_of_merit = result.log_evidence
+        else:
+            figure_of_merit = result.log_likelihood
+        return -np.inf if figure_of_merit is None else figure_of_merit
+
+    def jobs_for_cells(
+            self, model, analysis, grid_priors, lists, manifest, step_size=None, level=0, parents=None, seeds=None
+    ):
+        """
+        The jobs fitting the cells of the grid which are not in the manifest, which all reference the same analysis.
+
+        If the grid search is warm-started, the search of a cell is initialized from the samples of its seed, which
+        is either input in *seeds* or is the cell of the grid at its index in *parents*. A cell whose parent has not
+        completed is not fitted until it has, and None is yielded if no cell can be fitted until a job which is running
+        completes (see `Process.run_jobs`).
+        """
+        remaining = [index for index in range(len(lists)) if index not in manifest]
+
+        if not self.warm_start:
+            parents = None
+            seeds = None
+
+        while remaining:
+
+            for index in remaining:
+                if parents is None or parents[index] is None or parents[index] in manifest:
+                    break
+            else:
+                yield None
+                continue
+
+            remaining.remove(index)
+
+            if seeds is not None:
+                seed = seeds[index]
+            elif parents is not None and parents[index] is not None:
+                seed = manifest.result_for_index(parents[index])
+            else:
+                seed = None
+
+            yield self.job_for_analysis_grid_priors_and_values(
                 analysis=analysis,
                 model=model,
                 grid_priors=grid_priors,
-                values=values,
+                values=lists[index],
                 index=index,
+                step_size=step_size,
+                level=level,
+                seed=seed,
             )
 
-            result = job.perform()
+    def perform_cells(self, manifest, jobs, level=0):
+        """
+        Perform the jobs of cells of the grid search, recording every completed cell in the manifest.
+
+        With a job queue every node collects the result of every cell, so the manifest is written when all cells have
+        completed rather than appended to by every node as cells complete.
+        """
+        for result in self.perform_jobs(jobs=jobs, level=level):
+            manifest.add(job_result=result, write=self.job_queue is None)
 
-            results.append(result.result)
-            results_list.append(result.result_list_row)
+        if self.job_queue is not None:
+            manifest.write_cells()
+
+    def perform_jobs(self, jobs, level=0):
+        """
+        Perform jobs of the grid search, in parallel if the grid search is parallel, yielding their results as they
+        complete.
 
-            self.write_results(results_list)
+        If the grid search has a job queue the jobs are performed through the queue, in a folder of the queue for the
+        grid search and level of refinement.
+        """
+        if self.job_queue is not None:
+            yield from self.job_queue.run_jobs(
+                jobs,
+                name=path.join(self.paths.name, self.paths.tag, f"level_{level}"),
+                number_of_cores=self.number_of_cores if self.parallel else 1,
+                tracer=self.tracer if self.tracer.enabled else None,
+            )
+            return
 
-        return GridSearchResult(results, lists, physical_lists)
+        if self.parallel:
+            yield from Process.run_jobs(
+                jobs,
+                self.number_of_cores,
+                tracer=self.tracer if self.tracer.enabled else None,
+            )
+            return
 
-    def write_results(self, results_list):
+        for job in jobs:
+            with tracing.span(name="job", category="grid_search", number=job.number):
+                yield job.perform()
 
-        with open(path.join(self.paths.output_path, "results"), "w+") as f:
+    def manifest_from(self, model, grid_priors, lists, physical_lists=None) -> "GridSearchManifest":
+        """
+        Load the manifest of the cells of this grid search which completed in a previous run.
+        """
+        manifest = GridSearchManifest(
+            output_path=self.paths.output_path,
+            grid_prior_names=list(map(model.name_for_prior, grid_priors)),
+            lists=lists,
+            physical_lists=physical_lists,
+        )
+
+        if len(manifest) > 0:
+            logger.info(
+                f"Grid search resuming, {len(manifest)} of {len(lists)} cells were completed by a previous run"
+            )
+
+        return manifest
+
+    def write_results(self, results_list, output_path=None):
+        """
+        Render the human-readable table of the results of the cells to the results file, which is written when the
+        cells of a grid have been fitted, with the result of every cell recorded in the manifest as it completes.
+        """
+
+        filename = path.join(output_path or self.paths.output_path, "results")
+
+        # The table is replaced atomically, as it is written by every node of a grid search run through a job queue.
+
+        with open(f"{filename}.{uuid.uuid4().hex}", "w+") as f:
             f.write(
                 "\n".join(
                     map(
@@ -426,17 +761,24 @@ class GridSearch:
                 )
             )
 
+        os.replace(f.name, filename)
+
     def job_for_analysis_grid_priors_and_values(
-            self, model, analysis, grid_priors, values, index
+            self, model, analysis, grid_priors, values, index, step_size=None, level=0, seed=None
     ):
-        arguments = self.make_arguments(values=values, grid_priors=grid_priors)
+        arguments = self.make_arguments(values=values, grid_priors=grid_priors, step_size=step_size)
         model = model.mapper_from_partial_prior_arguments(arguments=arguments)
 
+        # Cells of each level of refinement are half the width of the last, so their limits are labelled with one
+        # more decimal place to keep their names distinct.
+
+        decimals = 2 + level
+
         labels = []
         for prior in sorted(arguments.values(), key=lambda pr: pr.id):
             labels.append(
-                "{}_{:.2f}_{:.2f}".format(
-                    model.name_for_prior(prior), prior.lower_limit, prior.upper_limit
+                "{}_{:.{decimals}f}_{:.{decimals}f}".format(
+                    model.name_for_prior(prior), prior.lower_limit, prior.upper_limit, decimals=decimals
                 )
             )
 
@@ -444,11 +786,23 @@ class GridSearch:
             self.paths.name,
             self.paths.tag,
             self.paths.non_linear_tag,
+            *([f"refine_{level}"] if level > 0 else []),
             "_".join(labels),
         )
 
         search_instance = self.search_instance(name_path=name_path)
 
+        if seed is not None and hasattr(search_instance, "initializer"):
+
+            grid_names = [model.name_for_prior(prior) for prior in arguments.values()]
+
+            search_instance.initializer = InitializerFromSamples(
+                samples=seed.samples,
+                parameter_names=[
+                    name for name in model.model_component_and_parameter_names if name not in grid_names
+                ],
+            )
+
         return Job(
             search_instance=search_instance,
             model=model,
@@ -468,7 +822,7 @@ class GridSearch:
         )
 
         for key, value in self.__dict__.items():
-            if key not in ("model", "instance", "paths"):
+            if key not in ("model", "instance", "paths", "tracer", "job_queue"):
                 try:
                     setattr(search_instance, key, value)
                 except AttributeError:
@@ -477,7 +831,7 @@ class GridSearch:
 
 
 class JobResult(AbstractJobResult):
-    def __init__(self, result, result_list_row, number):
+    def __init__(self, result, result_list_row, number, index=None):
         """
         The result of a job
 
@@ -487,10 +841,267 @@ class JobResult(AbstractJobResult):
             The result of a grid search
         result_list_row
             A row in the result list
+        index
+            The index of the cell of the grid the job fitted
         """
         super().__init__(number)
         self.result = result
         self.result_list_row = result_list_row
+        self.index = index
+
+
+class GridSearchCellResult:
+    def __init__(self, filename, log_likelihood, log_evidence=None):
+        """
+        The result of a cell of a grid search loaded from its record in the manifest of the grid search. The log
+        likelihood and log evidence are those of the record, and the `Result` of the cell is only unpickled from
+        *filename* when any other attribute is used, so the figures of merit of a grid of many cells can be loaded
+        without unpickling the result of every cell.
+        """
+        self.filename = filename
+        self.log_likelihood = log_likelihood
+        self.log_evidence = log_evidence
+        self._result = None
+
+    @property
+    def result(self) -> Result:
+        if self._result is None:
+            with open(self.filename, "rb") as infile:
+                self._result = pickle.load(infile)
+        return self._result
+
+    def __getattr__(self, item):
+        if item.startswith("__") or item == "_result":
+            raise AttributeError(item)
+        return getattr(self.result, item)
+
+    def __getstate__(self):
+        return {
+            "filename": self.filename,
+            "log_likelihood": self.log_likelihood,
+            "log_evidence": self.log_evidence,
+            "_result": self.result,
+        }
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+
+class GridSearchManifest:
+    def __init__(self, output_path, grid_prior_names=None, lists=None, physical_lists=None):
+        """
+        A record of the completed cells of a grid search, so that a grid search which is run again only fits the cells
+        which did not complete.
+
+        The manifest is the file records.ndjson in the output folder of the grid search. Its first line is a header
+        with the names of the grid priors and the values of every cell, and a line is appended for every completed
+        cell with its index, grid values, log likelihood, log evidence, row of the results file and the file its
+        result is pickled to in the cells folder. The manifest is therefore up to date if the grid search is stopped,
+        without rewriting it when every cell completes.
+
+        A manifest written by a grid search over different priors or a different grid is replaced. If
+        *grid_prior_names* is not input the manifest is loaded whichever grid it is for.
+
+        Parameters
+        ----------
+        output_path
+            The output folder of the grid search
+        grid_prior_names
+            The names of the priors of the grid
+        lists
+            The values of every cell of the grid, in the unit hypercube
+        physical_lists
+            The physical values of every cell of the grid
+        """
+        self.output_path = output_path
+        self.grid_prior_names = grid_prior_names
+        self.lists = lists
+        self.physical_lists = physical_lists
+
+        self.cells = {}
+        self._results = {}
+
+        self._is_written = False
+
+        self.load()
+
+    @property
+    def filename(self) -> str:
+        return path.join(self.output_path, "records.ndjson")
+
+    @property
+    def cells_path(self) -> str:
+        return path.join(self.output_path, "cells")
+
+    @property
+    def header(self) -> dict:
+        return {
+            "grid_priors": self.grid_prior_names,
+            "lists": self.lists,
+            "physical_lists": self.physical_lists,
+        }
+
+    def __contains__(self, index):
+        return index in self.cells
+
+    def __len__(self):
+        return len(self.cells)
+
+    def load(self):
+
+        try:
+            with open(self.filename) as infile:
+                text = infile.read()
+        except OSError:
+            return
+
+        records = []
+
+        for line in text.splitlines():
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+
+        if len(records) == 0:
+            return
+
+        header, records = records[0], records[1:]
+
+        if self.grid_prior_names is None:
+            self.grid_prior_names = header["grid_priors"]
+            self.lists = header["lists"]
+            self.physical_lists = header.get("physical_lists")
+        elif header.get("grid_priors") != self.grid_prior_names or header.get("lists") != self.lists:
+            logger.info("The manifest of the grid search is for a different grid and is replaced")
+            return
+
+        for record in records:
+
+            filename = path.join(self.output_path, record["result"])
+
+            if not path.exists(filename):
+                continue
+
+            self.cells[record["index"]] = record
+            self._results[record["index"]] = GridSearchCellResult(
+                filename=filename,
+                log_likelihood=record["log_likelihood"],
+                log_evidence=record.get("log_evidence"),
+            )
+
+        # A record which was only partly written when the grid search stopped is removed, so records are appended to
+        # a complete line.
+
+        if not text.endswith("\n") or len(records) != len(text.splitlines()) - 1:
+            self.write()
+        else:
+            self._is_written = True
+
+    def write(self):
+        """
+        Write the header and the records of every completed cell to the manifest.
+        """
+        os.makedirs(self.output_path, exist_ok=True)
+
+        temporary_filename = f"{self.filename}.{uuid.uuid4().hex}"
+
+        with open(temporary_filename, "w") as outfile:
+            for record in [self.header] + [self.cells[index] for index in sorted(self.cells)]:
+                outfile.write(json.dumps(record) + "\n")
+
+        os.replace(temporary_filename, self.filename)
+
+        self._is_written = True
+
+    def write_result(self, index):
+        """
+        Pickle the result of the cell with *index* to the cells folder, replacing the file atomically.
+        """
+        os.makedirs(self.cells_path, exist_ok=True)
+
+        filename = path.join(self.output_path, self.cells[index]["result"])
+        temporary_filename = f"{filename}.{uuid.uuid4().hex}"
+
+        with open(temporary_filename, "wb") as outfile:
+            pickle.dump(self._results[index], outfile)
+
+        os.replace(temporary_filename, filename)
+
+    def write_cells(self):
+        """
+        Pickle the result of every cell whose result is not in the cells folder and write the manifest.
+        """
+        for index in sorted(self.cells):
+            if not path.exists(path.join(self.output_path, self.cells[index]["result"])):
+                self.write_result(index)
+
+        self.write()
+
+    def add(self, job_result: JobResult, write=True):
+        """
+        Record a completed cell, pickling its result and appending its record to the manifest unless *write* is
+        False, in which case the cell is only recorded in memory until `write_cells` is called.
+        """
+        index = job_result.index
+
+        filename = path.join("cells", f"{index}.pickle")
+
+        try:
+            log_evidence = job_result.result.log_evidence
+        except AttributeError:
+            log_evidence = None
+
+        record = {
+            "index": index,
+            "values": self.lists[index],
+            "physical_values": self.physical_lists[index] if self.physical_lists is not None else None,
+            "log_likelihood": job_result.result_list_row[-1],
+            "log_evidence": log_evidence,
+            "result_list_row": job_result.result_list_row,
+            "result": filename,
+        }
+
+        self.cells[index] = record
+        self._results[index] = job_result.result
+
+        if not write:
+            return
+
+        self.write_result(index)
+
+        if not self._is_written:
+            self.write()
+            return
+
+        with open(self.filename, "a") as outfile:
+            outfile.write(json.dumps(record) + "\n")
+
+    def result_for_index(self, index) -> Result:
+        return self._results[index]
+
+    @property
+    def result_list_rows(self) -> List[list]:
+        return [self.cells[index]["result_list_row"] for index in sorted(self.cells)]
+
+    @property
+    def results(self) -> List[Result]:
+        """
+        The result of every cell of the grid, in the order of the grid.
+        """
+        return [self._results[index] for index in sorted(self._results)]
+
+    def grid_search_result(self) -> "GridSearchResult":
+        """
+        The result of the grid search from the records of its cells, where the result of every cell is only unpickled
+        when it is used.
+        """
+        if len(self) != len(self.lists):
+            raise exc.GridSearchException(
+                f"Only {len(self)} of the {len(self.lists)} cells of the grid search at {self.output_path} completed"
+            )
+
+        return GridSearchResult(self.results, self.lists, self.physical_lists)
 
 
 class Job(AbstractJob):
@@ -503,7 +1114,7 @@ class Job(AbstractJob):
         search_instance
             An instance of an optimiser
         analysis
-            An analysis
+            An analysis, or a `Shared` reference to the analysis of every job
         arguments
             The grid search arguments
         """
@@ -515,17 +1126,17 @@ class Job(AbstractJob):
         self.index = index
 
     def perform(self):
-        result = self.search_instance.fit(model=self.model, analysis=self.analysis)
+        result = self.search_instance.fit(model=self.model, analysis=shared_value(self.analysis))
         result_list_row = [
             self.index,
             *[prior.lower_limit for prior in self.arguments.values()],
             result.log_likelihood,
         ]
 
-        return JobResult(result, result_list_row, self.number)
+        return JobResult(result, result_list_row, self.number, index=self.index)
 
 
-def grid(fitness_function, no_dimensions, step_size):
+def grid(fitness_function, no_dimensions, step_size, vectorized=False, pool=None, chunk_size=10000):
     """
     Grid2D search using a fitness function over a given number of dimensions and a given step size between inclusive
     limits of 0 and 1.
@@ -533,27 +1144,194 @@ def grid(fitness_function, no_dimensions, step_size):
     Parameters
     ----------
     fitness_function: function
-        A function that takes a tuple of floats as an argument
+        A function that takes a tuple of floats as an argument, or an array of shape (total_points, no_dimensions) of
+        points if *vectorized*
     no_dimensions: int
         The number of dimensions of the grid search
     step_size: float
         The step size of the grid search
+    vectorized: bool
+        Whether the fitness function evaluates an array of points at once
+    pool: multiprocessing.Pool
+        If input, the points of the grid are evaluated in parallel by the processes of the pool
+    chunk_size: int
+        The number of points of the grid generated and evaluated at once
 
     Returns
     -------
     best_arguments: tuple[float]
         The tuple of arguments that gave the highest fitness
     """
-    best_fitness = float("-inf")
-    best_arguments = None
+    surface = grid_surface(
+        fitness_function=fitness_function,
+        no_dimensions=no_dimensions,
+        step_size=step_size,
+        vectorized=vectorized,
+        pool=pool,
+        chunk_size=chunk_size,
+    ).ravel()
+
+    if not np.any(surface > -np.inf):
+        return None
+
+    index = int(np.nanargmax(surface))
+
+    return tuple(
+        float(value)
+        for value in next(unit_grid_chunks(no_dimensions, step_size, start=index, chunk_size=1))[0]
+    )
+
+
+def grid_surface(fitness_function, no_dimensions, step_size, vectorized=False, pool=None, chunk_size=10000):
+    """
+    The fitness of every point of a grid over a given number of dimensions and a given step size between inclusive
+    limits of 0 and 1, as an array with one axis per dimension (see `grid_shape`) which can be plotted.
+
+    The grid is generated and evaluated in chunks of *chunk_size* points, where a vectorized fitness function is
+    called once per chunk and a pool evaluates every chunk in parallel.
+
+    Parameters
+    ----------
+    fitness_function: function
+        A function that takes a tuple of floats as an argument, or an array of shape (total_points, no_dimensions) of
+        points if *vectorized*
+    no_dimensions: int
+        The number of dimensions of the grid search
+    step_size: float
+        The step size of the grid search
+    vectorized: bool
+        Whether the fitness function evaluates an array of points at once
+    pool: multiprocessing.Pool
+        If input, the points of the grid are evaluated in parallel by the processes of the pool
+    chunk_size: int
+        The number of points of the grid generated and evaluated at once
+    """
+    shape = grid_shape(no_dimensions, step_size)
+
+    surface = np.full(int(np.prod(shape)), np.nan)
+
+    start = 0
+
+    for points in unit_grid_chunks(no_dimensions, step_size, chunk_size=chunk_size):
+
+        if vectorized:
+            if pool is None:
+                fitnesses = fitness_function(points)
+            else:
+                chunks = [chunk for chunk in np.array_split(points, pool._processes) if len(chunk) > 0]
+                fitnesses = np.concatenate(pool.map(fitness_function, chunks))
+        else:
+            arguments = list(map(tuple, points.tolist()))
+            if pool is None:
+                fitnesses = list(map(fitness_function, arguments))
+            else:
+                fitnesses = pool.map(
+                    fitness_function, arguments, chunksize=max(1, len(arguments) // pool._processes)
+                )
+
+        surface[start:start + len(points)] = np.asarray(fitnesses, dtype="float")
+        start += len(points)
+
+    return surface.reshape(shape)
+
+
+def wavefront_parents(number_of_steps: int, no_dimensions: int) -> List[Union[int, None]]:
+    """
+    The index of the parent of every cell of a grid, which is its neighbour one step before it in the first dimension
+    in which it is not at the first step, or None for the first cell of the grid.
+
+    Every cell is fitted after its parent when a grid search is warm-started, so the cells are fitted in a wavefront
+    which starts at the first cell, where cells whose parents have completed are fitted in parallel.
+
+    Parameters
+    ----------
+    number_of_steps
+        The number of steps of the grid in each dimension
+    no_dimensions
+        The number of dimensions of the grid
+    """
+    shape = tuple(number_of_steps for _ in range(no_dimensions))
+
+    parents = []
+
+    for index in range(number_of_steps ** no_dimensions):
+
+        coordinates = list(np.unravel_index(index, shape))
+
+        dimension = next(
+            (dimension for dimension, coordinate in enumerate(coordinates) if coordinate > 0), None
+        )
+
+        if dimension is None:
+            parents.append(None)
+            continue
+
+        coordinates[dimension] -= 1
+
+        parents.append(int(np.ravel_multi_index(coordinates, shape)))
+
+    return parents
+
+
+def step_sizes_from(no_dimensions: int, step_size: Union[Tuple[float], float]) -> Tuple[float]:
+    if isinstance(step_size, float):
+        return tuple(step_size for _ in range(no_dimensions))
+    return tuple(step_size)
+
+
+def grid_shape(no_dimensions: int, step_size: Union[Tuple[float], float]) -> Tuple[int]:
+    """
+    The number of steps of a grid in every dimension.
+    """
+    return tuple(int((1 / step)) for step in step_sizes_from(no_dimensions, step_size)[:no_dimensions])
 
-    for arguments in make_lists(no_dimensions, step_size):
-        fitness = fitness_function(tuple(arguments))
-        if fitness > best_fitness:
-            best_fitness = fitness
-            best_arguments = tuple(arguments)
 
-    return best_arguments
+def unit_grid_chunks(
+        no_dimensions: int,
+        step_size: Union[Tuple[float], float],
+        centre_steps=True,
+        chunk_size=10000,
+        start=0,
+):
+    """
+    The points of a grid in the unit hypercube, in the order of `make_lists`, as arrays of shape
+    (chunk_size, no_dimensions).
+
+    The points of every chunk are computed from their indexes in the grid, so a grid is generated a chunk at a time
+    rather than held in memory at once.
+
+    Parameters
+    ----------
+    no_dimensions
+        The number of dimensions of the grid
+    step_size
+        The step size. This can be a float or a tuple with the same number of dimensions
+    centre_steps
+        Whether points are at the centre of their steps rather than their lower limits
+    chunk_size
+        The maximum number of points of every chunk
+    start
+        The index of the first point generated
+    """
+    step_sizes = np.asarray(step_sizes_from(no_dimensions, step_size)[:no_dimensions], dtype="float")
+    shape = grid_shape(no_dimensions, step_size)
+
+    if no_dimensions == 0:
+        yield np.zeros((1, 0))
+        return
+
+    offsets = 0.5 * step_sizes if centre_steps else np.zeros(no_dimensions)
+
+    total_points = int(np.prod(shape))
+
+    for chunk_start in range(start, total_points, chunk_size):
+
+        indexes = np.unravel_index(np.arange(chunk_start, min(chunk_start + chunk_size, total_points)), shape)
+
+        yield np.stack(
+            [step_sizes[dimension] * indexes[dimension] + offsets[dimension] for dimension in range(no_dimensions)],
+            axis=1,
+        )
 
 
 def make_lists(
@@ -578,29 +1356,8 @@ def make_lists(
     lists: [[float]]
         A list of lists
     """
-    if isinstance(step_size, float):
-        step_size = tuple(
-            step_size
-            for _
-            in range(no_dimensions)
-        )
-
-    if no_dimensions == 0:
-        return [[]]
-
-    sub_lists = make_lists(
-        no_dimensions - 1,
-        step_size[1:],
-        centre_steps=centre_steps
-    )
-    step_size = step_size[0]
     return [
-        [
-            step_size * value + (
-                0.5 * step_size
-                if centre_steps
-                else 0)
-        ] + sub_list
-        for value in range(int((1 / step_size)))
-        for sub_list in sub_lists
+        list_
+        for points in unit_grid_chunks(no_dimensions, step_size, centre_steps=centre_steps)
+        for list_ in points.tolist()
     ]
@@ -1,3 +1,8 @@
+import hashlib
+import os
+import pickle
+import uuid
+from collections import defaultdict
 from copy import copy
 from copy import copy
 from itertools import count
@@ -6,7 +11,7 @@ from typing import List, Generator, Callable, Type, Union, Tuple
 
 from autofit import AbstractPriorModel, ModelInstance, Paths, Result, Analysis, NonLinearSearch
 from autofit.non_linear.grid.grid_search import make_lists
-from autofit.non_linear.parallel import AbstractJob, Process, AbstractJobResult
+from autofit.non_linear.parallel import AbstractJob, Process, AbstractJobResult, FileJobQueue
 
 
 class JobResult(AbstractJobResult):
@@ -14,7 +19,8 @@ class JobResult(AbstractJobResult):
             self,
             number: int,
             result: Result,
-            perturbed_result: Result
+            perturbed_result: Result,
+            index: int = None
     ):
         """
         The result of a single sensitivity comparison
@@ -23,99 +29,134 @@ class JobResult(AbstractJobResult):
         ----------
         result
         perturbed_result
+        index
+            The index of the perturbation in the sensitivity map
         """
         super().__init__(number)
         self.result = result
         self.perturbed_result = perturbed_result
+        self.index = index
 
     @property
     def log_likelihood_difference(self):
         return self.perturbed_result.log_likelihood - self.result.log_likelihood
 
 
-class Job(AbstractJob):
+def search_with_tag_suffix(search: NonLinearSearch, suffix: str) -> NonLinearSearch:
+    """
+    A copy of a search whose tag is suffixed, distinguishing the folders of the fits of a perturbation.
+    """
+    paths = search.paths
+    return search.copy_with_paths(
+        Paths(
+            name=paths.name,
+            tag=paths.tag + suffix,
+            path_prefix=paths.path_prefix,
+            remove_files=paths.remove_files,
+        )
+    )
+
+
+def perturbed_model_from(
+        model: AbstractPriorModel,
+        perturbation_model: AbstractPriorModel
+) -> AbstractPriorModel:
+    perturbed_model = copy(model)
+    perturbed_model.perturbation = perturbation_model
+    return perturbed_model
+
+
+class FitJobResult(AbstractJobResult):
+    def __init__(
+            self,
+            number: int,
+            index: str,
+            result: Result
+    ):
+        """
+        The result of one of the fits of a perturbation
+
+        Parameters
+        ----------
+        index
+            The index of the fit, base_<index> or perturbed_<index>
+        result
+            The result of the fit
+        """
+        super().__init__(number)
+        self.index = index
+        self.result = result
+
+
+class FitJob(AbstractJob):
     _number = count()
 
     def __init__(
             self,
             analysis: Analysis,
             model: AbstractPriorModel,
-            perturbation_model: AbstractPriorModel,
-            search: NonLinearSearch
+            search: NonLinearSearch,
+            index: str
     ):
         """
-        Job to run non-linear searches comparing how well a model and a model with a perturbation
-        fit the image.
+        Job to run one of the fits of a perturbation, of either the base model or the model
+        with the perturbation.
+
+        The two fits of a perturbation are separate jobs so that they are run concurrently
+        by different processes.
 
         Parameters
         ----------
-        model
-            A base model that fits the image without a perturbation
-        perturbation_model
-            A model of the perturbation which has been added to the underlying image
         analysis
             A class definition which can compares instances of a model to a perturbed image
+        model
+            The model which is fitted
         search
             A non-linear search
+        index
+            The index of the fit, base_<index> or perturbed_<index>
         """
         super().__init__()
         self.analysis = analysis
         self.model = model
+        self.search = search
+        self.index = index
 
-        self.perturbation_model = perturbation_model
-
-        paths = search.paths
-
-        self.search = search.copy_with_paths(
-            Paths(
-                name=paths.name,
-                tag=paths.tag + "[base]",
-                path_prefix=paths.path_prefix,
-                remove_files=paths.remove_files,
-            )
-        )
-        self.perturbed_search = search.copy_with_paths(
-            Paths(
-                name=paths.name,
-                tag=paths.tag + "[perturbed]",
-                path_prefix=paths.path_prefix,
-                remove_files=paths.remove_files,
+    def perform(self) -> FitJobResult:
+        return FitJobResult(
+            number=self.number,
+            index=self.index,
+            result=self.search.fit(
+                model=self.model,
+                analysis=self.analysis
             )
         )
 
-    def perform(self) -> JobResult:
-        """
-        - Create one model with a perturbation and another without
-        - Fit each model against the perturbed image
-
-        Returns
-        -------
-        An object comprising the results of the two fits
-        """
-        result = self.search.fit(
-            model=self.model,
-            analysis=self.analysis
-        )
 
-        perturbed_model = copy(self.model)
-        perturbed_model.perturbation = self.perturbation_model
+def dataset_key_from(dataset) -> str:
+    """
+    A hash of a simulated dataset, which is the same for perturbations whose datasets are
+    identical so that they share the fit of the base model.
 
-        perturbed_result = self.perturbed_search.fit(
-            model=perturbed_model,
-            analysis=self.analysis
-        )
-        return JobResult(
-            number=self.number,
-            result=result,
-            perturbed_result=perturbed_result
-        )
+    A dataset which cannot be pickled is not shared.
+    """
+    try:
+        return hashlib.sha1(pickle.dumps(dataset)).hexdigest()
+    except (pickle.PicklingError, TypeError, AttributeError):
+        return uuid.uuid4().hex
 
 
 class SensitivityResult:
 
     def __init__(self, results: List[JobResult]):
 
-        self.results = sorted(results)
+        # Results collected through a job queue were numbered by the node which performed them, so results are
+        # ordered by the index of their perturbation where it is known.
+
+        if all(result.index is not None for result in results):
+            self.results = sorted(results, key=lambda result: result.index)
+        else:
+            self.results = sorted(results)
 
     def __getitem__(self, item):
         return self.results[item]
@@ -138,7 +179,8 @@ class Sensitivity:
             analysis_class: Type[Analysis],
             search: NonLinearSearch,
             step_size: Union[Tuple[float], float] = 0.1,
-            number_of_cores: int = 2
+            number_of_cores: int = 2,
+            job_queue: FileJobQueue = None
     ):
         """
         Perform sensitivity mapping to evaluate whether a perturbation
@@ -173,7 +215,11 @@ class Sensitivity:
             with a perturbation_model of dimension 3 would give (1 / 0.5) ^ 3 = 8
             distinct perturbations.
         number_of_cores
-            How many cores does this computer have? Minimum 2.
+            How many cores does this computer have? A process is started on each core.
+        job_queue
+            If input, the fits are run through a queue on a shared filesystem, so that the
+            same sensitivity map can be run on several nodes which each fit perturbations
+            and every node returns the complete result.
         """
         self.instance = base_instance
         self.model = base_model
@@ -185,19 +231,137 @@ class Sensitivity:
         self.perturbation_model = perturbation_model
         self.simulate_function = simulate_function
         self.number_of_cores = number_of_cores
+        self.job_queue = job_queue
+
+    @property
+    def cells_path(self) -> str:
+        """
+        The folder the result of every perturbation is pickled to as it completes.
+        """
+        return path.join(
+            self.search.paths.output_path,
+            "cells"
+        )
+
+    def _cell_filename(self, label: str) -> str:
+        return path.join(
+            self.cells_path,
+            f"{label}.pickle"
+        )
 
     def run(self) -> SensitivityResult:
         """
         Run fits and comparisons for all perturbations, returning
         a list of results.
+
+        The fits of the base model and of the model with a perturbation are
+        separate jobs, so the two fits of a perturbation are run concurrently.
+        Perturbations whose simulated datasets are identical (for example if the
+        simulate function does not depend on the perturbation) share one fit of
+        the base model, which is performed in the folder of the first of them.
+
+        The result of every perturbation is pickled to the cells folder as soon
+        as both of its fits complete, so if the sensitivity map is run again only
+        perturbations without a result are fitted.
         """
-        results = list()
-        for result in Process.run_jobs(
-                self._make_jobs(),
+        os.makedirs(self.cells_path, exist_ok=True)
+
+        labels = {}
+        keys = {}
+
+        base_results = {}
+        perturbed_results = {}
+        waiting = defaultdict(list)
+
+        results = {}
+
+        def make_jobs():
+            submitted = set()
+
+            for index, label, search, dataset in self._perturbations():
+
+                labels[index] = label
+                keys[index] = dataset_key_from(dataset)
+
+                try:
+                    with open(self._cell_filename(label), "rb") as f:
+                        results[index] = pickle.load(f)
+                    base_results.setdefault(keys[index], results[index].result)
+                    continue
+                except (OSError, EOFError, pickle.UnpicklingError):
+                    pass
+
+                analysis = self.analysis_class(dataset)
+
+                if keys[index] not in submitted and keys[index] not in base_results:
+                    submitted.add(keys[index])
+                    yield FitJob(
+                        analysis=analysis,
+                        model=self.model,
+                        search=search_with_tag_suffix(search, "[base]"),
+                        index=f"base_{index}"
+                    )
+
+                yield FitJob(
+                    analysis=analysis,
+                    model=perturbed_model_from(self.model, self.perturbation_model),
+                    search=search_with_tag_suffix(search, "[perturbed]"),
+                    index=f"perturbed_{index}"
+                )
+
+        if self.job_queue is not None:
+            fit_results = self.job_queue.run_jobs(
+                make_jobs(),
+                name=path.join(self.search.paths.name, "sensitivity"),
                 number_of_cores=self.number_of_cores
-        ):
-            results.append(result)
-        return SensitivityResult(results)
+            )
+        else:
+            fit_results = Process.run_jobs(
+                make_jobs(),
+                number_of_cores=self.number_of_cores
+            )
+
+        for fit_result in fit_results:
+
+            fit, index = fit_result.index.split("_")
+            index = int(index)
+            key = keys[index]
+
+            if fit == "base":
+                base_results[key] = fit_result.result
+                completed = waiting.pop(key, [])
+            else:
+                perturbed_results[index] = fit_result.result
+                waiting[key].append(index)
+                completed = waiting.pop(key) if key in base_results else []
+
+            for completed_index in completed:
+                results[completed_index] = self._output_result(
+                    JobResult(
+                        number=completed_index,
+                        result=base_results[keys[completed_index]],
+                        perturbed_result=perturbed_results.pop(completed_index),
+                        index=completed_index
+                    ),
+                    label=labels[completed_index]
+                )
+
+        return SensitivityResult([results[index] for index in sorted(results)])
+
+    def _output_result(self, result: JobResult, label: str) -> JobResult:
+        """
+        Pickle the result of a perturbation to the cells folder, replacing the file atomically
+        so that an interrupted sensitivity map never leaves a partial result.
+        """
+        filename = self._cell_filename(label)
+        temporary_filename = f"{filename}.{uuid.uuid4().hex}"
+
+        with open(temporary_filename, "wb") as f:
+            pickle.dump(result, f)
+
+        os.replace(temporary_filename, filename)
+
+        return result
 
     @property
     def _lists(self) -> List[List[float]]:
@@ -294,27 +458,20 @@ class Sensitivity:
 
         return search_instance
 
-    def _make_jobs(self) -> Generator[Job, None, None]:
+    def _perturbations(self) -> Generator[
+        Tuple[int, str, NonLinearSearch, object], None, None
+    ]:
         """
-        Create a list of jobs to be run on separate processes.
-
-        Each job fits a perturbed image with the original model
-        and a model which includes a perturbation.
+        The index, label, search and simulated dataset of every perturbation.
         """
-        for perturbation_instance, search in zip(
+        for index, (perturbation_instance, label, search) in enumerate(zip(
                 self._perturbation_instances,
+                self._labels,
                 self._searches
-        ):
+        )):
             instance = copy(self.instance)
             instance.perturbation = perturbation_instance
             dataset = self.simulate_function(
                 instance
             )
-            yield Job(
-                analysis=self.analysis_class(
-                    dataset
-                ),
-                model=self.model,
-                perturbation_model=self.perturbation_model,
-                search=search
-            )
+            yield index, label, search, dataset
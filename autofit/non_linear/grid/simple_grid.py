@@ -1,13 +1,41 @@
+import multiprocessing
 from copy import copy
 
+import numpy as np
+
 import autofit as af
 from autofit.mock.mock import MockSamples
-from autofit.non_linear.grid.grid_search import make_lists
+from autofit.non_linear.grid.grid_search import grid_shape, unit_grid_chunks
+
+
+def log_likelihoods_from_vectors(model, analysis, vectors) -> np.ndarray:
+    """
+    The log likelihoods of a chunk of physical vectors, where an analysis which evaluates batches of instances (see
+    `Analysis.log_likelihoods_from_instances`) is passed the instances of the chunk in one call. This is a module level
+    function so that it can be pickled and passed to a pool.
+    """
+    instances = [model.instance_from_vector(list(vector)) for vector in vectors]
+
+    if getattr(analysis, "has_batch_log_likelihood", False):
+        return np.asarray(analysis.log_likelihoods_from_instances(instances), dtype="float")
+
+    return np.asarray([analysis.log_likelihood_function(instance) for instance in instances], dtype="float")
 
 
 class GridSearch:
-    def __init__(self, step_size=0.5):
+    def __init__(self, step_size=0.5, number_of_cores=1, chunk_size=10000):
+        """
+        A search which evaluates the log likelihood at every point of a grid over the unit hypercube of the model.
+
+        The grid is generated in chunks of *chunk_size* points, which are mapped to physical values by the priors of
+        the model at once and evaluated as a batch, in parallel on *number_of_cores* processes if it is above 1.
+
+        The log likelihood of every point is kept in the result as the array log_likelihood_surface, which has one
+        axis per parameter of the model so can be plotted.
+        """
         self.step_size = step_size
+        self.number_of_cores = number_of_cores
+        self.chunk_size = chunk_size
         self.paths = af.Paths()
 
     def copy_with_paths(self, paths):
@@ -20,31 +48,63 @@ class GridSearch:
             model: af.AbstractPriorModel,
             analysis: af.Analysis
     ):
-        best_likelihood = float("-inf")
-        best_instance = None
+        shape = grid_shape(model.prior_count, self.step_size)
+
+        likelihoods = np.full(int(np.prod(shape)), np.nan)
 
-        likelihoods = list()
+        pool = multiprocessing.Pool(self.number_of_cores) if self.number_of_cores > 1 else None
 
-        for list_ in make_lists(
+        try:
+
+            start = 0
+
+            for unit_vectors in unit_grid_chunks(
+                    no_dimensions=model.prior_count,
+                    step_size=self.step_size,
+                    chunk_size=self.chunk_size
+            ):
+                vectors = model.vectors_from_unit_vectors(unit_vectors)
+
+                if pool is None:
+                    chunk_likelihoods = log_likelihoods_from_vectors(model, analysis, vectors)
+                else:
+                    chunk_likelihoods = np.concatenate(pool.starmap(
+                        log_likelihoods_from_vectors,
+                        [
+                            (model, analysis, chunk)
+                            for chunk in np.array_split(vectors, self.number_of_cores)
+                            if len(chunk) > 0
+                        ]
+                    ))
+
+                likelihoods[start:start + len(vectors)] = chunk_likelihoods
+                start += len(vectors)
+
+        finally:
+            if pool is not None:
+                pool.close()
+                pool.join()
+
+        best_instance = None
+
+        if np.any(likelihoods > -np.inf):
+            best_unit_vector = next(unit_grid_chunks(
                 no_dimensions=model.prior_count,
-                step_size=self.step_size
-        ):
-            instance = model.instance_from_unit_vector(
-                list_
-            )
-            likelihood = analysis.log_likelihood_function(
-                instance
+                step_size=self.step_size,
+                chunk_size=1,
+                start=int(np.nanargmax(likelihoods))
+            ))[0]
+            best_instance = model.instance_from_unit_vector(
+                list(best_unit_vector)
             )
-            likelihoods.append(likelihood)
-            if likelihood > best_likelihood:
-                best_likelihood = likelihood
-                best_instance = instance
 
-        return af.Result(
+        result = af.Result(
             samples=MockSamples(
                 max_log_likelihood_instance=best_instance,
-                log_likelihoods=likelihoods,
+                log_likelihoods=likelihoods.tolist(),
                 gaussian_tuples=None
             ),
             previous_model=model
-        )
\ No newline at end of file
+        )
+        result.log_likelihood_surface = likelihoods.reshape(shape)
+        return result
@@ -1,3 +1,5 @@
+from functools import partial
+
 from autoconf import conf
 from autofit import exc
 
@@ -46,11 +48,17 @@ class Initializer:
                 lower_limit=ball_lower_limit, upper_limit=ball_upper_limit
             )
 
-    def initial_samples_from_model(self, total_points, model, fitness_function):
+    def initial_samples_from_model(self, total_points, model, fitness_function, pool=None):
         """
         Generate the initial points of the non-linear search, by randomly drawing unit values from a uniform
         distribution between the ball_lower_limit and ball_upper_limit values.
 
+        Points are proposed in batches, which are mapped to physical values via the vectorized prior transform of the
+        model and filtered by the prior limits before any likelihood is evaluated. The remaining points are evaluated in
+        parallel via the search's pool (if one is input). Each batch is oversampled based on the fraction of points
+        accepted so far, so that points which are rejected (e.g. because a `FitException` is raised) are absorbed
+        without evaluating the remaining points one by one.
+
         Parameters
         ----------
         total_points : int
@@ -58,6 +66,10 @@ class Initializer:
         model : ModelMapper
             An object that represents possible instances of some model with a given dimensionality which is the number
             of free dimensions of the model.
+        fitness_function
+            The fitness function of the search, whose figure of merit is computed for every initial point.
+        pool : multiprocessing.Pool
+            The pool of the search, which if input is used to evaluate the figure of merit of points in parallel.
         """
 
         if conf.instance["general"]["test"]["test_mode"]:
@@ -65,33 +77,51 @@ class Initializer:
 
         logger.info("Generating initial samples of model, which are subject to prior limits and other constraints.")
 
+        processes = pool._processes if pool is not None else 1
+
         initial_unit_parameters = []
         initial_parameters = []
         initial_figures_of_merit = []
 
-        point_index = 0
+        total_proposed = 0
+        total_accepted = 0
 
-        while point_index < total_points:
+        while len(initial_parameters) < total_points:
 
-            unit_parameters = model.random_unit_vector_within_limits(
-                lower_limit=self.lower_limit, upper_limit=self.upper_limit
+            points_remaining = total_points - len(initial_parameters)
+
+            acceptance = max(total_accepted / total_proposed, 0.01) if total_proposed > 0 else 1.0
+
+            total_proposals = int(np.ceil(points_remaining / acceptance))
+            total_proposals = processes * int(np.ceil(total_proposals / processes))
+
+            unit_parameters = np.random.uniform(
+                low=self.lower_limit, high=self.upper_limit, size=(total_proposals, model.prior_count)
             )
-            parameters = model.vector_from_unit_vector(unit_vector=unit_parameters)
+            parameters = model.vectors_from_unit_vectors(unit_vectors=unit_parameters)
 
-            try:
-                figure_of_merit = fitness_function.figure_of_merit_from_parameters(
-                    parameters=parameters
-                )
+            within_limits = model.vectors_within_prior_limits(vectors=parameters)
+
+            unit_parameters = unit_parameters[within_limits]
+            parameters = parameters[within_limits]
+
+            figures_of_merit = figures_of_merit_from_parameters(
+                fitness_function=fitness_function, parameters=parameters, pool=pool
+            )
+
+            is_valid = ~np.isnan(figures_of_merit)
 
-                if np.isnan(figure_of_merit):
-                    raise exc.FitException
+            total_proposed += total_proposals
+            total_accepted += int(np.sum(is_valid))
 
-                initial_unit_parameters.append(unit_parameters)
-                initial_parameters.append(parameters)
+            for unit_vector, vector, figure_of_merit in zip(
+                    unit_parameters[is_valid][:points_remaining],
+                    parameters[is_valid][:points_remaining],
+                    figures_of_merit[is_valid][:points_remaining],
+            ):
+                initial_unit_parameters.append(list(unit_vector))
+                initial_parameters.append(list(vector))
                 initial_figures_of_merit.append(figure_of_merit)
-                point_index += 1
-            except exc.FitException:
-                pass
 
         return initial_unit_parameters, initial_parameters, initial_figures_of_merit
 
@@ -133,6 +163,79 @@ class Initializer:
 
         return initial_unit_parameters, initial_parameters, initial_figures_of_merit
 
+
+def _figure_of_merit_from_parameters(fitness_function, parameters):
+    """
+    Compute the figure of merit of a point, returning NaN if it is rejected by a `FitException`. This is a module
+    level function so that it can be pickled and passed to a pool.
+    """
+    try:
+        return fitness_function.figure_of_merit_from_parameters(parameters=list(parameters))
+    except exc.FitException:
+        return np.nan
+
+
+def _log_likelihoods_from_parameters(fitness_function, parameters):
+    """
+    Compute the log likelihoods of a chunk of points in one process. This is a module level function so that it can be
+    pickled and passed to a pool.
+    """
+    return fitness_function.log_likelihoods_from_parameters(parameters=parameters)
+
+
+def log_likelihoods_from_parameters(fitness_function, parameters, pool=None):
+    """
+    Compute the log likelihoods of a batch of points, where points rejected by a `FitException` have a log likelihood of
+    NaN.
+
+    If a pool is input the batch is split into one chunk per process, so the fitness function is sent to the pool once
+    per process rather than once per point, and every chunk is evaluated as a batch on its process.
+
+    Parameters
+    ----------
+    fitness_function
+        The fitness function of the search, whose log likelihood is computed for every point.
+    parameters : np.ndarray
+        An array of shape (total_points, prior_count) of physical parameter values.
+    pool : multiprocessing.Pool
+        The pool used to evaluate the points in parallel, where points are evaluated serially if this is None.
+    """
+    parameters = np.asarray(parameters, dtype="float")
+
+    if pool is None or len(parameters) <= 1:
+        return fitness_function.log_likelihoods_from_parameters(parameters=parameters)
+
+    chunks = [chunk for chunk in np.array_split(parameters, pool._processes) if len(chunk) > 0]
+
+    return np.concatenate(pool.map(partial(_log_likelihoods_from_parameters, fitness_function), chunks))
+
+
+def figures_of_merit_from_parameters(fitness_function, parameters, pool=None):
+    """
+    Compute the figure of merit of a batch of points, in parallel if a pool is input.
+
+    Points which are rejected by a `FitException` are given a figure of merit of NaN.
+
+    Parameters
+    ----------
+    fitness_function
+        The fitness function of the search, whose figure of merit is computed for every point.
+    parameters : np.ndarray
+        An array of shape (total_points, prior_count) of physical parameter values.
+    pool : multiprocessing.Pool
+        The pool used to evaluate the points in parallel, where points are evaluated serially if this is None.
+    """
+    func = partial(_figure_of_merit_from_parameters, fitness_function)
+
+    if pool is None or len(parameters) <= 1:
+        figures_of_merit = list(map(func, parameters))
+    else:
+        chunksize = int(np.ceil(len(parameters) / pool._processes))
+        figures_of_merit = pool.map(func, parameters, chunksize=chunksize)
+
+    return np.asarray(figures_of_merit, dtype="float")
+
+
 class InitializerPrior(Initializer):
     def __init__(self):
         """
@@ -172,3 +275,149 @@ class InitializerBall(Initializer):
         """
 
         super().__init__(lower_limit=lower_limit, upper_limit=upper_limit)
+
+
+class InitializerFromSamples(Initializer):
+    def __init__(self, samples, reuse_log_likelihoods=False, parameter_names=None):
+        """
+        The Initializer creates the initial set of samples in non-linear parameter space that can be passed into a
+        `NonLinearSearch` to define where to begin sampling.
+
+        The InitializerFromSamples class warm-starts a search from the samples of a previous search (e.g. the
+        `Samples` of a `Result` of an earlier phase). Samples are drawn without replacement, weighted by their sample
+        weights, and their values are mapped into the new model's parameter space by the path of every parameter.
+        Parameters which are not in the previous samples are drawn from their priors, as are any further points if
+        the previous samples cannot provide enough points within the new model's prior limits.
+
+        This is intended for MCMC and optimizer searches (e.g. Emcee, PySwarms). Nested samplers require their live
+        points to be drawn from the prior for the Bayesian evidence to be valid, so should not be warm-started.
+
+        Parameters
+        ----------
+        samples : Samples
+            The samples of the previous search the initial points are drawn from.
+        reuse_log_likelihoods : bool
+            If `True`, the log likelihoods of the previous samples are reused rather than re-evaluated, which is only
+            valid if the model and analysis are unchanged. They are only reused if every parameter of the new model is
+            in the previous samples.
+        parameter_names : [str]
+            If input, only the parameters with these names are taken from the previous samples, with all other
+            parameters drawn from their priors (e.g. the grid parameters of a cell of a grid search warm-started from
+            the samples of a neighbouring cell).
+        """
+        super().__init__(lower_limit=0.0, upper_limit=1.0)
+
+        self.samples = samples
+        self.reuse_log_likelihoods = reuse_log_likelihoods
+        self.parameter_names = parameter_names
+
+    def initial_samples_from_model(self, total_points, model, fitness_function, pool=None):
+        """
+        Generate the initial points of the non-linear search by drawing weighted samples from the previous search,
+        filling any parameters or points the previous samples cannot provide from the priors.
+
+        Parameters
+        ----------
+        total_points : int
+            The number of points in non-linear paramemter space which initial points are created for.
+        model : ModelMapper
+            An object that represents possible instances of some model with a given dimensionality which is the number
+            of free dimensions of the model.
+        fitness_function
+            The fitness function of the search, whose figure of merit is computed for every initial point.
+        pool : multiprocessing.Pool
+            The pool of the search, which if input is used to evaluate the figure of merit of points in parallel.
+        """
+
+        if conf.instance["general"]["test"]["test_mode"]:
+            return self.initial_samples_in_test_mode(total_points=total_points, model=model)
+
+        logger.info("Generating initial samples of model from the samples of a previous search.")
+
+        names = model.model_component_and_parameter_names
+        samples = self.samples.samples
+
+        weights = np.asarray(
+            [sample.weights if sample.weights is not None else 1.0 for sample in samples], dtype="float"
+        )
+
+        non_zero = np.where(weights > 0.0)[0]
+
+        indexes = np.random.choice(
+            non_zero,
+            size=min(total_points, len(non_zero)),
+            replace=False,
+            p=weights[non_zero] / np.sum(weights[non_zero]),
+        )
+
+        unit_parameters = np.random.uniform(low=0.0, high=1.0, size=(len(indexes), model.prior_count))
+        parameters = model.vectors_from_unit_vectors(unit_vectors=unit_parameters)
+
+        is_known = np.asarray(
+            [
+                name in samples[0].kwargs and (self.parameter_names is None or name in self.parameter_names)
+                for name in names
+            ],
+            dtype="bool",
+        )
+
+        for point, index in enumerate(indexes):
+            for parameter, name in enumerate(names):
+                if is_known[parameter]:
+                    parameters[point, parameter] = samples[index].kwargs[name]
+
+        unit_parameters[:, is_known] = model.unit_vectors_from_vectors(vectors=parameters)[:, is_known]
+
+        within_limits = model.vectors_within_prior_limits(vectors=parameters) & np.all(
+            (unit_parameters >= 0.0) & (unit_parameters <= 1.0), axis=1
+        )
+
+        indexes = indexes[within_limits]
+        unit_parameters = unit_parameters[within_limits]
+        parameters = parameters[within_limits]
+
+        figures_of_merit = None
+
+        if self.reuse_log_likelihoods and np.all(is_known):
+            try:
+                figures_of_merit = np.asarray(
+                    [
+                        fitness_function.figure_of_merit_from_log_likelihood(
+                            parameters=list(vector), log_likelihood=samples[index].log_likelihood
+                        )
+                        for vector, index in zip(parameters, indexes)
+                    ],
+                    dtype="float",
+                )
+            except NotImplementedError:
+                pass
+
+        if figures_of_merit is None:
+            figures_of_merit = figures_of_merit_from_parameters(
+                fitness_function=fitness_function, parameters=parameters, pool=pool
+            )
+
+        is_valid = ~np.isnan(figures_of_merit)
+
+        initial_unit_parameters = [list(unit_vector) for unit_vector in unit_parameters[is_valid]]
+        initial_parameters = [list(vector) for vector in parameters[is_valid]]
+        initial_figures_of_merit = list(figures_of_merit[is_valid])
+
+        points_remaining = total_points - len(initial_parameters)
+
+        if points_remaining > 0:
+
+            logger.info(
+                f"{points_remaining} initial samples could not be drawn from the previous search, "
+                f"drawing them from the priors."
+            )
+
+            prior_unit_parameters, prior_parameters, prior_figures_of_merit = super().initial_samples_from_model(
+                total_points=points_remaining, model=model, fitness_function=fitness_function, pool=pool
+            )
+
+            initial_unit_parameters += prior_unit_parameters
+            initial_parameters += prior_parameters
+            initial_figures_of_merit += prior_figures_of_merit
+
+        return initial_unit_parameters, initial_parameters, initial_figures_of_merit
@@ -1,5 +1,7 @@
 import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from typing import List
 
 import emcee
@@ -9,6 +11,9 @@ from autofit import exc
 from autofit.mapper.model_mapper import ModelMapper
 from autofit.mapper.prior_model.abstract import AbstractPriorModel
 from autofit.non_linear import samples as samp
+from autofit.non_linear import profiling
+from autofit.non_linear import tracing
+from autofit.non_linear.initializer import log_likelihoods_from_parameters
 from autofit.non_linear.log import logger
 from autofit.non_linear.mcmc.abstract_mcmc import AbstractMCMC
 from autofit.non_linear.paths import convert_paths
@@ -31,6 +36,8 @@ class Emcee(AbstractMCMC):
             auto_correlation_change_threshold=None,
             iterations_per_update=None,
             number_of_cores=None,
+            ensembles=None,
+            vectorize=None,
     ):
         """ An Emcee non-linear search.
 
@@ -50,6 +57,12 @@ class Emcee(AbstractMCMC):
           close to one another in parameter space, as recommended in the Emcee documentation
           (https://emcee.readthedocs.io/en/stable/user/faq/).
 
+        - Provides the option to run several independent ensembles, whose chains are compared by the Gelman-Rubin
+          statistic after every update as a multi-chain convergence diagnostic.
+
+        - Provides the option to run Emcee vectorized, where every step passes the walkers it moves to the fitness
+          function as one batch (see `Analysis.log_likelihoods_from_instances`).
+
         If you use *Emcee* as part of a published work, please cite the package following the instructions under the
         *Attribution* section of the GitHub page.
 
@@ -82,7 +95,20 @@ class Emcee(AbstractMCMC):
             The threshold value by which if the change in auto_correlations is below sampling will be terminated early.
         number_of_cores : int
             The number of cores Emcee sampling is performed using a Python multiprocessing Pool instance. If 1, a
-            pool instance is not created and the job runs in serial.
+            pool instance is not created and the job runs in serial. Walkers are sent to the pool in one chunk per
+            process.
+        ensembles : int
+            The number of independent ensembles of *nwalkers* walkers. The samples of the search are those of the
+            first ensemble, which is output to emcee.hdf, with the other ensembles output to emcee_1.hdf, emcee_2.hdf,
+            etc. and used to compute the Gelman-Rubin statistic of every parameter (see `gelman_rubin_from_chains`),
+            which is output to the file ensembles.json in the samples folder.
+
+            Ensembles are only sampled in parallel with a pool (*number_of_cores* > 1), where a thread per ensemble
+            sends the walkers of its steps to the pool, so the pool evaluates the walkers of every ensemble at the
+            same time. The threads only overlap this dispatch, so without a pool the ensembles are sampled one after
+            another.
+        vectorize : bool
+            If `True`, Emcee is vectorized and every step evaluates the walkers it moves as one batch.
 
         All remaining attributes are emcee parameters and described at the emcee API webpage:
 
@@ -130,6 +156,19 @@ class Emcee(AbstractMCMC):
             else number_of_cores
         )
 
+        self.ensembles = (
+            self._config("search", "ensembles") if ensembles is None else ensembles
+        )
+        self.vectorize = (
+            self._config("parallel", "vectorize") if vectorize is None else vectorize
+        )
+
+        if self.ensembles > 1 and self.number_of_cores == 1:
+            logger.warning(
+                f"Emcee samples {self.ensembles} ensembles one after another, as number_of_cores is 1. Set "
+                f"number_of_cores above 1 to sample the ensembles in parallel."
+            )
+
         logger.debug("Creating Emcee NLO")
 
     class Fitness(AbstractMCMC.Fitness):
@@ -148,6 +187,39 @@ class Emcee(AbstractMCMC):
             except exc.FitException:
                 raise exc.FitException
 
+        def figure_of_merit_from_log_likelihood(self, parameters, log_likelihood):
+            return log_likelihood + sum(self.model.log_priors_from_vector(vector=parameters))
+
+        def log_posteriors_from_parameters(self, parameters, pool=None):
+            """
+            Compute the log posterior of a batch of walkers, which vectorized *Emcee* passes for the walkers moved by
+            every step, in parallel if a pool is input.
+
+            Walkers outside the limits of the priors are given the resample figure of merit without making their
+            instances, the log likelihoods of the other walkers are evaluated in one chunk per process (see
+            `log_likelihoods_from_parameters`) and their log priors are computed for the whole batch at once.
+            """
+            parameters = np.asarray(parameters, dtype="float")
+
+            log_posteriors = np.full(len(parameters), self.resample_figure_of_merit)
+
+            within_limits = self.model.vectors_within_prior_limits(vectors=parameters)
+
+            if not np.any(within_limits):
+                return log_posteriors
+
+            log_likelihoods = log_likelihoods_from_parameters(
+                fitness_function=self, parameters=parameters[within_limits], pool=pool
+            )
+
+            with profiling.section("log_priors"):
+                log_priors = self.model.log_priors_from_vectors(vectors=parameters[within_limits])
+
+            log_posteriors[within_limits] = log_likelihoods + log_priors
+            log_posteriors[np.isnan(log_posteriors)] = self.resample_figure_of_merit
+
+            return log_posteriors
+
     def _fit(self, model: AbstractPriorModel, analysis, log_likelihood_cap=None):
         """
         Fit a model using Emcee and the Analysis class which contains the data and returns the log likelihood from
@@ -167,25 +239,25 @@ class Emcee(AbstractMCMC):
         chains used by the fit.
         """
 
-        pool, pool_ids = self.make_pool()
+        pool = self.make_pool()
 
-        fitness_function = self.fitness_function_from_model_and_analysis(
-            model=model, analysis=analysis, pool_ids=pool_ids
-        )
+        fitness_functions = [
+            self.fitness_function_from_model_and_analysis(model=model, analysis=analysis)
+            for _ in range(self.ensembles)
+        ]
 
-        emcee_sampler = emcee.EnsembleSampler(
-            nwalkers=self.nwalkers,
-            ndim=model.prior_count,
-            log_prob_fn=fitness_function.__call__,
-            backend=emcee.backends.HDFBackend(
-                filename=self.paths.samples_path + "/emcee.hdf"
-            ),
-            pool=pool,
-        )
+        emcee_samplers = [
+            self.sampler_from_model_and_fitness(
+                model=model, fitness_function=fitness_function, ensemble=ensemble, pool=pool
+            )
+            for ensemble, fitness_function in enumerate(fitness_functions)
+        ]
+
+        emcee_sampler = emcee_samplers[0]
 
         try:
 
-            emcee_state = emcee_sampler.get_last_sample()
+            emcee_sampler.get_last_sample()
             samples = self.samples_via_sampler_from_model(model=model)
 
             total_iterations = emcee_sampler.iteration
@@ -199,23 +271,18 @@ class Emcee(AbstractMCMC):
 
         except AttributeError:
 
-            initial_unit_parameters, initial_parameters, initial_log_posteriors = self.initializer.initial_samples_from_model(
-                total_points=emcee_sampler.nwalkers,
-                model=model,
-                fitness_function=fitness_function,
-            )
-
-            emcee_state = np.zeros(shape=(emcee_sampler.nwalkers, model.prior_count))
-
             logger.info("No Emcee samples found, beginning new non-linear search.")
 
-            for index, parameters in enumerate(initial_parameters):
-
-                emcee_state[index, :] = np.asarray(parameters)
-
             total_iterations = 0
             iterations_remaining = self.nsteps
 
+        emcee_states = [
+            self.emcee_state_from(
+                emcee_sampler=ensemble_sampler, model=model, fitness_function=fitness_function, pool=pool
+            )
+            for ensemble_sampler, fitness_function in zip(emcee_samplers, fitness_functions)
+        ]
+
         while iterations_remaining > 0:
 
             if self.iterations_per_update > iterations_remaining:
@@ -223,31 +290,148 @@ class Emcee(AbstractMCMC):
             else:
                 iterations = self.iterations_per_update
 
-            for sample in emcee_sampler.sample(
-                    initial_state=emcee_state,
-                    iterations=iterations,
-                    progress=True,
-                    skip_initial_state_check=True,
-                    store=True,
-            ):
-
-                pass
+            iterations = self.budget.iterations_within_budget(
+                iterations=iterations, evaluations_per_iteration=self.nwalkers * self.ensembles
+            )
 
-            emcee_state = emcee_sampler.get_last_sample()
+            with tracing.span(name="sampler", iterations=iterations, ensembles=self.ensembles):
+
+                if pool is None or self.ensembles == 1:
+                    emcee_states = [
+                        self.run_ensemble(ensemble_sampler, emcee_state, iterations, progress=ensemble == 0)
+                        for ensemble, (ensemble_sampler, emcee_state) in enumerate(zip(emcee_samplers, emcee_states))
+                    ]
+                else:
+                    with ThreadPoolExecutor(max_workers=self.ensembles) as executor:
+                        emcee_states = list(
+                            executor.map(
+                                self.run_ensemble,
+                                emcee_samplers,
+                                emcee_states,
+                                [iterations] * self.ensembles,
+                                [True] + [False] * (self.ensembles - 1),
+                            )
+                        )
 
             total_iterations += iterations
             iterations_remaining = self.nsteps - total_iterations
 
+            self.budget.add_evaluations(evaluations=iterations * self.nwalkers * self.ensembles)
+
             samples = self.perform_update(
                 model=model, analysis=analysis, during_analysis=True
             )
 
+            if self.ensembles > 1:
+                self.output_ensembles(model=model, emcee_samplers=emcee_samplers)
+
+            if self.metrics.enabled:
+
+                auto_correlation_progress = float(
+                    np.min(samples.total_samples / (samples.auto_correlation_times * samples.auto_correlation_required_length))
+                )
+
+                if np.isfinite(auto_correlation_progress):
+                    self.metrics.set_progress(auto_correlation_progress=auto_correlation_progress)
+
             if emcee_sampler.iteration % self.auto_correlation_check_size:
                 if samples.converged and self.auto_correlation_check_for_convergence:
                     iterations_remaining = 0
 
+            if iterations_remaining > 0 and self.budget.check():
+                break
+
         logger.info("Emcee sampling complete.")
 
+    def sampler_from_model_and_fitness(self, model, fitness_function, ensemble=0, pool=None):
+        """Make the *Emcee* sampler of an ensemble, whose backend is the file emcee.hdf for the first ensemble and
+        emcee_<ensemble>.hdf for the others.
+
+        If *Emcee* is vectorized the walkers of every step are passed to the fitness function as one batch, which
+        evaluates them in one chunk per process of the pool. Otherwise *Emcee* maps the fitness function over the
+        walkers with the pool, which is wrapped so that every process is sent one chunk of walkers."""
+        backend = emcee.backends.HDFBackend(filename=self.backend_filename(ensemble=ensemble))
+
+        if self.vectorize:
+            return emcee.EnsembleSampler(
+                nwalkers=self.nwalkers,
+                ndim=model.prior_count,
+                log_prob_fn=partial(fitness_function.log_posteriors_from_parameters, pool=pool),
+                backend=backend,
+                vectorize=True,
+            )
+
+        return emcee.EnsembleSampler(
+            nwalkers=self.nwalkers,
+            ndim=model.prior_count,
+            log_prob_fn=fitness_function.__call__,
+            backend=backend,
+            pool=None if pool is None else ChunkedPool(pool=pool),
+        )
+
+    def backend_filename(self, ensemble=0) -> str:
+        if ensemble == 0:
+            return self.paths.samples_path + "/emcee.hdf"
+        return self.paths.samples_path + f"/emcee_{ensemble}.hdf"
+
+    def emcee_state_from(self, emcee_sampler, model, fitness_function, pool=None):
+        """The state an ensemble resumes sampling from, which is the last sample of its backend or, if it has not
+        sampled yet, walkers drawn by the initializer."""
+        try:
+            return emcee_sampler.get_last_sample()
+        except AttributeError:
+            pass
+
+        initial_unit_parameters, initial_parameters, initial_log_posteriors = self.initializer.initial_samples_from_model(
+            total_points=emcee_sampler.nwalkers,
+            model=model,
+            fitness_function=fitness_function,
+            pool=pool,
+        )
+
+        emcee_state = np.zeros(shape=(emcee_sampler.nwalkers, model.prior_count))
+
+        for index, parameters in enumerate(initial_parameters):
+
+            emcee_state[index, :] = np.asarray(parameters)
+
+        return emcee_state
+
+    def run_ensemble(self, emcee_sampler, emcee_state, iterations, progress=True):
+        """Sample an ensemble for a number of iterations, returning its last state. The acceptance ratio of the
+        ensemble which shows its progress is exported to the live metrics after every step."""
+        for sample in emcee_sampler.sample(
+                initial_state=emcee_state,
+                iterations=iterations,
+                progress=progress,
+                skip_initial_state_check=True,
+                store=True,
+        ):
+
+            if progress:
+                self.metrics.set_progress(acceptance_ratio=float(np.mean(emcee_sampler.acceptance_fraction)))
+
+        return emcee_sampler.get_last_sample()
+
+    def output_ensembles(self, model, emcee_samplers):
+        """Output the Gelman-Rubin statistic of every parameter over the chains of every ensemble to the file
+        ensembles.json in the samples folder."""
+        gelman_rubin = gelman_rubin_from_chains(
+            chains=[emcee_sampler.get_chain() for emcee_sampler in emcee_samplers]
+        )
+
+        self.metrics.set_progress(gelman_rubin=float(np.max(gelman_rubin)))
+
+        with open(os.path.join(self.paths.samples_path, "ensembles.json"), "w") as outfile:
+            json.dump(
+                {
+                    "ensembles": len(emcee_samplers),
+                    "gelman_rubin": dict(zip(model.model_component_and_parameter_names, gelman_rubin.tolist())),
+                },
+                outfile,
+                indent=4,
+            )
+
     @property
     def tag(self):
         """Tag the output folder of the PySwarms non-linear search, according to the number of particles and
@@ -277,10 +461,12 @@ class Emcee(AbstractMCMC):
         copy.initializer = self.initializer
         copy.iterations_per_update = self.iterations_per_update
         copy.number_of_cores = self.number_of_cores
+        copy.ensembles = self.ensembles
+        copy.vectorize = self.vectorize
 
         return copy
 
-    def fitness_function_from_model_and_analysis(self, model, analysis, log_likelihood_cap=None, pool_ids=None):
+    def fitness_function_from_model_and_analysis(self, model, analysis, log_likelihood_cap=None):
 
         return Emcee.Fitness(
             paths=self.paths,
@@ -288,7 +474,11 @@ class Emcee(AbstractMCMC):
             analysis=analysis,
             samples_from_model=self.samples_via_sampler_from_model,
             log_likelihood_cap=log_likelihood_cap,
-            pool_ids=pool_ids,
+            best_fit=self.best_fit,
+            surrogate=self.surrogate,
+            profiler=self.profiler,
+            tracer=self.tracer,
+            metrics=self.metrics,
         )
 
     def samples_via_sampler_from_model(self, model):
@@ -335,6 +525,15 @@ class Emcee(AbstractMCMC):
             time=self.timer.time,
         )
 
+    def samples_snapshot_via_sampler_from_model(self, model):
+        """Create the `Samples` used by an update performed on the background thread.
+
+        The hdf5 backend cannot be read whilst *Emcee* is writing to it, therefore the samples use an in-memory copy
+        of the backend taken at the time of the update."""
+        samples = self.samples_via_sampler_from_model(model=model)
+        samples.backend = self.backend_snapshot
+        return samples
+
     def samples_via_csv_json_from_model(self, model):
 
         # TODO : Better design to remove repetition.
@@ -378,6 +577,63 @@ class Emcee(AbstractMCMC):
                 + self.paths.samples_path
             )
 
+    @property
+    def backend_snapshot(self) -> emcee.backends.Backend:
+        """An in-memory copy of the *Emcee* hdf5 backend, which is unaffected by the sampler continuing to write to the
+        hdf5 file."""
+        backend = self.backend
+
+        snapshot = emcee.backends.Backend()
+        snapshot.reset(nwalkers=backend.shape[0], ndim=backend.shape[1])
+        snapshot.chain = backend.get_chain()
+        snapshot.log_prob = backend.get_log_prob()
+        snapshot.accepted = backend.accepted
+        snapshot.iteration = backend.iteration
+
+        return snapshot
+
+
+class ChunkedPool:
+    def __init__(self, pool):
+        """
+        Wraps a pool, so that *Emcee* mapping its fitness function over the walkers sends every process of the pool
+        one chunk of walkers, which the fitness function is pickled with once, rather than many small chunks.
+        """
+        self.pool = pool
+
+    def map(self, func, iterable):
+
+        iterable = list(iterable)
+
+        return self.pool.map(func, iterable, chunksize=max(int(np.ceil(len(iterable) / self.pool._processes)), 1))
+
+
+def gelman_rubin_from_chains(chains) -> np.ndarray:
+    """
+    The Gelman-Rubin statistic (the potential scale reduction factor) of every parameter over the chains of several
+    independent ensembles, using the second half of every chain. Values close to 1 indicate the ensembles have
+    converged to the same distribution.
+
+    Parameters
+    ----------
+    chains : [np.ndarray]
+        The chain of every ensemble, of shape (total_steps, total_walkers, prior_count).
+    """
+    total_steps = min(len(chain) for chain in chains)
+
+    samples = np.asarray(
+        [chain[total_steps // 2:total_steps].reshape(-1, chain.shape[-1]) for chain in chains]
+    )
+
+    length = samples.shape[1]
+
+    within = np.mean(np.var(samples, axis=1, ddof=1), axis=0)
+    between = length * np.var(np.mean(samples, axis=1), axis=0, ddof=1)
+
+    variance = (length - 1) / length * within + between / length
+
+    return np.sqrt(variance / within)
+
 
 class EmceeSamples(MCMCSamples):
 
@@ -0,0 +1,357 @@
+import json
+import math
+import os
+import resource
+import shutil
+import threading
+import time
+from os import path
+
+from autofit.non_linear.log import logger
+from autofit.non_linear.per_process import PerProcess
+
+
+def memory_usage() -> int:
+    """
+    The resident memory of this process in bytes, or its peak resident memory if the current value is not available
+    on this platform.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+class Metrics(PerProcess):
+    def __init__(self, enabled=False, interval=10.0, format="prometheus"):
+        """
+        Exports live metrics of a `NonLinearSearch` to a machine-readable file in its output folder, so that a long
+        running search can be monitored without parsing its logs.
+
+        The file is written by a background timer thread every *interval* seconds, independently of the updates of
+        the search, and contains:
+
+        - The number of log likelihood evaluations and the evaluation rate over the last interval.
+        - The maximum log likelihood evaluated so far.
+        - The utilisation of the cores, which is the fraction of the last interval the processes spent evaluating the
+          log likelihood function.
+        - The resident memory of every process.
+        - Progress measures a search reports, for example the acceptance ratio and autocorrelation progress of an MCMC
+          or the estimated remaining log evidence (dlogz) of a nested sampler.
+
+        Every process of a parallel search outputs its counters to the metrics folder in the samples folder at most
+        every *interval* seconds, which the timer thread sums.
+
+        If *format* is "prometheus" the file metrics.prom is replaced atomically with the Prometheus text exposition
+        format of the current metrics. If it is "ndjson" a line of JSON with the current metrics is appended to the
+        file metrics.ndjson.
+
+        Parameters
+        ----------
+        enabled : bool
+            Whether metrics are exported.
+        interval : float
+            The time in seconds between writes of the metrics file.
+        format : str
+            The format of the metrics file, "prometheus" or "ndjson".
+        """
+        if format not in ("prometheus", "ndjson"):
+            raise ValueError(f"The metrics format must be prometheus or ndjson, not {format}.")
+
+        self.enabled = enabled
+        self.interval = interval
+        self.format = format
+
+        self.run_id = None
+        self.metrics_path = None
+
+        self.output_path = None
+        self.name = None
+        self.number_of_cores = 1
+
+        self._main_pid = None
+        self._thread = None
+        self._stop_event = threading.Event()
+
+        self.reset()
+
+    def reset(self):
+
+        self.pid = os.getpid()
+
+        self.evaluations = 0
+        self.busy = 0.0
+        self.max_log_likelihood = -math.inf
+
+        self.last_output_time = time.time()
+
+        self.progress = {}
+
+        self._previous_snapshot = None
+
+    @property
+    def settings(self) -> dict:
+        return {"enabled": self.enabled, "interval": self.interval, "format": self.format}
+
+    @property
+    def process_attributes(self) -> dict:
+        return {"metrics_path": self.metrics_path}
+
+    @property
+    def process_run_id(self):
+        return self.run_id if self.enabled else None
+
+    @property
+    def filename(self) -> str:
+        extension = "prom" if self.format == "prometheus" else "ndjson"
+        return path.join(self.output_path, f"metrics.{extension}")
+
+    def start(self, paths, number_of_cores=1):
+        """
+        Start exporting the metrics of a run of the `NonLinearSearch`, starting the timer thread which writes the
+        metrics file.
+
+        Parameters
+        ----------
+        paths : af.Paths
+            Manages all paths, e.g. where the search outputs are stored, the samples, etc.
+        number_of_cores : int
+            The number of cores the search uses, which the utilisation is computed for.
+        """
+        self.stop()
+        self.reset()
+
+        self.unregister()
+
+        if not self.enabled:
+            return
+
+        self.register()
+        self.metrics_path = path.join(paths.samples_path, "metrics")
+        self.output_path = paths.output_path
+        self.name = paths.name
+        self.number_of_cores = number_of_cores
+
+        self._main_pid = os.getpid()
+
+        shutil.rmtree(self.metrics_path, ignore_errors=True)
+        os.makedirs(self.metrics_path, exist_ok=True)
+
+        self._stop_event.clear()
+
+        self._thread = threading.Thread(target=self._run, name="metrics", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop the timer thread, writing the metrics file a final time.
+        """
+        if self._thread is None:
+            return
+
+        self._stop_event.set()
+        self._thread.join()
+        self._thread = None
+
+        self.output()
+
+    def _run(self):
+
+        while not self._stop_event.wait(self.interval):
+            self.output()
+
+    def add_evaluation(self, log_likelihood, elapsed):
+        """
+        Count an evaluation of the log likelihood function by this process, outputting the counters of the process if
+        *interval* seconds have passed since they were last output.
+
+        Parameters
+        ----------
+        log_likelihood : float
+            The log likelihood of the evaluation.
+        elapsed : float
+            The time in seconds the evaluation took.
+        """
+        if not self.enabled:
+            return
+
+        if os.getpid() != self.pid:
+            self.reset()
+
+        self.evaluations += 1
+        self.busy += elapsed
+
+        if log_likelihood > self.max_log_likelihood:
+            self.max_log_likelihood = log_likelihood
+
+        if os.getpid() != self._main_pid and time.time() - self.last_output_time > self.interval:
+            self.output_counters()
+
+    def set_progress(self, **progress):
+        """
+        Set progress measures of the search (e.g. acceptance_ratio=0.3, dlogz=1.2), which are exported with the next
+        write of the metrics file.
+        """
+        if self.enabled:
+            self.progress.update(progress)
+
+    @property
+    def counters(self) -> dict:
+        return {
+            "evaluations": self.evaluations,
+            "busy": self.busy,
+            "max_log_likelihood": self.max_log_likelihood,
+            "memory": memory_usage(),
+        }
+
+    def output_counters(self):
+        """
+        Output the counters of this process to the metrics folder, so they can be summed over all processes.
+        """
+        self.last_output_time = time.time()
+
+        if self.metrics_path is None or not path.exists(self.metrics_path):
+            return
+
+        filename = path.join(self.metrics_path, f"{os.getpid()}.json")
+
+        with open(f"{filename}.tmp", "w") as outfile:
+            json.dump(self.counters, outfile)
+
+        os.replace(f"{filename}.tmp", filename)
+
+    def snapshot(self) -> dict:
+        """
+        Sum the counters of this process and every other process of the search into the current metrics.
+        """
+        counters_list = [self.counters]
+
+        for counters_file in os.listdir(self.metrics_path):
+
+            if not counters_file.endswith(".json") or counters_file == f"{os.getpid()}.json":
+                continue
+
+            try:
+                with open(path.join(self.metrics_path, counters_file)) as infile:
+                    counters_list.append(json.load(infile))
+            except (OSError, ValueError):
+                continue
+
+        now = time.time()
+
+        snapshot = {
+            "time": now,
+            "evaluations": sum(counters["evaluations"] for counters in counters_list),
+            "busy": sum(counters["busy"] for counters in counters_list),
+            "max_log_likelihood": max(counters["max_log_likelihood"] for counters in counters_list),
+            "memory_bytes": sum(counters["memory"] for counters in counters_list),
+            "processes": len(counters_list),
+        }
+
+        previous = self._previous_snapshot
+
+        if previous is not None and now > previous["time"]:
+
+            elapsed = now - previous["time"]
+
+            snapshot["evaluation_rate"] = (snapshot["evaluations"] - previous["evaluations"]) / elapsed
+            snapshot["core_utilisation"] = min(
+                (snapshot["busy"] - previous["busy"]) / (elapsed * self.number_of_cores), 1.0
+            )
+
+        else:
+
+            snapshot["evaluation_rate"] = 0.0
+            snapshot["core_utilisation"] = 0.0
+
+        snapshot.update(self.progress)
+
+        self._previous_snapshot = snapshot
+
+        return snapshot
+
+    def output(self):
+        """
+        Write the current metrics to the metrics file, which the timer thread calls every *interval* seconds.
+        """
+        if self.output_path is None or not path.exists(self.metrics_path):
+            return
+
+        try:
+
+            snapshot = self.snapshot()
+
+            if self.format == "prometheus":
+
+                with open(f"{self.filename}.tmp", "w") as outfile:
+                    outfile.write("\n".join(prometheus_lines_from(snapshot=snapshot, name=self.name)) + "\n")
+
+                os.replace(f"{self.filename}.tmp", self.filename)
+
+            else:
+
+                snapshot = {
+                    key: value if not isinstance(value, float) or math.isfinite(value) else None
+                    for key, value in snapshot.items()
+                }
+
+                with open(self.filename, "a") as outfile:
+                    outfile.write(json.dumps({"search": self.name, **snapshot}) + "\n")
+
+        except OSError as e:
+            logger.debug(f"Metrics could not be output: {e}")
+
+
+prometheus_metrics = {
+    "evaluations": ("counter", "The number of log likelihood evaluations."),
+    "busy": ("counter", "The seconds the processes spent evaluating the log likelihood function."),
+    "evaluation_rate": ("gauge", "Log likelihood evaluations per second over the last interval."),
+    "max_log_likelihood": ("gauge", "The maximum log likelihood evaluated."),
+    "core_utilisation": ("gauge", "The fraction of the last interval the cores spent evaluating the likelihood."),
+    "memory_bytes": ("gauge", "The resident memory of every process of the search."),
+    "processes": ("gauge", "The number of processes evaluating the log likelihood."),
+}
+
+
+def prometheus_lines_from(snapshot, name) -> [str]:
+    """
+    The Prometheus text exposition format of a snapshot of the metrics of a search, where every metric is prefixed
+    autofit_ and labelled with the name of the search. Progress measures reported by the search are exported as
+    gauges.
+    """
+    lines = []
+
+    label = json.dumps(str(name))
+
+    for key, value in snapshot.items():
+
+        if key == "time" or not isinstance(value, (int, float)) or isinstance(value, bool):
+            continue
+
+        metric_type, description = prometheus_metrics.get(key, ("gauge", f"The {key} reported by the search."))
+
+        metric = f"autofit_{key}_total" if metric_type == "counter" else f"autofit_{key}"
+
+        lines.append(f"# HELP {metric} {description}")
+        lines.append(f"# TYPE {metric} {metric_type}")
+        lines.append(f"{metric}{{search={label}}} {prometheus_value_from(value)}")
+
+    return lines
+
+
+def prometheus_value_from(value) -> str:
+    """
+    The Prometheus text exposition format of the value of a sample, which writes infinities as +Inf and -Inf and an
+    undefined value as NaN.
+    """
+    value = float(value)
+
+    if math.isnan(value):
+        return "NaN"
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+
+    return repr(value)
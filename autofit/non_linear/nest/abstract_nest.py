@@ -85,7 +85,11 @@ class AbstractNest(NonLinearSearch):
             terminate_at_acceptance_ratio,
             acceptance_ratio_threshold,
             log_likelihood_cap=None,
-            pool_ids=None
+            best_fit=None,
+            surrogate=None,
+            profiler=None,
+            tracer=None,
+            metrics=None,
         ):
 
             super().__init__(
@@ -94,7 +98,11 @@ class AbstractNest(NonLinearSearch):
                 model=model,
                 samples_from_model=samples_from_model,
                 log_likelihood_cap=log_likelihood_cap,
-                pool_ids=pool_ids
+                best_fit=best_fit,
+                surrogate=surrogate,
+                profiler=profiler,
+                tracer=tracer,
+                metrics=metrics,
             )
 
             self.stagger_resampling_likelihood = stagger_resampling_likelihood
@@ -124,6 +132,9 @@ class AbstractNest(NonLinearSearch):
             except exc.FitException:
                 raise exc.FitException
 
+        def figure_of_merit_from_log_likelihood(self, parameters, log_likelihood):
+            return log_likelihood
+
         def stagger_resampling_figure_of_merit(self):
             """By default, when a fit raises an exception a log likelihood of -np.inf is returned, which leads the
             sampler to discard the sample.
@@ -197,7 +208,7 @@ class AbstractNest(NonLinearSearch):
         copy.stagger_resampling_likelihood = self.stagger_resampling_likelihood
         return copy
 
-    def fitness_function_from_model_and_analysis(self, model, analysis, log_likelihood_cap=None, pool_ids=None):
+    def fitness_function_from_model_and_analysis(self, model, analysis, log_likelihood_cap=None):
 
         return self.__class__.Fitness(
             paths=self.paths,
@@ -208,7 +219,11 @@ class AbstractNest(NonLinearSearch):
             terminate_at_acceptance_ratio=self.terminate_at_acceptance_ratio,
             acceptance_ratio_threshold=self.acceptance_ratio_threshold,
             log_likelihood_cap=log_likelihood_cap,
-            pool_ids=pool_ids
+            best_fit=self.best_fit,
+            surrogate=self.surrogate,
+            profiler=self.profiler,
+            tracer=self.tracer,
+            metrics=self.metrics,
         )
 
     def samples_via_csv_json_from_model(self, model):
@@ -8,6 +8,7 @@ from dynesty.dynesty import DynamicNestedSampler
 
 from autofit.mapper.prior_model.abstract import AbstractPriorModel
 from autofit.non_linear.abstract_search import Result
+from autofit.non_linear import tracing
 from autofit.non_linear.log import logger
 from autofit.non_linear.nest.abstract_nest import AbstractNest
 from autofit.non_linear.paths import convert_paths
@@ -277,12 +278,14 @@ class AbstractDynesty(AbstractNest):
         set of accepted ssamples of the fit.
         """
 
-        pool, pool_ids = self.make_pool()
+        pool = self.make_pool()
 
         fitness_function = self.fitness_function_from_model_and_analysis(
-            model=model, analysis=analysis, pool_ids=pool_ids, log_likelihood_cap=log_likelihood_cap,
+            model=model, analysis=analysis, log_likelihood_cap=log_likelihood_cap,
         )
 
+        self.fidelity.apply(fitness_function=fitness_function)
+
         if os.path.exists("{}/{}.pickle".format(self.paths.samples_path, "dynesty")):
 
             sampler = self.load_sampler
@@ -292,7 +295,7 @@ class AbstractDynesty(AbstractNest):
         else:
 
             sampler = self.sampler_fom_model_and_fitness(
-                model=model, fitness_function=fitness_function
+                model=model, fitness_function=fitness_function, pool=pool
             )
 
             logger.info("No Dynesty samples found, beginning new non-linear search. ")
@@ -317,22 +320,25 @@ class AbstractDynesty(AbstractNest):
                 total_iterations = 0
 
             if not self.no_limit:
-                iterations = self.maxcall - total_iterations
+                iterations = min(self.iterations_per_update, self.maxcall - total_iterations)
             else:
                 iterations = self.iterations_per_update
 
+            iterations = self.budget.iterations_within_budget(iterations=iterations)
+
             if iterations > 0:
 
                 for i in range(10):
 
                     try:
-                        sampler.run_nested(
-                            maxcall=iterations,
-                            dlogz=self.evidence_tolerance,
-                            logl_max=self.logl_max,
-                            n_effective=self.n_effective,
-                            print_progress=not self.silence,
-                        )
+                        with tracing.span(name="sampler", iterations=iterations):
+                            sampler.run_nested(
+                                maxcall=iterations,
+                                dlogz=self.evidence_tolerance,
+                                logl_max=self.logl_max,
+                                n_effective=self.n_effective,
+                                print_progress=not self.silence,
+                            )
 
                         if i == 9:
                             raise ValueError("Dynesty crashed due to repeated bounding errors")
@@ -343,6 +349,32 @@ class AbstractDynesty(AbstractNest):
 
                         continue
 
+            iterations_after_run = np.sum(sampler.results.ncall)
+
+            self.metrics.set_progress(
+                dlogz=float(self.dlogz_from_sampler(sampler=sampler)),
+                acceptance_ratio=sampler.results.eff / 100.0,
+            )
+
+            converged_at_fidelity = self.fidelity.applied and (
+                    total_iterations == iterations_after_run
+                    or self.fidelity.is_dlogz_converged(dlogz=self.dlogz_from_sampler(sampler=sampler))
+            )
+
+            switched_fidelity = self.fidelity.update(
+                fitness_function=fitness_function,
+                evaluations=iterations_after_run - total_iterations,
+                converged=converged_at_fidelity,
+                reason="dlogz",
+            )
+
+            if switched_fidelity:
+
+                # The live points are re-evaluated so the likelihood contour continues at the new fidelity.
+
+                sampler.live_logl = np.asarray(list(sampler.M(fitness_function, list(sampler.live_v))))
+                self.budget.add_evaluations(evaluations=len(sampler.live_logl))
+
             sampler_pickle = sampler
             sampler_pickle.loglikelihood = None
 
@@ -353,14 +385,17 @@ class AbstractDynesty(AbstractNest):
 
             self.perform_update(model=model, analysis=analysis, during_analysis=True)
 
-            iterations_after_run = np.sum(sampler.results.ncall)
+            self.budget.add_evaluations(evaluations=iterations_after_run - total_iterations)
 
             if (
-                    total_iterations == iterations_after_run
-                    or total_iterations == self.maxcall
+                    (total_iterations == iterations_after_run and not switched_fidelity)
+                    or iterations_after_run >= self.maxcall
             ):
                 finished = True
 
+            elif self.budget.check():
+                finished = True
+
     def copy_with_name_extension(self, extension, path_prefix=None, remove_phase_tag=False):
         """Copy this instance of the dynesty `NonLinearSearch` with all associated attributes.
 
@@ -397,9 +432,19 @@ class AbstractDynesty(AbstractNest):
         with open("{}/{}.pickle".format(self.paths.samples_path, "dynesty"), "rb") as f:
             return pickle.load(f)
 
-    def sampler_fom_model_and_fitness(self, model, fitness_function):
+    def sampler_fom_model_and_fitness(self, model, fitness_function, pool=None):
         return NotImplementedError()
 
+    @staticmethod
+    def dlogz_from_sampler(sampler):
+        """The sampler's estimate of the log evidence remaining in its live points, which is the value of dlogz its
+        stopping criterion compares to the evidence tolerance."""
+        index = -sampler.nlive - 1 if sampler.added_live else -1
+
+        return np.logaddexp(
+            0.0, np.max(sampler.live_logl) + sampler.saved_logvol[index] - sampler.saved_logz[index]
+        )
+
     def samples_via_sampler_from_model(self, model):
         """Create a `Samples` object from this non-linear search's output files on the hard-disk and model.
 
@@ -487,13 +532,14 @@ class AbstractDynesty(AbstractNest):
         return f"{name_tag}[{n_live_points_tag}__{dynesty_tag}]"
 
     def initial_live_points_from_model_and_fitness_function(
-            self, model, fitness_function
+            self, model, fitness_function, pool=None
     ):
 
         unit_parameters, parameters, log_likelihoods = self.initializer.initial_samples_from_model(
             total_points=self.n_live_points,
             model=model,
             fitness_function=fitness_function,
+            pool=pool,
         )
 
         init_unit_parameters = np.zeros(shape=(self.n_live_points, model.prior_count))
@@ -694,12 +740,12 @@ class DynestyStatic(AbstractDynesty):
 
         logger.debug("Creating DynestyStatic NLO")
 
-    def sampler_fom_model_and_fitness(self, model, fitness_function):
+    def sampler_fom_model_and_fitness(self, model, fitness_function, pool=None):
         """Get the static Dynesty sampler which performs the non-linear search, passing it all associated input Dynesty
         variables."""
 
         live_points = self.initial_live_points_from_model_and_fitness_function(
-            model=model, fitness_function=fitness_function
+            model=model, fitness_function=fitness_function, pool=pool
         )
 
         return StaticSampler(
@@ -905,7 +951,7 @@ class DynestyDynamic(AbstractDynesty):
 
         logger.debug("Creating DynestyDynamic NLO")
 
-    def sampler_fom_model_and_fitness(self, model, fitness_function):
+    def sampler_fom_model_and_fitness(self, model, fitness_function, pool=None):
         """Get the dynamic Dynesty sampler which performs the non-linear search, passing it all associated input Dynesty
         variables."""
         return DynamicNestedSampler(
@@ -1016,10 +1062,10 @@ class DynestyDynamic(AbstractDynesty):
         set of accepted ssamples of the fit.
         """
 
-        pool, pool_ids = self.make_pool()
+        pool = self.make_pool()
 
         fitness_function = self.fitness_function_from_model_and_analysis(
-            model=model, analysis=analysis, pool_ids=pool_ids
+            model=model, analysis=analysis
         )
 
         sampler = self.sampler_fom_model_and_fitness(
@@ -1056,14 +1102,15 @@ class DynestyDynamic(AbstractDynesty):
 
             if iterations > 0:
 
-                sampler.run_nested(
-                    nlive_init=self.n_live_points,
-                    maxcall=iterations,
-                    dlogz_init=self.evidence_tolerance,
-                    logl_max_init=self.logl_max,
-                    n_effective=self.n_effective,
-                    print_progress=not self.silence,
-                )
+                with tracing.span(name="sampler", iterations=iterations):
+                    sampler.run_nested(
+                        nlive_init=self.n_live_points,
+                        maxcall=iterations,
+                        dlogz_init=self.evidence_tolerance,
+                        logl_max_init=self.logl_max,
+                        n_effective=self.n_effective,
+                        print_progress=not self.silence,
+                    )
 
             iterations_after_run = np.sum(sampler.results.ncall)
 
@@ -1,6 +1,7 @@
 from autoconf import conf
 from autofit.mapper.prior_model.abstract import AbstractPriorModel
 from autofit.non_linear import abstract_search
+from autofit.non_linear import tracing
 from autofit.non_linear.log import logger
 from autofit.non_linear.nest import abstract_nest
 from autofit.non_linear.paths import convert_paths
@@ -207,7 +208,8 @@ class MultiNest(abstract_nest.AbstractNest):
 
         def __init__(self, paths, model, analysis, samples_from_model, stagger_resampling_likelihood,
                      terminate_at_acceptance_ratio,
-                     acceptance_ratio_threshold, log_likelihood_cap=None, pool_ids=None):
+                     acceptance_ratio_threshold, log_likelihood_cap=None, best_fit=None, surrogate=None,
+                     profiler=None, tracer=None, metrics=None):
 
             super().__init__(paths=paths, model=model, analysis=analysis,
                              samples_from_model=samples_from_model,
@@ -215,7 +217,11 @@ class MultiNest(abstract_nest.AbstractNest):
                              terminate_at_acceptance_ratio=terminate_at_acceptance_ratio,
                              acceptance_ratio_threshold=acceptance_ratio_threshold,
                              log_likelihood_cap=log_likelihood_cap,
-                             pool_ids=pool_ids)
+                             best_fit=best_fit,
+                             surrogate=surrogate,
+                             profiler=profiler,
+                             tracer=tracer,
+                             metrics=metrics)
 
             should_update_sym = conf.instance["non_linear"]["nest"]["MultiNest"]["updates"]["should_update_sym"]
 
@@ -274,30 +280,31 @@ class MultiNest(abstract_nest.AbstractNest):
 
         logger.info("Beginning MultiNest non-linear search. ")
 
-        pymultinest.run(
-            fitness_function,
-            prior,
-            model.prior_count,
-            outputfiles_basename="{}/multinest".format(self.paths.path),
-            n_live_points=self.n_live_points,
-            const_efficiency_mode=self.const_efficiency_mode,
-            importance_nested_sampling=self.importance_nested_sampling,
-            evidence_tolerance=self.evidence_tolerance,
-            sampling_efficiency=self.sampling_efficiency,
-            null_log_evidence=self.null_log_evidence,
-            n_iter_before_update=self.n_iter_before_update,
-            multimodal=self.multimodal,
-            max_modes=self.max_modes,
-            mode_tolerance=self.mode_tolerance,
-            seed=self.seed,
-            verbose=not self.silence,
-            resume=self.resume,
-            context=self.context,
-            write_output=self.write_output,
-            log_zero=self.log_zero,
-            max_iter=self.max_iter,
-            init_MPI=self.init_MPI,
-        )
+        with tracing.span(name="sampler"):
+            pymultinest.run(
+                fitness_function,
+                prior,
+                model.prior_count,
+                outputfiles_basename="{}/multinest".format(self.paths.path),
+                n_live_points=self.n_live_points,
+                const_efficiency_mode=self.const_efficiency_mode,
+                importance_nested_sampling=self.importance_nested_sampling,
+                evidence_tolerance=self.evidence_tolerance,
+                sampling_efficiency=self.sampling_efficiency,
+                null_log_evidence=self.null_log_evidence,
+                n_iter_before_update=self.n_iter_before_update,
+                multimodal=self.multimodal,
+                max_modes=self.max_modes,
+                mode_tolerance=self.mode_tolerance,
+                seed=self.seed,
+                verbose=not self.silence,
+                resume=self.resume,
+                context=self.context,
+                write_output=self.write_output,
+                log_zero=self.log_zero,
+                max_iter=self.max_iter,
+                init_MPI=self.init_MPI,
+            )
         self.paths.copy_from_sym()
 
     @property
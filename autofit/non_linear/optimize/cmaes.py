@@ -0,0 +1,445 @@
+import os
+import pickle
+
+import numpy as np
+
+from autofit.mapper.prior_model.abstract import AbstractPriorModel
+from autofit.non_linear.initializer import figures_of_merit_from_parameters
+from autofit.non_linear import tracing
+from autofit.non_linear.log import logger
+from autofit.non_linear.optimize.abstract_optimize import AbstractOptimizer
+from autofit.non_linear.paths import convert_paths
+from autofit.non_linear.samples import OptimizerSamples, Sample
+
+
+class CMAESSampler:
+    def __init__(self, mean, sigma, population_size=None):
+        """
+        The state of a (mu/mu_w, lambda) Covariance Matrix Adaptation Evolution Strategy, which minimizes a function
+        by sampling each generation of points from a multivariate Gaussian and adapting its mean, step-size and
+        covariance matrix to the best points of every generation.
+
+        This follows the formulation of Hansen (2016), The CMA Evolution Strategy: A Tutorial (arXiv:1604.00772). The
+        sampler holds only NumPy arrays, so it can be pickled to checkpoint and resume a search.
+
+        Parameters
+        ----------
+        mean : np.ndarray
+            The initial mean of the search distribution.
+        sigma : float
+            The initial step-size of the search distribution.
+        population_size : int
+            The number of points sampled every generation, which if None is set to 4 + 3 ln(n) for n dimensions.
+        """
+        self.mean = np.asarray(mean, dtype="float")
+        self.sigma = float(sigma)
+
+        n = len(self.mean)
+
+        self.population_size = (
+            population_size
+            if population_size is not None and population_size > 1
+            else 4 + int(3 * np.log(n))
+        )
+
+        self.mu = self.population_size // 2
+
+        weights = np.log(self.mu + 0.5) - np.log(np.arange(1, self.mu + 1))
+        self.weights = weights / np.sum(weights)
+        self.mueff = 1.0 / np.sum(self.weights ** 2)
+
+        self.cc = (4.0 + self.mueff / n) / (n + 4.0 + 2.0 * self.mueff / n)
+        self.cs = (self.mueff + 2.0) / (n + self.mueff + 5.0)
+        self.c1 = 2.0 / ((n + 1.3) ** 2 + self.mueff)
+        self.cmu = min(
+            1.0 - self.c1,
+            2.0 * (self.mueff - 2.0 + 1.0 / self.mueff) / ((n + 2.0) ** 2 + self.mueff),
+        )
+        self.damps = 1.0 + 2.0 * max(0.0, np.sqrt((self.mueff - 1.0) / (n + 1.0)) - 1.0) + self.cs
+        self.chi_n = np.sqrt(n) * (1.0 - 1.0 / (4.0 * n) + 1.0 / (21.0 * n ** 2))
+
+        self.pc = np.zeros(n)
+        self.ps = np.zeros(n)
+        self.B = np.eye(n)
+        self.D = np.ones(n)
+        self.C = np.eye(n)
+
+        self.generation = 0
+
+    @property
+    def dimensions(self):
+        return len(self.mean)
+
+    def ask(self) -> np.ndarray:
+        """
+        Sample the points of the next generation from the search distribution, returning an array of shape
+        (population_size, dimensions).
+        """
+        z = np.random.normal(size=(self.population_size, self.dimensions))
+        return self.mean + self.sigma * (z * self.D) @ self.B.T
+
+    def tell(self, points, figures_of_merit):
+        """
+        Update the search distribution using the points of a generation and their figures of merit, which are
+        minimized.
+
+        Parameters
+        ----------
+        points : np.ndarray
+            The points of the generation, of shape (population_size, dimensions).
+        figures_of_merit : np.ndarray
+            The figure of merit of every point, where lower values are better.
+        """
+        n = self.dimensions
+
+        best = np.argsort(figures_of_merit)[: self.mu]
+
+        old_mean = self.mean
+        y = (points[best] - old_mean) / self.sigma
+        y_w = self.weights @ y
+
+        self.mean = old_mean + self.sigma * y_w
+
+        inverse_sqrt_C = self.B @ np.diag(1.0 / self.D) @ self.B.T
+
+        self.ps = (1.0 - self.cs) * self.ps + np.sqrt(
+            self.cs * (2.0 - self.cs) * self.mueff
+        ) * (inverse_sqrt_C @ y_w)
+
+        self.generation += 1
+
+        h_sigma = (
+                np.linalg.norm(self.ps)
+                / np.sqrt(1.0 - (1.0 - self.cs) ** (2 * self.generation))
+                / self.chi_n
+                < 1.4 + 2.0 / (n + 1.0)
+        )
+
+        self.pc = (1.0 - self.cc) * self.pc + h_sigma * np.sqrt(
+            self.cc * (2.0 - self.cc) * self.mueff
+        ) * y_w
+
+        rank_mu = (self.weights[:, None] * y).T @ y
+
+        self.C = (
+                (1.0 - self.c1 - self.cmu) * self.C
+                + self.c1
+                * (
+                        np.outer(self.pc, self.pc)
+                        + (1.0 - h_sigma) * self.cc * (2.0 - self.cc) * self.C
+                )
+                + self.cmu * rank_mu
+        )
+
+        self.sigma *= np.exp((self.cs / self.damps) * (np.linalg.norm(self.ps) / self.chi_n - 1.0))
+
+        self.C = np.triu(self.C) + np.triu(self.C, 1).T
+
+        eigenvalues, self.B = np.linalg.eigh(self.C)
+        self.D = np.sqrt(np.maximum(eigenvalues, 1.0e-30))
+
+
+class CMAES(AbstractOptimizer):
+    @convert_paths
+    def __init__(
+            self,
+            paths=None,
+            prior_passer=None,
+            population_size=None,
+            sigma=None,
+            iters=None,
+            ftol=None,
+            initializer=None,
+            iterations_per_update=None,
+            number_of_cores=None,
+    ):
+        """
+        A Covariance Matrix Adaptation Evolution Strategy (CMA-ES) global non-linear search, implemented in NumPy.
+
+        Every generation, CMA-ES samples a population of points from a multivariate Gaussian and moves its mean towards
+        the best points, adapting its covariance matrix to the correlations between parameters and its step-size to
+        the progress made. This makes it efficient for problems with many correlated parameters, where particle
+        swarm optimization wastes evaluations.
+
+        The search is performed in the unit hypercube, which is mapped to physical values via the priors, so every
+        point is within the prior limits. Points outside the hypercube are reflected back into it.
+
+        Extensions:
+
+        - Every generation is evaluated as one batch, in parallel over the pool if *number_of_cores* is above 1.
+
+        - Allows runs to be terminated and resumed from the point it was terminated. This is achieved by outputting
+          the mean, step-size and covariance matrix of the search alongside all samples every update.
+
+        - The initial mean is the best initial point generated by the initializer, so the search can be warm-started
+          (e.g. via `InitializerFromSamples`).
+
+        Parameters
+        ----------
+        paths : af.Paths
+            Manages all paths, e.g. where the search outputs are stored, the samples, etc.
+        prior_passer : af.PriorPasser
+            Controls how priors are passed from the results of this `NonLinearSearch` to a subsequent non-linear search.
+        population_size : int
+            The number of points sampled every generation, where a value of -1 uses the default 4 + 3 ln(n) for n
+            parameters.
+        sigma : float
+            The initial step-size of the search in the unit hypercube.
+        iters : int
+            The maximum number of generations.
+        ftol : float
+            The search terminates when the range of figures of merit (chi-squared values) of a generation is below
+            this value.
+        initializer : non_linear.initializer.Initializer
+            Generates the initialize samples of non-linear parameter space (see autofit.non_linear.initializer).
+        number_of_cores : int
+            The number of cores each generation is evaluated using a Python multiprocessing Pool instance. If 1, a
+            pool instance is not created and the job runs in serial.
+        """
+
+        self.population_size = (
+            self._config("search", "population_size")
+            if population_size is None
+            else population_size
+        )
+        self.sigma = self._config("search", "sigma") if sigma is None else sigma
+        self.iters = self._config("search", "iters") if iters is None else iters
+        self.ftol = self._config("search", "ftol") if ftol is None else ftol
+
+        super().__init__(
+            paths=paths,
+            prior_passer=prior_passer,
+            initializer=initializer,
+            iterations_per_update=iterations_per_update,
+        )
+
+        self.number_of_cores = (
+            self._config("parallel", "number_of_cores")
+            if number_of_cores is None
+            else number_of_cores
+        )
+
+        logger.debug("Creating CMAES NLO")
+
+    class Fitness(AbstractOptimizer.Fitness):
+        def __call__(self, parameters, pool=None):
+            """
+            Compute the figure of merit of every point of a generation, in parallel if a pool is input. Points which
+            raise a `FitException` are given the resample figure of merit.
+            """
+            figures_of_merit = figures_of_merit_from_parameters(
+                fitness_function=self, parameters=parameters, pool=pool
+            )
+            figures_of_merit[np.isnan(figures_of_merit)] = -2.0 * self.resample_figure_of_merit
+
+            return figures_of_merit
+
+        def figure_of_merit_from_parameters(self, parameters):
+            """The figure of merit is the value that the `NonLinearSearch` uses to sample parameter space. *CMAES*
+            uses the chi-squared value, which is the -2.0*log_posterior."""
+            return -2.0 * self.log_posterior_from_parameters(parameters=parameters)
+
+        def figure_of_merit_from_log_likelihood(self, parameters, log_likelihood):
+            return -2.0 * (log_likelihood + sum(self.model.log_priors_from_vector(vector=parameters)))
+
+    def _fit(self, model: AbstractPriorModel, analysis, log_likelihood_cap=None):
+        """
+        Fit a model using CMAES and the Analysis class which contains the data and returns the log likelihood from
+        instances of the model, which the `NonLinearSearch` seeks to maximize.
+
+        Parameters
+        ----------
+        model : ModelMapper
+            The model which generates instances for different points in parameter space.
+        analysis : Analysis
+            Contains the data and the log likelihood function which fits an instance of the model to the data, returning
+            the log likelihood the `NonLinearSearch` maximizes.
+        """
+        pool = self.make_pool()
+
+        fitness_function = self.fitness_function_from_model_and_analysis(
+            model=model, analysis=analysis
+        )
+
+        if os.path.exists(self.state_file):
+
+            state = self.load_state
+
+            sampler = state["sampler"]
+            parameters = state["parameters"]
+            log_posteriors = state["log_posteriors"]
+
+            logger.info("Existing CMAES samples found, resuming non-linear search.")
+
+        else:
+
+            sampler = CMAESSampler(
+                mean=np.full(model.prior_count, 0.5),
+                sigma=self.sigma,
+                population_size=self.population_size,
+            )
+
+            initial_unit_parameters, initial_parameters, initial_figures_of_merit = self.initializer.initial_samples_from_model(
+                total_points=sampler.population_size,
+                model=model,
+                fitness_function=fitness_function,
+                pool=pool,
+            )
+
+            sampler.mean = np.asarray(initial_unit_parameters[int(np.argmin(initial_figures_of_merit))])
+
+            parameters = [list(vector) for vector in initial_parameters]
+            log_posteriors = [-0.5 * figure_of_merit for figure_of_merit in initial_figures_of_merit]
+
+            logger.info("No CMAES samples found, beginning new non-linear search.")
+
+        logger.info("Running CMAES Optimizer...")
+
+        finished = sampler.generation >= self.iters
+
+        while not finished:
+
+            iterations = min(self.iterations_per_update, self.iters - sampler.generation)
+
+            iterations = self.budget.iterations_within_budget(
+                iterations=iterations, evaluations_per_iteration=sampler.population_size
+            )
+
+            for iteration in range(1, iterations + 1):
+
+                unit_points = reflect_into_unit_hypercube(sampler.ask())
+                points = model.vectors_from_unit_vectors(unit_vectors=unit_points)
+
+                with tracing.span(name="sampler", generation=sampler.generation):
+                    figures_of_merit = fitness_function(parameters=points, pool=pool)
+
+                sampler.tell(points=unit_points, figures_of_merit=figures_of_merit)
+
+                parameters += points.tolist()
+                log_posteriors += (-0.5 * figures_of_merit).tolist()
+
+                if np.ptp(figures_of_merit) < self.ftol or sampler.sigma * np.max(sampler.D) < 1.0e-12:
+                    finished = True
+                    break
+
+            iterations = iteration
+            finished = finished or sampler.generation >= self.iters
+
+            with open(self.state_file, "wb") as f:
+                pickle.dump(
+                    {"sampler": sampler, "parameters": parameters, "log_posteriors": log_posteriors}, f
+                )
+
+            self.budget.add_evaluations(evaluations=iterations * sampler.population_size)
+
+            self.perform_update(model=model, analysis=analysis, during_analysis=True)
+
+            if not finished and self.budget.check():
+                break
+
+        logger.info("CMAES complete")
+
+    @property
+    def tag(self):
+        """Tag the output folder of the CMAES non-linear search, according to the population size and initial
+        step-size. The population size is not tagged if it is the default, which depends on the model."""
+
+        name_tag = self._config("tag", "name")
+        sigma_tag = f"{self._config('tag', 'sigma')}_{self.sigma}"
+
+        if self.population_size is None or self.population_size <= 1:
+            return f"{name_tag}[{sigma_tag}]"
+
+        population_size_tag = f"{self._config('tag', 'population_size')}_{int(self.population_size)}"
+
+        return f"{name_tag}[{population_size_tag}_{sigma_tag}]"
+
+    def copy_with_name_extension(self, extension, path_prefix=None, remove_phase_tag=False):
+        """Copy this instance of the CMAES `NonLinearSearch` with all associated attributes.
+
+        This is used to set up the `NonLinearSearch` on phase extensions."""
+        copy = super().copy_with_name_extension(
+            extension=extension, path_prefix=path_prefix, remove_phase_tag=remove_phase_tag
+        )
+        copy.prior_passer = self.prior_passer
+        copy.population_size = self.population_size
+        copy.sigma = self.sigma
+        copy.iters = self.iters
+        copy.ftol = self.ftol
+        copy.initializer = self.initializer
+        copy.iterations_per_update = self.iterations_per_update
+        copy.number_of_cores = self.number_of_cores
+
+        return copy
+
+    def fitness_function_from_model_and_analysis(self, model, analysis, log_likelihood_cap=None):
+
+        return CMAES.Fitness(
+            paths=self.paths,
+            model=model,
+            analysis=analysis,
+            samples_from_model=self.samples_via_sampler_from_model,
+            log_likelihood_cap=log_likelihood_cap,
+            best_fit=self.best_fit,
+            surrogate=self.surrogate,
+            profiler=self.profiler,
+            tracer=self.tracer,
+            metrics=self.metrics,
+        )
+
+    def samples_via_sampler_from_model(self, model):
+        """Create an *OptimizerSamples* object from this non-linear search's output files on the hard-disk and model.
+
+        For CMAES, all quantities are extracted via the pickled state of the search, which contains every point
+        evaluated and its log posterior.
+
+        Parameters
+        ----------
+        model
+            The model which generates instances for different points in parameter space. This maps the points from unit
+            cube values to physical values via the priors.
+        """
+        state = self.load_state
+
+        parameters = state["parameters"]
+        log_posteriors = state["log_posteriors"]
+
+        log_priors = [
+            sum(model.log_priors_from_vector(vector=vector)) for vector in parameters
+        ]
+        log_likelihoods = [lp - prior for lp, prior in zip(log_posteriors, log_priors)]
+        weights = len(log_likelihoods) * [1.0]
+
+        return OptimizerSamples(
+            model=model,
+            samples=Sample.from_lists(
+                parameters=parameters,
+                log_likelihoods=log_likelihoods,
+                log_priors=log_priors,
+                weights=weights,
+                model=model
+            ),
+            time=self.timer.time
+        )
+
+    @property
+    def state_file(self):
+        return "{}/{}.pickle".format(self.paths.samples_path, "cmaes")
+
+    @property
+    def load_state(self):
+        with open(self.state_file, "rb") as f:
+            return pickle.load(f)
+
+    def remove_state_files(self):
+        os.remove(self.state_file)
+
+
+def reflect_into_unit_hypercube(unit_vectors):
+    """
+    Reflect points outside the unit hypercube back into it at its boundaries, keeping them a small distance from the
+    boundaries so that priors with infinite tails (e.g. a `GaussianPrior`) map them to finite values.
+    """
+    unit_vectors = np.mod(unit_vectors, 2.0)
+    unit_vectors = np.where(unit_vectors > 1.0, 2.0 - unit_vectors, unit_vectors)
+    return np.clip(unit_vectors, 1.0e-10, 1.0 - 1.0e-10)
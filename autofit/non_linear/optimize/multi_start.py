@@ -0,0 +1,464 @@
+import json
+import os
+import pickle
+from functools import partial
+
+import numpy as np
+from scipy import optimize
+
+from autofit.mapper.prior_model.abstract import AbstractPriorModel
+from autofit.non_linear.initializer import figures_of_merit_from_parameters
+from autofit.non_linear import tracing
+from autofit.non_linear.log import logger
+from autofit.non_linear.optimize.abstract_optimize import AbstractOptimizer
+from autofit.non_linear.optimize.cmaes import reflect_into_unit_hypercube
+from autofit.non_linear.paths import convert_paths
+from autofit.non_linear.samples import OptimizerSamples, Sample
+
+
+class MultiStartOptimizer(AbstractOptimizer):
+    @convert_paths
+    def __init__(
+            self,
+            paths=None,
+            prior_passer=None,
+            n_starts=None,
+            method=None,
+            maxiter=None,
+            ftol=None,
+            epsilon=None,
+            mode_tolerance=None,
+            initializer=None,
+            iterations_per_update=None,
+            number_of_cores=None,
+    ):
+        """
+        A multi-start local optimizer search, which runs a scipy local optimizer (L-BFGS-B or Nelder-Mead) from
+        many starting points and keeps the distinct modes they converge to.
+
+        This is a cheap, parallel maximum likelihood search for well-initialised phases, for example when the
+        starting points are drawn from the samples of a previous phase via `InitializerFromSamples`.
+
+        The local optimizations are performed in the unit hypercube, which is mapped to physical values via the
+        priors. L-BFGS-B uses finite-difference gradients, where the points of every gradient are evaluated as one
+        batch.
+
+        Extensions:
+
+        - If *number_of_cores* is above 1 and there are at least as many starts in an update as cores, the local
+          optimizations run in parallel worker processes. Otherwise they run one after another, with every batch of
+          gradient evaluations performed in parallel over the pool.
+
+        - Converged solutions closer than *mode_tolerance* in the unit hypercube are deduplicated into one mode, and
+          all modes are output to the file modes.json in the samples folder.
+
+        - Allows runs to be terminated and resumed from the point it was terminated, after every
+          *iterations_per_update* local optimizations.
+
+        The samples of the search are every point evaluated by the local optimizers.
+
+        Parameters
+        ----------
+        paths : af.Paths
+            Manages all paths, e.g. where the search outputs are stored, the samples, etc.
+        prior_passer : af.PriorPasser
+            Controls how priors are passed from the results of this `NonLinearSearch` to a subsequent non-linear search.
+        n_starts : int
+            The number of starting points local optimizations are run from.
+        method : str
+            The scipy local optimizer, either "L-BFGS-B" or "Nelder-Mead".
+        maxiter : int
+            The maximum number of iterations of every local optimization.
+        ftol : float
+            The tolerance on the figure of merit (chi-squared) at which every local optimization terminates.
+        epsilon : float
+            The step-size in the unit hypercube of the finite-difference gradients of L-BFGS-B.
+        mode_tolerance : float
+            The distance in the unit hypercube below which two converged solutions are the same mode.
+        initializer : non_linear.initializer.Initializer
+            Generates the starting points (see autofit.non_linear.initializer).
+        iterations_per_update : int
+            The number of local optimizations performed between every update.
+        number_of_cores : int
+            The number of cores the local optimizations are performed using a Python multiprocessing Pool instance. If
+            1, a pool instance is not created and the job runs in serial.
+        """
+
+        self.n_starts = self._config("search", "n_starts") if n_starts is None else n_starts
+        self.method = self._config("search", "method") if method is None else method
+        self.maxiter = self._config("search", "maxiter") if maxiter is None else maxiter
+        self.ftol = self._config("search", "ftol") if ftol is None else ftol
+        self.epsilon = self._config("search", "epsilon") if epsilon is None else epsilon
+        self.mode_tolerance = (
+            self._config("search", "mode_tolerance")
+            if mode_tolerance is None
+            else mode_tolerance
+        )
+
+        super().__init__(
+            paths=paths,
+            prior_passer=prior_passer,
+            initializer=initializer,
+            iterations_per_update=iterations_per_update,
+        )
+
+        self.number_of_cores = (
+            self._config("parallel", "number_of_cores")
+            if number_of_cores is None
+            else number_of_cores
+        )
+
+        logger.debug("Creating MultiStartOptimizer NLO")
+
+    class Fitness(AbstractOptimizer.Fitness):
+        def __call__(self, parameters, pool=None):
+            """
+            Compute the figure of merit of a batch of points (e.g. the points of a finite-difference gradient), in
+            parallel if a pool is input. Points which raise a `FitException` are given the resample figure of merit.
+            """
+            figures_of_merit = figures_of_merit_from_parameters(
+                fitness_function=self, parameters=parameters, pool=pool
+            )
+            figures_of_merit[np.isnan(figures_of_merit)] = -2.0 * self.resample_figure_of_merit
+
+            return figures_of_merit
+
+        @property
+        def resample_figure_of_merit(self):
+            """If a sample raises a FitException, this value is returned to signify that the point requires resampling or
+             should be given a likelihood so low that it is discard.
+
+             An infinite figure of merit breaks the finite-difference gradients of the local optimizers, so we instead
+             use a large negative number."""
+            return -1.0e99
+
+        def figure_of_merit_from_parameters(self, parameters):
+            """The figure of merit is the value that the `NonLinearSearch` uses to sample parameter space. The
+            *MultiStartOptimizer* uses the chi-squared value, which is the -2.0*log_posterior."""
+            return -2.0 * self.log_posterior_from_parameters(parameters=parameters)
+
+        def figure_of_merit_from_log_likelihood(self, parameters, log_likelihood):
+            return -2.0 * (log_likelihood + sum(self.model.log_priors_from_vector(vector=parameters)))
+
+    def _fit(self, model: AbstractPriorModel, analysis, log_likelihood_cap=None):
+        """
+        Fit a model using the MultiStartOptimizer and the Analysis class which contains the data and returns the log
+        likelihood from instances of the model, which the `NonLinearSearch` seeks to maximize.
+
+        Parameters
+        ----------
+        model : ModelMapper
+            The model which generates instances for different points in parameter space.
+        analysis : Analysis
+            Contains the data and the log likelihood function which fits an instance of the model to the data, returning
+            the log likelihood the `NonLinearSearch` maximizes.
+        """
+        pool = self.make_pool()
+
+        fitness_function = self.fitness_function_from_model_and_analysis(
+            model=model, analysis=analysis
+        )
+
+        if os.path.exists(self.state_file):
+
+            state = self.load_state
+
+            logger.info("Existing MultiStartOptimizer samples found, resuming non-linear search.")
+
+        else:
+
+            initial_unit_parameters, initial_parameters, initial_figures_of_merit = self.initializer.initial_samples_from_model(
+                total_points=self.n_starts,
+                model=model,
+                fitness_function=fitness_function,
+                pool=pool,
+            )
+
+            state = {
+                "starts": [list(unit_vector) for unit_vector in initial_unit_parameters],
+                "local_optimizations": [],
+                "parameters": [list(vector) for vector in initial_parameters],
+                "log_posteriors": [-0.5 * figure_of_merit for figure_of_merit in initial_figures_of_merit],
+            }
+
+            logger.info("No MultiStartOptimizer samples found, beginning new non-linear search.")
+
+        logger.info(f"Running MultiStartOptimizer ({self.method}) from {self.n_starts} starting points...")
+
+        local_optimization = partial(
+            local_optimization_from_start,
+            fitness_function=fitness_function,
+            model=model,
+            method=self.method,
+            maxiter=self.maxiter,
+            ftol=self.ftol,
+            epsilon=self.epsilon,
+        )
+
+        while len(state["local_optimizations"]) < len(state["starts"]):
+
+            total_completed = len(state["local_optimizations"])
+
+            iterations = min(self.iterations_per_update, len(state["starts"]) - total_completed)
+            iterations = self.budget.iterations_within_budget(
+                iterations=iterations,
+                evaluations_per_iteration=max(
+                    sum(result["evaluations"] for result in state["local_optimizations"]) // max(total_completed, 1),
+                    1,
+                ),
+            )
+
+            starts = state["starts"][total_completed: total_completed + iterations]
+
+            with tracing.span(name="sampler", iterations=len(starts)):
+                if pool is not None and len(starts) >= self.number_of_cores:
+                    local_optimizations = pool.map(local_optimization, starts, chunksize=1)
+                else:
+                    local_optimizations = [local_optimization(start, pool=pool) for start in starts]
+
+            for local_optimization_result in local_optimizations:
+
+                state["parameters"] += local_optimization_result.pop("parameters")
+                state["log_posteriors"] += local_optimization_result.pop("log_posteriors")
+                state["local_optimizations"].append(local_optimization_result)
+
+            with open(self.state_file, "wb") as f:
+                pickle.dump(state, f)
+
+            self.output_modes(model=model, local_optimizations=state["local_optimizations"])
+
+            self.budget.add_evaluations(
+                evaluations=sum(result["evaluations"] for result in local_optimizations)
+            )
+
+            self.perform_update(model=model, analysis=analysis, during_analysis=True)
+
+            if len(state["local_optimizations"]) < len(state["starts"]) and self.budget.check():
+                break
+
+        logger.info("MultiStartOptimizer complete")
+
+    def modes_from_local_optimizations(self, local_optimizations):
+        """
+        Deduplicate the solutions of the local optimizations into distinct modes, ordered from the highest log
+        posterior. A solution is a new mode if it is further than *mode_tolerance* from every mode in the unit
+        hypercube.
+
+        Parameters
+        ----------
+        local_optimizations : [dict]
+            The result of every local optimization, containing the unit values and log posterior of its solution.
+        """
+        modes = []
+
+        for local_optimization in sorted(
+                local_optimizations, key=lambda result: -result["log_posterior"]
+        ):
+            unit_vector = np.asarray(local_optimization["unit_vector"])
+
+            for mode in modes:
+                if np.linalg.norm(unit_vector - np.asarray(mode["unit_vector"])) < self.mode_tolerance:
+                    mode["total_starts"] += 1
+                    break
+            else:
+                modes.append({**local_optimization, "total_starts": 1})
+
+        return modes
+
+    def output_modes(self, model, local_optimizations):
+        """
+        Output the distinct modes the local optimizations have converged to so far to the file modes.json in the
+        samples folder.
+        """
+        modes = self.modes_from_local_optimizations(local_optimizations=local_optimizations)
+
+        with open(os.path.join(self.paths.samples_path, "modes.json"), "w") as outfile:
+            json.dump(
+                [
+                    {
+                        "parameters": dict(zip(model.model_component_and_parameter_names, mode["vector"])),
+                        "log_posterior": mode["log_posterior"],
+                        "total_starts": mode["total_starts"],
+                        "success": mode["success"],
+                    }
+                    for mode in modes
+                ],
+                outfile,
+                indent=4,
+            )
+
+    @property
+    def tag(self):
+        """Tag the output folder of the MultiStartOptimizer non-linear search, according to the number of starting
+        points and local optimizer."""
+
+        name_tag = self._config("tag", "name")
+        n_starts_tag = f"{self._config('tag', 'n_starts')}_{self.n_starts}"
+
+        return f"{name_tag}[{n_starts_tag}_{self.method.lower()}]"
+
+    def copy_with_name_extension(self, extension, path_prefix=None, remove_phase_tag=False):
+        """Copy this instance of the MultiStartOptimizer `NonLinearSearch` with all associated attributes.
+
+        This is used to set up the `NonLinearSearch` on phase extensions."""
+        copy = super().copy_with_name_extension(
+            extension=extension, path_prefix=path_prefix, remove_phase_tag=remove_phase_tag
+        )
+        copy.prior_passer = self.prior_passer
+        copy.n_starts = self.n_starts
+        copy.method = self.method
+        copy.maxiter = self.maxiter
+        copy.ftol = self.ftol
+        copy.epsilon = self.epsilon
+        copy.mode_tolerance = self.mode_tolerance
+        copy.initializer = self.initializer
+        copy.iterations_per_update = self.iterations_per_update
+        copy.number_of_cores = self.number_of_cores
+
+        return copy
+
+    def fitness_function_from_model_and_analysis(self, model, analysis, log_likelihood_cap=None):
+
+        return MultiStartOptimizer.Fitness(
+            paths=self.paths,
+            model=model,
+            analysis=analysis,
+            samples_from_model=self.samples_via_sampler_from_model,
+            log_likelihood_cap=log_likelihood_cap,
+            best_fit=self.best_fit,
+            surrogate=self.surrogate,
+            profiler=self.profiler,
+            tracer=self.tracer,
+            metrics=self.metrics,
+        )
+
+    def samples_via_sampler_from_model(self, model):
+        """Create an *OptimizerSamples* object from this non-linear search's output files on the hard-disk and model.
+
+        For the MultiStartOptimizer, all quantities are extracted via the pickled state of the search, which contains
+        every point evaluated by the local optimizers and its log posterior.
+
+        Parameters
+        ----------
+        model
+            The model which generates instances for different points in parameter space. This maps the points from unit
+            cube values to physical values via the priors.
+        """
+        state = self.load_state
+
+        parameters = state["parameters"]
+        log_posteriors = state["log_posteriors"]
+
+        log_priors = [
+            sum(model.log_priors_from_vector(vector=vector)) for vector in parameters
+        ]
+        log_likelihoods = [lp - prior for lp, prior in zip(log_posteriors, log_priors)]
+        weights = len(log_likelihoods) * [1.0]
+
+        return OptimizerSamples(
+            model=model,
+            samples=Sample.from_lists(
+                parameters=parameters,
+                log_likelihoods=log_likelihoods,
+                log_priors=log_priors,
+                weights=weights,
+                model=model
+            ),
+            time=self.timer.time
+        )
+
+    @property
+    def state_file(self):
+        return "{}/{}.pickle".format(self.paths.samples_path, "multi_start")
+
+    @property
+    def load_state(self):
+        with open(self.state_file, "rb") as f:
+            return pickle.load(f)
+
+    def remove_state_files(self):
+        os.remove(self.state_file)
+
+
+def local_optimization_from_start(
+        start, fitness_function, model, method, maxiter, ftol, epsilon, pool=None
+):
+    """
+    Run a scipy local optimization in the unit hypercube from one starting point, minimizing the figure of merit
+    (chi-squared) of the fitness function. This is a module level function so that it can be pickled and passed to a
+    pool.
+
+    Every point evaluated is recorded, so the evaluation trace can be used as the samples of the search.
+
+    Parameters
+    ----------
+    start : [float]
+        The unit values of the starting point.
+    fitness_function : MultiStartOptimizer.Fitness
+        The fitness function whose figure of merit is minimized.
+    model : ModelMapper
+        The model which maps unit values to physical values via its priors.
+    method : str
+        The scipy local optimizer, either "L-BFGS-B" or "Nelder-Mead".
+    pool : multiprocessing.Pool
+        If input, the batch of points of every finite-difference gradient is evaluated in parallel over the pool.
+    """
+    parameters = []
+    log_posteriors = []
+
+    def figures_of_merit_from_unit_vectors(unit_vectors):
+
+        vectors = model.vectors_from_unit_vectors(
+            unit_vectors=reflect_into_unit_hypercube(np.asarray(unit_vectors))
+        )
+
+        figures_of_merit = fitness_function(parameters=vectors, pool=pool)
+
+        parameters.extend(vectors.tolist())
+        log_posteriors.extend((-0.5 * figures_of_merit).tolist())
+
+        return figures_of_merit
+
+    def figure_of_merit(unit_vector):
+        return figures_of_merit_from_unit_vectors(unit_vectors=[unit_vector])[0]
+
+    def figure_of_merit_and_gradient(unit_vector):
+
+        steps = np.where(unit_vector + epsilon <= 1.0, epsilon, -epsilon)
+
+        unit_vectors = np.vstack([unit_vector, unit_vector + np.diag(steps)])
+
+        figures_of_merit = figures_of_merit_from_unit_vectors(unit_vectors=unit_vectors)
+
+        return figures_of_merit[0], (figures_of_merit[1:] - figures_of_merit[0]) / steps
+
+    start = np.asarray(start, dtype="float")
+
+    if method == "L-BFGS-B":
+        result = optimize.minimize(
+            figure_of_merit_and_gradient,
+            x0=start,
+            jac=True,
+            method=method,
+            bounds=[(0.0, 1.0)] * len(start),
+            options={"maxiter": maxiter, "ftol": ftol},
+        )
+    else:
+        result = optimize.minimize(
+            figure_of_merit,
+            x0=start,
+            method=method,
+            options={"maxiter": maxiter, "fatol": ftol},
+        )
+
+    unit_vector = reflect_into_unit_hypercube(np.asarray(result.x))
+
+    return {
+        "unit_vector": unit_vector.tolist(),
+        "vector": model.vector_from_unit_vector(unit_vector=unit_vector),
+        "log_posterior": -0.5 * float(result.fun),
+        "success": bool(result.success),
+        "evaluations": len(parameters),
+        "parameters": parameters,
+        "log_posteriors": log_posteriors,
+    }
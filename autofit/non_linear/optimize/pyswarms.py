@@ -1,10 +1,14 @@
 import os
 import pickle
+from functools import partial
 
 import numpy as np
 
 from autofit import exc
 from autofit.mapper.prior_model.abstract import AbstractPriorModel
+from autofit.non_linear import profiling
+from autofit.non_linear import tracing
+from autofit.non_linear.initializer import log_likelihoods_from_parameters
 from autofit.non_linear.log import logger
 from autofit.non_linear.optimize.abstract_optimize import AbstractOptimizer
 from autofit.non_linear.paths import convert_paths
@@ -130,22 +134,34 @@ class AbstractPySwarms(AbstractOptimizer):
         logger.debug("Creating PySwarms NLO")
 
     class Fitness(AbstractOptimizer.Fitness):
-        def __call__(self, parameters):
+        def __call__(self, parameters, pool=None):
+            """
+            Compute the figure of merit of every particle of the swarm as one batch, in parallel if a pool is input.
 
-            figures_of_merit = []
+            Particles outside the limits of the priors are given the resample figure of merit without making their
+            instances, the log likelihoods of the other particles are evaluated in one chunk per process (see
+            `log_likelihoods_from_parameters`) and their log priors are computed for the whole swarm at once.
+            """
+            parameters = np.asarray(parameters, dtype="float")
 
-            for params_of_particle in parameters:
+            figures_of_merit = np.full(len(parameters), -2.0 * self.resample_figure_of_merit)
 
-                try:
-                    figure_of_merit = self.figure_of_merit_from_parameters(
-                        parameters=params_of_particle
-                    )
-                except exc.FitException:
-                    figure_of_merit = -2.0 * self.resample_figure_of_merit
+            within_limits = self.model.vectors_within_prior_limits(vectors=parameters)
 
-                figures_of_merit.append(figure_of_merit)
+            if not np.any(within_limits):
+                return figures_of_merit
 
-            return np.asarray(figures_of_merit)
+            log_likelihoods = log_likelihoods_from_parameters(
+                fitness_function=self, parameters=parameters[within_limits], pool=pool
+            )
+
+            with profiling.section("log_priors"):
+                log_priors = self.model.log_priors_from_vectors(vectors=parameters[within_limits])
+
+            figures_of_merit[within_limits] = -2.0 * (log_likelihoods + log_priors)
+            figures_of_merit[np.isnan(figures_of_merit)] = -2.0 * self.resample_figure_of_merit
+
+            return figures_of_merit
 
         def figure_of_merit_from_parameters(self, parameters):
             """The figure of merit is the value that the `NonLinearSearch` uses to sample parameter space. *PySwarms*
@@ -155,6 +171,9 @@ class AbstractPySwarms(AbstractOptimizer):
             except exc.FitException:
                 raise exc.FitException
 
+        def figure_of_merit_from_log_likelihood(self, parameters, log_likelihood):
+            return -2.0 * (log_likelihood + sum(self.model.log_priors_from_vector(vector=parameters)))
+
     def _fit(self, model: AbstractPriorModel, analysis, log_likelihood_cap=None):
         """
         Fit a model using PySwarms and the Analysis class which contains the data and returns the log likelihood from
@@ -173,12 +192,14 @@ class AbstractPySwarms(AbstractOptimizer):
         A result object comprising the Samples object that inclues the maximum log likelihood instance and full
         chains used by the fit.
         """
-        pool, pool_ids = self.make_pool()
+        pool = self.make_pool()
 
         fitness_function = self.fitness_function_from_model_and_analysis(
-            model=model, analysis=analysis, pool_ids=pool_ids
+            model=model, analysis=analysis
         )
 
+        self.fidelity.apply(fitness_function=fitness_function)
+
         if os.path.exists("{}/{}.pickle".format(self.paths.samples_path, "points")):
 
             init_pos = self.load_points[-1]
@@ -192,6 +213,7 @@ class AbstractPySwarms(AbstractOptimizer):
                 total_points=self.n_particles,
                 model=model,
                 fitness_function=fitness_function,
+                pool=pool,
             )
 
             init_pos = np.zeros(shape=(self.n_particles, model.prior_count))
@@ -215,6 +237,8 @@ class AbstractPySwarms(AbstractOptimizer):
 
         logger.info("Running PySwarmsGlobal Optimizer...")
 
+        previous_best_log_posterior = None
+
         while total_iterations < self.iters:
 
             pso = self.sampler_fom_model_and_fitness(
@@ -231,9 +255,14 @@ class AbstractPySwarms(AbstractOptimizer):
             else:
                 iterations = self.iterations_per_update
 
+            iterations = self.budget.iterations_within_budget(
+                iterations=iterations, evaluations_per_iteration=self.n_particles
+            )
+
             if iterations > 0:
 
-                pso.optimize(objective_func=fitness_function.__call__, iters=iterations)
+                with tracing.span(name="sampler", iterations=iterations):
+                    pso.optimize(objective_func=partial(fitness_function.__call__, pool=pool), iters=iterations)
 
                 total_iterations += iterations
 
@@ -250,12 +279,32 @@ class AbstractPySwarms(AbstractOptimizer):
                 ) as f:
                     pickle.dump([-0.5 * cost for cost in pso.cost_history], f)
 
+                self.budget.add_evaluations(evaluations=iterations * self.n_particles)
+
+                best_log_posterior = -0.5 * np.min(pso.cost_history)
+
+                if self.fidelity.update(
+                        fitness_function=fitness_function,
+                        evaluations=iterations * self.n_particles,
+                        converged=self.fidelity.is_stalled(
+                            log_posterior=best_log_posterior,
+                            previous_log_posterior=previous_best_log_posterior,
+                        ),
+                        reason="stall",
+                ):
+                    best_log_posterior = None
+
+                previous_best_log_posterior = best_log_posterior
+
                 self.perform_update(
                     model=model, analysis=analysis, during_analysis=True
                 )
 
                 init_pos = self.load_points[-1]
 
+                if total_iterations < self.iters and self.budget.check():
+                    break
+
         logger.info("PySwarmsGlobal complete")
 
     @property
@@ -291,7 +340,7 @@ class AbstractPySwarms(AbstractOptimizer):
 
         return copy
 
-    def fitness_function_from_model_and_analysis(self, model, analysis, log_likelihood_cap=None, pool_ids=None):
+    def fitness_function_from_model_and_analysis(self, model, analysis, log_likelihood_cap=None):
 
         return PySwarmsGlobal.Fitness(
             paths=self.paths,
@@ -299,7 +348,11 @@ class AbstractPySwarms(AbstractOptimizer):
             analysis=analysis,
             samples_from_model=self.samples_via_sampler_from_model,
             log_likelihood_cap=log_likelihood_cap,
-            pool_ids=pool_ids,
+            best_fit=self.best_fit,
+            surrogate=self.surrogate,
+            profiler=self.profiler,
+            tracer=self.tracer,
+            metrics=self.metrics,
         )
 
     def sampler_fom_model_and_fitness(self, model, fitness_function):
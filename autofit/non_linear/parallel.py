@@ -1,10 +1,76 @@
 import multiprocessing
+import os
+import pickle
+import socket
+import threading
+import time
+import traceback
+import uuid
 from abc import ABC, abstractmethod
+from collections import deque
 from itertools import count
-from time import sleep
+from multiprocessing import connection
+from os import path
 from typing import Iterable
 
+from autofit import exc
+from autofit.non_linear import tracing
 from autofit.non_linear.log import logger
+from autofit.non_linear.per_process import registry
+
+
+def _shared_for_process(key):
+    """
+    Returns the object shared with this process under *key*, which a `Shared` reference is unpickled to.
+    """
+    try:
+        return registry("Shared")[key]
+    except KeyError:
+        raise exc.GridSearchException(
+            f"The shared object {key} was not sent to this process, so a job referencing it cannot be performed"
+        )
+
+
+class Shared:
+    def __init__(self, value):
+        """
+        A reference to an object which is shared by many jobs, for example the analysis of every cell of a grid
+        search, so that it is sent to every process once rather than with every job.
+
+        While the reference is open the object is registered in this process, and every `Process` started by
+        `Process.run_jobs` receives the registered objects when it starts: without copying if processes are forked,
+        or pickled once per process otherwise. A job holding the reference is pickled with only its key, and is
+        unpickled in the process with the shared object in its place, so every job of a process uses the same object.
+
+        A job performed in the process which made the reference holds the reference itself, whose object is
+        *value*.
+        """
+        self.key = uuid.uuid4().hex
+        self.value = value
+
+        registry("Shared")[self.key] = value
+
+    def __reduce__(self):
+        return _shared_for_process, (self.key,)
+
+    def close(self):
+        """
+        Unregister the shared object, so processes started afterwards do not receive it.
+        """
+        registry("Shared").pop(self.key, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def shared_value(value):
+    """
+    The object of a `Shared` reference, or *value* if it is not a reference.
+    """
+    return value.value if isinstance(value, Shared) else value
 
 
 class AbstractJobResult(ABC):
@@ -37,10 +103,23 @@ class AbstractJob(ABC):
         """
 
 
+class JobError:
+    def __init__(self, number, exception, formatted_traceback):
+        """
+        Sent by a process in place of the result of a job whose perform method raised an exception.
+        """
+        self.number = number
+        self.exception = exception
+        self.formatted_traceback = formatted_traceback
+
+
 class Process(multiprocessing.Process):
-    def __init__(self, name: str, job_queue: multiprocessing.Queue):
+    def __init__(self, name: str, job_queue: multiprocessing.Queue, result_connection=None, tracer=None, shared=None):
         """
-        A parallel process that consumes Jobs through the job queue and outputs results through its own queue.
+        A parallel process that consumes Jobs through its job queue and sends their results through its result
+        connection.
+
+        The process blocks waiting for its next job, and stops when it is sent None.
 
         Parameters
         ----------
@@ -48,80 +127,620 @@ class Process(multiprocessing.Process):
             The name of the process
         job_queue: multiprocessing.Queue
             The queue through which jobs are submitted
+        result_connection: Connection
+            The end of a pipe the results of jobs are sent through
+        tracer: Tracer
+            If input, the start and finish of every job is traced as a span of this tracer.
+        shared: dict
+            The objects shared by jobs (see `Shared`), which are registered in the process when it starts.
         """
+        # Processes are not daemonic, as the search of a job may start a pool of its own.
+
         super().__init__(name=name)
         logger.info("created process {}".format(name))
 
         self.job_queue = job_queue
-        self.queue = multiprocessing.Queue()
-        self.count = 0
-        self.max_count = 250
+        self.result_connection = result_connection
+        self.tracer = tracer
+        self.shared = shared or {}
 
     def run(self):
         """
         Run this process, completing each job in the job_queue and
-        passing the result to the queue.
+        sending the result through the result connection.
         """
         logger.info("starting process {}".format(self.name))
+
+        registry("Shared").update(self.shared)
+
+        if self.tracer is not None:
+            self.tracer.activate()
+
         while True:
-            sleep(0.025)
-            if self.count >= self.max_count:
+
+            job = self.job_queue.get()
+
+            if job is None:
                 break
-            if self.job_queue.empty():
-                self.count += 1
-            else:
-                self.count = 0
-                job = self.job_queue.get()
-                self.queue.put(job.perform())
+
+            with tracing.span(name="job", category="grid_search", number=job.number, process=self.name):
+                try:
+                    result = job.perform()
+                except Exception as e:
+                    result = JobError(number=job.number, exception=e, formatted_traceback=traceback.format_exc())
+
+            if self.tracer is not None:
+                self.tracer.flush()
+
+            try:
+                self.result_connection.send(result)
+            except Exception as e:
+                self.result_connection.send(
+                    JobError(number=job.number, exception=e, formatted_traceback=traceback.format_exc())
+                )
+
         logger.info("terminating process {}".format(self.name))
-        self.job_queue.close()
+        self.result_connection.close()
 
     @classmethod
     def run_jobs(
             cls,
             jobs: Iterable[AbstractJob],
-            number_of_cores: int
+            number_of_cores: int,
+            tracer=None,
+            jobs_per_process: int = 2,
+            max_retries: int = 1,
+            raise_errors: bool = True,
+            poll_interval: float = None,
     ):
         """
-        Run the collection of jobs across n - 1 other cores.
+        Run the collection of jobs across n processes, yielding the result of every job as it is completed.
+
+        The jobs are taken from *jobs* as processes become free, so each process holds at most *jobs_per_process*
+        jobs which have not completed and jobs are only pickled when they are sent. The results are collected by
+        blocking until a process sends a result or a process stops, so the parent process does not use a core.
+
+        Objects shared by jobs through a `Shared` reference are sent to every process when it starts, so a job is sent
+        with only a reference to them.
+
+        If a process stops before completing its jobs (for example it is killed for using too much memory) a new
+        process is started and its jobs are sent again, up to *max_retries* times per job. If a job raises an
+        exception, or is still not completed after it has been retried, a `GridSearchException` is raised.
 
         Parameters
         ----------
         jobs
-            Serializable concrete children of the AbstractJob class
+            Serializable concrete children of the AbstractJob class. For jobs which depend on the results of other
+            jobs, None may be yielded if no job can be sent until a job which is running completes, in which case the
+            next job is taken after the next result is yielded.
         number_of_cores
-            The number of cores this computer has. Must be at least 2.
+            The number of cores this computer has, which is the number of processes started.
+        tracer
+            If input, the start and finish of every job on every process is traced as a span of this tracer.
+        jobs_per_process
+            The number of jobs sent to a process at once, so that a process starts its next job while the result of
+            its last job is sent.
+        max_retries
+            The number of times a job is sent again if the process performing it stopped.
+        raise_errors
+            If `False` the `JobError` of a job which raised an exception is yielded in place of its result, rather
+            than a `GridSearchException` being raised.
+        poll_interval
+            If input, *jobs* is polled for jobs every *poll_interval* seconds until it is exhausted, even if no job is
+            running, and None is yielded every time no result is received in *poll_interval* seconds. This is for
+            jobs which become available without a job completing, for example jobs released by another node of a
+            `FileJobQueue`.
         """
-        if number_of_cores < 2:
+        if number_of_cores < 1:
             raise AssertionError(
-                "The number of cores available must be at least 2 for parallel to run"
+                "The number of cores available must be at least 1 for parallel to run"
             )
 
-        job_queue = multiprocessing.Queue()
+        jobs = iter(jobs)
+        retries = deque()
+        retry_count = {}
 
-        processes = [
-            Process(str(number), job_queue)
-            for number in range(number_of_cores - 1)
-        ]
+        exhausted = False
 
-        total = 0
-        for job in jobs:
-            job_queue.put(job)
-            total += 1
+        names = count()
+        processes = {}
 
-        for process in processes:
+        def start_process():
+            receiver, sender = multiprocessing.Pipe(duplex=False)
+            process = Process(
+                str(next(names)),
+                multiprocessing.Queue(),
+                result_connection=sender,
+                tracer=tracer,
+                shared=dict(registry("Shared")),
+            )
             process.start()
+            sender.close()
+            processes[process] = (receiver, {})
+
+        def next_job():
+            nonlocal exhausted
+            if retries:
+                return retries.popleft()
+            if exhausted:
+                return None
+            try:
+                return next(jobs)
+            except StopIteration:
+                exhausted = True
+                return None
 
-        count = 0
+        def dispatch():
+            for process, (receiver, pending) in processes.items():
+                while len(pending) < jobs_per_process:
+                    job = next_job()
+                    if job is None:
+                        return
+                    pending[job.number] = job
+                    process.job_queue.put(job)
+
+        def stopped(process):
+            receiver, pending = processes.pop(process)
+            receiver.close()
+            process.job_queue.close()
+
+            if len(pending) == 0:
+                return
+
+            logger.warning(
+                f"Process {process.name} stopped with exit code {process.exitcode} before completing jobs "
+                f"{sorted(pending)}"
+            )
+
+            for number, job in pending.items():
+                retry_count[number] = retry_count.get(number, 0) + 1
+                if retry_count[number] > max_retries:
+                    raise exc.GridSearchException(
+                        f"Job {number} was not completed, as the process performing it stopped "
+                        f"{retry_count[number]} times"
+                    )
+                retries.append(job)
+
+            start_process()
+
+        for _ in range(number_of_cores):
+            start_process()
+
+        try:
+
+            dispatch()
+
+            while any(pending for receiver, pending in processes.values()) or (
+                    poll_interval is not None and not exhausted
+            ):
+
+                waitables = {}
+
+                for process, (receiver, pending) in processes.items():
+                    waitables[receiver] = process
+                    waitables[process.sentinel] = process
+
+                ready = {
+                    waitables[waitable] for waitable in connection.wait(list(waitables), timeout=poll_interval)
+                }
+
+                if len(ready) == 0:
+                    yield None
+
+                for process in ready:
+
+                    receiver, pending = processes[process]
+
+                    # Results sent before a process stopped are received before its jobs are sent again.
+
+                    while True:
+
+                        try:
+                            if not receiver.poll():
+                                break
+                            result = receiver.recv()
+                        except (EOFError, OSError):
+                            process.join()
+                            break
+
+                        del pending[result.number]
+
+                        if isinstance(result, JobError) and raise_errors:
+                            raise exc.GridSearchException(
+                                f"Job {result.number} raised an exception on process {process.name}:\n"
+                                f"{result.formatted_traceback}"
+                            ) from result.exception
+
+                        yield result
+
+                    if process.exitcode is not None:
+                        stopped(process)
+
+                dispatch()
+
+        finally:
 
-        while count < total:
             for process in processes:
-                while not process.queue.empty():
-                    result = process.queue.get()
-                    count += 1
+                try:
+                    process.job_queue.put(None)
+                except (ValueError, OSError):
+                    pass
+
+            for process, (receiver, pending) in processes.items():
+                process.join(timeout=1.0)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+                receiver.close()
+                process.job_queue.close()
+
+
+class QueuedJob(AbstractJob):
+    def __init__(self, job: AbstractJob):
+        """
+        A job claimed from a `FileJobQueue`, which returns a `JobError` in place of its result if it raises an
+        exception, so the error is recorded in the queue for the processes on every node.
+        """
+        self.job = job
+        self.number = job.number
+
+    def perform(self):
+        try:
+            return self.job.perform()
+        except Exception as e:
+            return JobError(number=self.number, exception=e, formatted_traceback=traceback.format_exc())
+
+
+class FileJobQueue:
+    def __init__(
+            self,
+            directory: str,
+            lease_time: float = 60.0,
+            heartbeat_interval: float = 10.0,
+            poll_interval: float = 1.0,
+    ):
+        """
+        A queue of jobs in a directory of a shared filesystem, through which processes on several nodes (for example
+        the jobs of a cluster which run the same script) perform the jobs of the same grid search or sensitivity map.
+
+        Every node generates the same jobs, which are identified by their *index* attribute. A node claims a job by
+        creating its lease file in the leases folder, which fails if the file already exists, and writes the pickled
+        result of the job to the results folder when it completes. While a node performs a job its lease file is
+        touched every *heartbeat_interval* seconds, and a lease which has not been touched for *lease_time* seconds
+        is taken to belong to a node which stopped, so the job is claimed by another node. The clocks of the nodes must
+        agree to well within *lease_time*, and a job may be performed twice if a node which was taken to have stopped
+        completes it.
+
+        If a job raises an exception the traceback is written to the errors folder and every node raises a
+        `GridSearchException`.
+
+        Results are also collected from the results folder, so every node yields the result of every job and can
+        assemble the result of the grid search or sensitivity map. As results are kept in the queue, a node which is
+        started after the jobs have completed only collects their results.
+
+        Parameters
+        ----------
+        directory
+            The directory of the queue, which every node must be able to read and write.
+        lease_time
+            The time in seconds after which the lease of a job which has not been touched expires.
+        heartbeat_interval
+            The time in seconds between touches of the leases of the jobs a node is performing.
+        poll_interval
+            The time in seconds a node waits for other nodes to complete jobs when it has no job to perform.
+        """
+        if heartbeat_interval >= lease_time:
+            raise AssertionError("The heartbeat interval of a job queue must be less than its lease time")
+
+        self.directory = directory
+        self.lease_time = lease_time
+        self.heartbeat_interval = heartbeat_interval
+        self.poll_interval = poll_interval
+
+        self.worker = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+
+        self._leases = set()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @staticmethod
+    def lease_filename(queue_path, index) -> str:
+        return path.join(queue_path, "leases", f"{index}.lease")
+
+    @staticmethod
+    def result_filename(queue_path, index) -> str:
+        return path.join(queue_path, "results", f"{index}.pickle")
+
+    @staticmethod
+    def error_filename(queue_path, index) -> str:
+        return path.join(queue_path, "errors", f"{index}.txt")
+
+    def is_complete(self, queue_path, index) -> bool:
+        return path.exists(self.result_filename(queue_path, index)) or path.exists(
+            self.error_filename(queue_path, index)
+        )
+
+    def claim(self, queue_path, index) -> bool:
+        """
+        Claim the job with *index* for this node, returning whether it was claimed.
+
+        The job is not claimed if it is complete or another node holds a lease for it which has not expired. An
+        expired lease is moved aside before the job is claimed, so only one node breaks it.
+        """
+        if self.is_complete(queue_path, index):
+            return False
+
+        filename = self.lease_filename(queue_path, index)
+
+        try:
+            descriptor = os.open(filename, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+
+            try:
+                if time.time() - path.getmtime(filename) < self.lease_time:
+                    return False
+                os.rename(filename, f"{filename}.{self.worker}")
+            except FileNotFoundError:
+                return False
+
+            # Another node may have broken the expired lease and claimed the job between the lease being checked and
+            # moved aside, in which case its lease is restored.
+
+            if time.time() - path.getmtime(f"{filename}.{self.worker}") < self.lease_time:
+                try:
+                    os.link(f"{filename}.{self.worker}", filename)
+                except OSError:
+                    pass
+                os.remove(f"{filename}.{self.worker}")
+                return False
+
+            os.remove(f"{filename}.{self.worker}")
+
+            logger.warning(f"The lease of job {index} in {queue_path} expired and the job is claimed again")
+
+            return self.claim(queue_path=queue_path, index=index)
+
+        with os.fdopen(descriptor, "w") as lease:
+            lease.write(self.worker)
+
+        with self._lock:
+            self._leases.add(filename)
+
+        if self.is_complete(queue_path, index):
+            self.release(queue_path=queue_path, index=index)
+            return False
+
+        return True
+
+    def release(self, queue_path, index):
+        """
+        Release the lease of this node for the job with *index*.
+        """
+        filename = self.lease_filename(queue_path, index)
+
+        with self._lock:
+            self._leases.discard(filename)
+
+        try:
+            os.remove(filename)
+        except FileNotFoundError:
+            pass
+
+    def complete(self, queue_path, index, result):
+        """
+        Write the result of the job with *index* to the queue and release its lease, where the traceback is written
+        in place of the result of a job which raised an exception.
+        """
+        if isinstance(result, JobError):
+            filename = self.error_filename(queue_path, index)
+            with open(f"{filename}.{self.worker}", "w") as f:
+                f.write(result.formatted_traceback)
+        else:
+            filename = self.result_filename(queue_path, index)
+            with open(f"{filename}.{self.worker}", "wb") as f:
+                pickle.dump(result, f)
+
+        os.replace(f"{filename}.{self.worker}", filename)
+
+        self.release(queue_path=queue_path, index=index)
+
+    def result_for(self, queue_path, index):
+        """
+        The result of the job with *index* if it is complete, else None.
+
+        Raises
+        ------
+        GridSearchException
+            If the job raised an exception
+        """
+        try:
+            with open(self.error_filename(queue_path, index)) as f:
+                raise exc.GridSearchException(f"Job {index} in {queue_path} raised an exception:\n{f.read()}")
+        except FileNotFoundError:
+            pass
+
+        try:
+            with open(self.result_filename(queue_path, index), "rb") as f:
+                return pickle.load(f)
+        except FileNotFoundError:
+            return None
+
+    def start(self):
+
+        self.stop()
+
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._heartbeat, name="job_queue", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop touching leases, and release the leases of jobs this node did not complete so other nodes claim them.
+        """
+        if self._thread is not None:
+            self._stop_event.set()
+            self._thread.join()
+            self._thread = None
+
+        with self._lock:
+            leases, self._leases = self._leases, set()
+
+        for filename in leases:
+            try:
+                os.remove(filename)
+            except FileNotFoundError:
+                pass
+
+    def _heartbeat(self):
+
+        while not self._stop_event.wait(self.heartbeat_interval):
+
+            with self._lock:
+                leases = list(self._leases)
+
+            for filename in leases:
+                try:
+                    os.utime(filename)
+                except FileNotFoundError:
+                    logger.warning(f"The lease {filename} was taken by another node")
+                    with self._lock:
+                        self._leases.discard(filename)
+
+    def run_jobs(self, jobs: Iterable[AbstractJob], name: str = "jobs", number_of_cores: int = 1, tracer=None):
+        """
+        Run a collection of jobs through the queue, yielding the result of every job as it is completed by this node
+        or another node.
+
+        Jobs are taken from *jobs* lazily, following the protocol of `Process.run_jobs`, where None is yielded if no
+        job can be taken until the next result is yielded. The jobs this node claims are performed on this process if
+        *number_of_cores* is 1, else by `Process.run_jobs` on *number_of_cores* processes.
+
+        Parameters
+        ----------
+        jobs
+            Serializable concrete children of the AbstractJob class, each with an *index* which is unique in the
+            collection and the same on every node.
+        name
+            The name of the folder of the queue for this collection of jobs, so that several collections (e.g. the
+            levels of a refined grid search) are run through one queue.
+        number_of_cores
+            The number of processes of this node which perform jobs.
+        tracer
+            If input, every job performed by this node is traced as a span of this tracer.
+        """
+        queue_path = path.join(self.directory, name)
+
+        for folder in ("leases", "results", "errors"):
+            os.makedirs(path.join(queue_path, folder), exist_ok=True)
+
+        jobs = iter(jobs)
+        waiting = {}
+        running = {}
+
+        exhausted = False
+        blocked = False
+
+        def take_jobs():
+            nonlocal exhausted, blocked
+            while not exhausted and not blocked:
+                try:
+                    job = next(jobs)
+                except StopIteration:
+                    exhausted = True
+                    return
+                if job is None:
+                    blocked = True
+                else:
+                    waiting[job.index] = job
+
+        def claimed_jobs():
+            """
+            Claim jobs as the processes of this node become free, yielding None when no job can be claimed until a
+            job completes on this node or another node.
+            """
+            while True:
+
+                take_jobs()
+
+                claimed = False
+
+                for index in sorted(waiting):
+                    if index in waiting and index not in running.values() and self.claim(
+                            queue_path=queue_path, index=index
+                    ):
+                        running[waiting[index].number] = index
+                        claimed = True
+                        yield QueuedJob(waiting[index])
+
+                if exhausted and all(index in running.values() for index in waiting):
+                    return
+
+                if not claimed:
+                    yield None
+
+        def perform(queued_jobs):
+            if number_of_cores > 1:
+                yield from Process.run_jobs(
+                    queued_jobs,
+                    number_of_cores,
+                    tracer=tracer,
+                    raise_errors=False,
+                    poll_interval=self.poll_interval,
+                )
+                return
+            for queued_job in queued_jobs:
+                if queued_job is None:
+                    time.sleep(self.poll_interval)
+                    yield None
+                    continue
+                with tracing.span(name="job", category="grid_search", number=queued_job.number):
+                    yield queued_job.perform()
+
+        def collect():
+            """
+            Yield the results of the jobs which were completed by other nodes.
+            """
+            nonlocal blocked
+            for index in sorted(waiting):
+                if index in waiting and index not in running.values():
+                    result = self.result_for(queue_path=queue_path, index=index)
+                    if result is not None:
+                        del waiting[index]
+                        blocked = False
+                        yield result
+
+        results = perform(claimed_jobs())
+
+        self.start()
+
+        try:
+
+            # Every job this node claims is performed by the same processes, and the results of other nodes are
+            # collected whenever a job of this node completes or the queue is polled.
+
+            for result in results:
+
+                if result is not None:
+
+                    index = running.pop(result.number)
+
+                    self.complete(queue_path=queue_path, index=index, result=result)
+
+                    if isinstance(result, JobError):
+                        raise exc.GridSearchException(
+                            f"Job {index} in {queue_path} raised an exception:\n{result.formatted_traceback}"
+                        ) from result.exception
+
+                    del waiting[index]
+                    blocked = False
+
                     yield result
 
-        job_queue.close()
+                yield from collect()
+
+            yield from collect()
 
-        for process in processes:
-            process.join(timeout=1.0)
+        finally:
+            results.close()
+            self.stop()
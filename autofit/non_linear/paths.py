@@ -8,6 +8,7 @@ import copy
 
 from autoconf import conf
 from autofit.mapper import link
+from autofit.non_linear import tracing
 from autofit.non_linear.log import logger
 
 
@@ -340,24 +341,27 @@ class Paths:
         Copy files from the sym linked search folder then remove the sym linked folder.
         """
 
-        self.zip()
+        with tracing.span(name="zip_remove", category="zip"):
 
-        if self.remove_files:
-            try:
-                shutil.rmtree(self.path)
-            except (FileNotFoundError, PermissionError):
-                pass
+            self.zip()
+
+            if self.remove_files:
+                try:
+                    shutil.rmtree(self.path)
+                except (FileNotFoundError, PermissionError):
+                    pass
 
     def restore(self):
         """
         Copy files from the ``.zip`` file to the samples folder.
         """
 
-        if path.exists(self.zip_path):
-            with zipfile.ZipFile(self.zip_path, "r") as f:
-                f.extractall(self.output_path)
+        with tracing.span(name="restore", category="zip"):
+            if path.exists(self.zip_path):
+                with zipfile.ZipFile(self.zip_path, "r") as f:
+                    f.extractall(self.output_path)
 
-            os.remove(self.zip_path)
+                os.remove(self.zip_path)
 
     def zip(self):
 
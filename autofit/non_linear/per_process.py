@@ -0,0 +1,91 @@
+import uuid
+
+_registries = {}
+
+
+def registry(namespace: str) -> dict:
+    """
+    The objects registered in this process under *namespace*, keyed by the run id or key they are registered under.
+    """
+    return _registries.setdefault(namespace, {})
+
+
+def _instance_for_process(cls, run_id, settings, attributes):
+    """
+    Returns the instance of a run in this process, creating it from its settings and attributes if this is the first
+    time it is unpickled in the process.
+    """
+    instances = registry(cls.__name__)
+
+    if run_id in instances:
+        instance = instances[run_id]
+    else:
+        instance = cls(**settings)
+        instance.__dict__.update(attributes)
+        instance.run_id = run_id
+
+        if run_id is not None:
+            instances[run_id] = instance
+
+    instance.unpickled_in_process()
+
+    return instance
+
+
+class PerProcess:
+    """
+    A component of a run of a `NonLinearSearch` (e.g. its profiler or tracer) of which every process keeps one
+    instance for the whole run.
+
+    Components are pickled with the fitness function, which is sent to a process with every task of a pool. Only the
+    run id, settings and process attributes of a component are pickled, and it is unpickled to the instance registered
+    in the process under the run id, which is created the first time the component is unpickled in the process.
+    """
+
+    run_id = None
+
+    @property
+    def settings(self) -> dict:
+        """
+        The keyword arguments the component is created with in another process.
+        """
+        return {}
+
+    @property
+    def process_attributes(self) -> dict:
+        """
+        The attributes set on the component when it is created in another process, e.g. the folder it outputs to.
+        """
+        return {}
+
+    @property
+    def process_run_id(self):
+        """
+        The run id copies of the component are registered under in other processes, which is None if they are not
+        registered (e.g. because the component is disabled).
+        """
+        return self.run_id
+
+    def unpickled_in_process(self):
+        """
+        Called every time the component is unpickled in a process.
+        """
+
+    def __reduce__(self):
+        return _instance_for_process, (type(self), self.process_run_id, self.settings, self.process_attributes)
+
+    def register(self, run_id=None):
+        """
+        Register the component in this process under the run id of a run, which is a new run if *run_id* is None.
+        """
+        self.unregister()
+
+        self.run_id = run_id or uuid.uuid4().hex
+
+        registry(type(self).__name__)[self.run_id] = self
+
+    def unregister(self):
+        """
+        Unregister the component from this process, so that copies unpickled afterwards are new instances.
+        """
+        registry(type(self).__name__).pop(self.run_id, None)
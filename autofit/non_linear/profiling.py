@@ -0,0 +1,340 @@
+import json
+import math
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from os import path
+
+from autofit.non_linear import tracing
+from autofit.non_linear.log import logger
+from autofit.non_linear.per_process import PerProcess
+
+_active_profiler = None
+
+total_buckets = 32
+
+
+@contextmanager
+def section(name):
+    """
+    Time a section of code with the active profiler of this process, which does nothing if profiling is disabled.
+
+    Sections may be nested, in which case the time of the inner section is included in the total time of the outer
+    section but not its self time. If tracing is enabled, every section is also recorded as a span of the trace.
+    """
+    with tracing.span(name=name, category="section"):
+
+        profiler = _active_profiler
+
+        if profiler is None:
+            yield
+            return
+
+        profiler.enter()
+
+        try:
+            yield
+        finally:
+            profiler.exit(name=name)
+
+
+class SectionTiming:
+    def __init__(self):
+        """
+        The timings of every call of one section of code, where the histogram counts calls in buckets of powers of two
+        microseconds (bucket i holds calls taking between 2^(i-1) and 2^i microseconds).
+        """
+        self.count = 0
+        self.total = 0.0
+        self.self_total = 0.0
+        self.minimum = math.inf
+        self.maximum = 0.0
+        self.histogram = [0] * total_buckets
+
+    def add(self, elapsed, self_elapsed):
+
+        self.count += 1
+        self.total += elapsed
+        self.self_total += self_elapsed
+
+        if elapsed < self.minimum:
+            self.minimum = elapsed
+        if elapsed > self.maximum:
+            self.maximum = elapsed
+
+        bucket = math.frexp(elapsed * 1.0e6)[1] if elapsed > 1.0e-6 else 0
+        self.histogram[min(bucket, total_buckets - 1)] += 1
+
+    def dict(self) -> dict:
+        return {
+            "count": self.count,
+            "total": self.total,
+            "self_total": self.self_total,
+            "minimum": self.minimum if self.count > 0 else 0.0,
+            "maximum": self.maximum,
+            "histogram": self.histogram,
+        }
+
+
+class Profiler(PerProcess):
+    def __init__(self, enabled=False, output_interval=100):
+        """
+        Profiles where the time of a `NonLinearSearch` is spent, for example mapping vectors to instances (which
+        includes checking prior limits and assertions), evaluating the log likelihood function and priors and
+        performing updates.
+
+        Sections of code are timed with the `section` context manager, which uses low overhead counters and histograms
+        and does nothing when profiling is disabled.
+
+        Every process of a parallel search accumulates its own timings, which it outputs to the profile folder in the
+        samples folder every *output_interval* top-level sections. On every update these are summed and output to
+        the files profile.json and profile.summary in the output folder of the search.
+
+        Parameters
+        ----------
+        enabled : bool
+            Whether sections are timed.
+        output_interval : int
+            The number of top-level sections a process times between outputting its timings.
+        """
+        self.enabled = enabled
+        self.output_interval = output_interval
+
+        self.run_id = None
+        self.profile_path = None
+
+        self.reset()
+
+    def reset(self):
+
+        self.sections = {}
+        self._local = threading.local()
+
+        self.busy = 0.0
+        self.top_level_sections = 0
+
+    @property
+    def _stack(self) -> list:
+        """
+        The sections currently being timed, which are tracked per thread so that updates performed on a background
+        thread do not interleave with the sections of the main thread.
+        """
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    @property
+    def settings(self) -> dict:
+        return {"enabled": self.process_run_id is not None, "output_interval": self.output_interval}
+
+    @property
+    def process_attributes(self) -> dict:
+        return {"profile_path": self.profile_path}
+
+    @property
+    def process_run_id(self):
+        return self.run_id if self.enabled else None
+
+    def unpickled_in_process(self):
+        """
+        A profiler unpickled in a process becomes its active profiler, so every process accumulates one set of
+        timings for the whole run.
+        """
+        global _active_profiler
+
+        if self.enabled:
+            _active_profiler = self
+
+    def start(self, paths):
+        """
+        Start profiling a run of the `NonLinearSearch`, making this the active profiler of the main process.
+
+        Parameters
+        ----------
+        paths : af.Paths
+            Manages all paths, e.g. where the search outputs are stored, the samples, etc.
+        """
+        global _active_profiler
+
+        self.reset()
+
+        self.unregister()
+
+        if not self.enabled:
+            return
+
+        self.register()
+        self.profile_path = path.join(paths.samples_path, "profile")
+
+        shutil.rmtree(self.profile_path, ignore_errors=True)
+        os.makedirs(self.profile_path, exist_ok=True)
+
+        _active_profiler = self
+
+    def stop(self):
+        """
+        Stop profiling, such that sections are no longer timed in the main process.
+        """
+        global _active_profiler
+
+        if _active_profiler is self:
+            _active_profiler = None
+
+    def enter(self):
+        self._stack.append([time.perf_counter(), 0.0])
+
+    def exit(self, name):
+
+        start, child_elapsed = self._stack.pop()
+
+        elapsed = time.perf_counter() - start
+
+        if name not in self.sections:
+            self.sections[name] = SectionTiming()
+
+        self.sections[name].add(elapsed=elapsed, self_elapsed=elapsed - child_elapsed)
+
+        if len(self._stack) > 0:
+            self._stack[-1][1] += elapsed
+        else:
+            self.busy += elapsed
+            self.top_level_sections += 1
+
+            if self.top_level_sections % self.output_interval == 0:
+                self.output_timings()
+
+    def output_timings(self):
+        """
+        Output the timings of this process to the profile folder, so they can be summed over all processes.
+        """
+        if self.profile_path is None or not path.exists(self.profile_path):
+            return
+
+        filename = path.join(self.profile_path, f"{os.getpid()}.json")
+
+        with open(f"{filename}.tmp", "w") as outfile:
+            json.dump(
+                {
+                    "busy": self.busy,
+                    "sections": {name: timing.dict() for name, timing in self.sections.items()},
+                },
+                outfile,
+            )
+
+        os.replace(f"{filename}.tmp", filename)
+
+    def summary(self, session_time=None, number_of_cores=1) -> dict:
+        """
+        Sum the timings of every process.
+
+        If the search is parallel, the time the pool is not evaluating sections (e.g. inter-process communication and
+        workers waiting for the main process to perform updates) is estimated as the total core time of the session
+        minus the busy time of the worker processes.
+
+        Parameters
+        ----------
+        session_time : float
+            The wall-clock time of this run of the search.
+        number_of_cores : int
+            The number of cores the search uses.
+        """
+        self.output_timings()
+
+        summary = {"processes": 0, "busy": 0.0, "sections": {}}
+
+        worker_busy = 0.0
+
+        for timings_file in os.listdir(self.profile_path):
+
+            if not timings_file.endswith(".json"):
+                continue
+
+            try:
+                with open(path.join(self.profile_path, timings_file)) as infile:
+                    timings = json.load(infile)
+            except (OSError, ValueError):
+                continue
+
+            summary["processes"] += 1
+            summary["busy"] += timings["busy"]
+
+            if timings_file != f"{os.getpid()}.json":
+                worker_busy += timings["busy"]
+
+            for name, timing in timings["sections"].items():
+
+                if name not in summary["sections"]:
+                    summary["sections"][name] = timing
+                    continue
+
+                total = summary["sections"][name]
+
+                total["minimum"] = min(total["minimum"], timing["minimum"])
+                total["maximum"] = max(total["maximum"], timing["maximum"])
+                total["histogram"] = [a + b for a, b in zip(total["histogram"], timing["histogram"])]
+
+                for key in ("count", "total", "self_total"):
+                    total[key] += timing[key]
+
+        if session_time is not None:
+
+            summary["session_time"] = session_time
+
+            if number_of_cores > 1:
+                summary["pool_ipc_and_idle"] = max(session_time * number_of_cores - worker_busy, 0.0)
+
+        return summary
+
+    def output(self, output_path, session_time=None, number_of_cores=1):
+        """
+        Output the summed timings of every process to the files profile.json and profile.summary, the latter a text
+        table of every section ordered by its self time.
+
+        Parameters
+        ----------
+        output_path : str
+            The folder the files are output to.
+        """
+        summary = self.summary(session_time=session_time, number_of_cores=number_of_cores)
+
+        with open(path.join(output_path, "profile.json"), "w") as outfile:
+            json.dump(summary, outfile, indent=4)
+
+        with open(path.join(output_path, "profile.summary"), "w") as outfile:
+            outfile.write("\n".join(profile_table_from_summary(summary=summary)) + "\n")
+
+        logger.debug(f"Profile output to {output_path}")
+
+        return summary
+
+
+def profile_table_from_summary(summary) -> [str]:
+    """
+    A text table of every section of a profile summary, ordered by its self time.
+    """
+    lines = [
+        f"{'Section':<30}{'Calls':>12}{'Total (s)':>14}{'Self (s)':>14}{'Mean (ms)':>14}{'Max (ms)':>14}"
+    ]
+
+    for name, timing in sorted(summary["sections"].items(), key=lambda item: -item[1]["self_total"]):
+
+        mean = 1.0e3 * timing["total"] / timing["count"] if timing["count"] > 0 else 0.0
+
+        lines.append(
+            f"{name:<30}{timing['count']:>12}{timing['total']:>14.4f}{timing['self_total']:>14.4f}"
+            f"{mean:>14.4f}{1.0e3 * timing['maximum']:>14.4f}"
+        )
+
+    lines.append("")
+    lines.append(f"Processes = {summary['processes']}")
+    lines.append(f"Busy Time = {summary['busy']:.4f}")
+
+    if "session_time" in summary:
+        lines.append(f"Session Time = {summary['session_time']:.4f}")
+
+    if "pool_ipc_and_idle" in summary:
+        lines.append(f"Pool IPC And Idle Time = {summary['pool_ipc_and_idle']:.4f}")
+
+    return lines
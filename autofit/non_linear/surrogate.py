@@ -0,0 +1,335 @@
+import json
+import os
+import shutil
+from os import path
+
+import numpy as np
+
+from autofit import exc
+from autofit.non_linear import profiling
+from autofit.non_linear.log import logger
+from autofit.non_linear.per_process import PerProcess
+
+
+class Surrogate(PerProcess):
+    def __init__(
+            self,
+            enabled=False,
+            min_samples=100,
+            max_samples=1000,
+            neighbours=30,
+            sigma=3.0,
+            log_likelihood_offset=20.0,
+            calibration_interval=10,
+            error_tolerance=0.05,
+            min_calibrations=10,
+    ):
+        """
+        A surrogate which pre-screens the points proposed by a `NonLinearSearch`, skipping the evaluation of the
+        log likelihood function for points an emulator confidently predicts are far below the current maximum log
+        likelihood. This is beneficial when the likelihood is expensive and most proposals are rejected, for example
+        in the late iterations of a nested sampler or MCMC.
+
+        The emulator is a local Gaussian process, trained on the *neighbours* nearest points of the evaluation history
+        (the most recent *max_samples* evaluated points). A point is skipped if its predicted log likelihood plus
+        *sigma* times the predicted error is below the maximum log likelihood evaluated minus *log_likelihood_offset*.
+        A skipped point raises a `FitException`, so the sampler gives it the resample figure of merit and rejects it
+        like any other point which cannot be fitted. The emulator's prediction is never returned as the log
+        likelihood of a point, so it never enters the samples of the search.
+
+        The surrogate calibrates itself by evaluating every *calibration_interval*-th point it would have skipped. If
+        the fraction of these calibration points which are in fact above the threshold exceeds *error_tolerance*, the
+        surrogate is disabled for the rest of the run and every point is evaluated.
+
+        Each process of a parallel search has its own emulator, trained on the points that process evaluated. The
+        counters of each process (the evaluations saved, calibrations, etc.) are output to the surrogate folder in the
+        samples folder and summed into the file surrogate.json on every update.
+
+        Parameters
+        ----------
+        enabled : bool
+            Whether points are pre-screened by the surrogate.
+        min_samples : int
+            The number of points which must be evaluated before the surrogate begins to skip points.
+        max_samples : int
+            The number of most recently evaluated points in the history the emulator is trained on.
+        neighbours : int
+            The number of nearest points in the history the local emulator of every prediction is trained on.
+        sigma : float
+            The number of predicted errors above its predicted log likelihood a point must be below the threshold by
+            to be skipped.
+        log_likelihood_offset : float
+            Points are skipped if they are confidently below the maximum log likelihood minus this offset.
+        calibration_interval : int
+            Every calibration_interval-th point the surrogate would skip is evaluated to check the surrogate.
+        error_tolerance : float
+            The maximum fraction of calibration points above the threshold, above which the surrogate is disabled.
+        min_calibrations : int
+            The number of calibration points evaluated before the error tolerance is checked.
+        """
+        self.enabled = enabled
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.neighbours = neighbours
+        self.sigma = sigma
+        self.log_likelihood_offset = log_likelihood_offset
+        self.calibration_interval = calibration_interval
+        self.error_tolerance = error_tolerance
+        self.min_calibrations = min_calibrations
+
+        self.run_id = None
+        self.surrogate_path = None
+
+        self.reset()
+
+    @property
+    def settings(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "min_samples": self.min_samples,
+            "max_samples": self.max_samples,
+            "neighbours": self.neighbours,
+            "sigma": self.sigma,
+            "log_likelihood_offset": self.log_likelihood_offset,
+            "calibration_interval": self.calibration_interval,
+            "error_tolerance": self.error_tolerance,
+            "min_calibrations": self.min_calibrations,
+        }
+
+    @property
+    def process_attributes(self) -> dict:
+        return {"surrogate_path": self.surrogate_path}
+
+    def reset(self):
+
+        self.parameters = []
+        self.log_likelihoods = []
+
+        self.disabled = False
+
+        self.evaluations = 0
+        self.skipped = 0
+        self.confident = 0
+        self.calibrations = 0
+        self.misses = 0
+
+    @property
+    def is_active(self) -> bool:
+        return self.enabled and not self.disabled
+
+    def start(self, paths):
+        """
+        Start the surrogate of a run of the `NonLinearSearch`, clearing the evaluation history and the counters of any
+        previous run.
+
+        Parameters
+        ----------
+        paths : af.Paths
+            Manages all paths, e.g. where the search outputs are stored, the samples, etc.
+        """
+        self.reset()
+
+        self.register()
+        self.surrogate_path = path.join(paths.samples_path, "surrogate")
+
+        if self.enabled:
+            shutil.rmtree(self.surrogate_path, ignore_errors=True)
+            os.makedirs(self.surrogate_path, exist_ok=True)
+
+    def log_likelihood_from(self, parameters, log_likelihood_function):
+        """
+        Returns the log likelihood of a point evaluated via the log likelihood function, unless the emulator
+        confidently predicts the point is far below the current maximum log likelihood, in which case the point is
+        skipped by raising a `FitException`.
+
+        Parameters
+        ----------
+        parameters : [float]
+            The physical values of the point.
+        log_likelihood_function
+            Evaluates the log likelihood of the point.
+        """
+        if not self.is_active or len(self.log_likelihoods) < self.min_samples:
+            return self.evaluate(parameters=parameters, log_likelihood_function=log_likelihood_function)
+
+        with profiling.section("surrogate"):
+            mean, error = self.prediction_from(parameters=parameters)
+
+        upper_bound = mean + self.sigma * error
+        threshold = np.max(self.log_likelihoods) - self.log_likelihood_offset
+
+        if upper_bound >= threshold:
+            return self.evaluate(parameters=parameters, log_likelihood_function=log_likelihood_function)
+
+        self.confident += 1
+
+        if self.confident % self.calibration_interval == 0:
+
+            log_likelihood = self.evaluate(parameters=parameters, log_likelihood_function=log_likelihood_function)
+
+            self.calibrations += 1
+
+            if log_likelihood >= threshold:
+                self.misses += 1
+
+            self.check_calibration()
+
+            return log_likelihood
+
+        self.skipped += 1
+
+        if self.skipped % self.calibration_interval == 0:
+            self.output_counters()
+
+        raise exc.FitException(
+            f"Surrogate skipped a point predicted to be below the threshold ({upper_bound} < {threshold})."
+        )
+
+    def evaluate(self, parameters, log_likelihood_function):
+        """
+        Evaluate the log likelihood of a point and add it to the evaluation history.
+        """
+        log_likelihood = log_likelihood_function(parameters)
+
+        self.evaluations += 1
+
+        if self.enabled and self.evaluations % 10 == 0:
+            self.output_counters()
+
+        if self.enabled and np.isfinite(log_likelihood):
+
+            self.parameters.append(list(parameters))
+            self.log_likelihoods.append(log_likelihood)
+
+            if len(self.log_likelihoods) > self.max_samples:
+                del self.parameters[0]
+                del self.log_likelihoods[0]
+
+        return log_likelihood
+
+    def prediction_from(self, parameters):
+        """
+        Predict the log likelihood of a point and its error using a Gaussian process with a squared exponential kernel,
+        trained on the nearest points of the evaluation history. Distances are computed after scaling every parameter
+        by its standard deviation in the history.
+
+        Parameters
+        ----------
+        parameters : [float]
+            The physical values of the point.
+        """
+        history = np.asarray(self.parameters)
+        log_likelihoods = np.asarray(self.log_likelihoods)
+
+        scale = np.std(history, axis=0)
+        scale[scale == 0.0] = 1.0
+
+        history = history / scale
+        point = np.asarray(parameters) / scale
+
+        distances = np.sqrt(np.sum((history - point) ** 2, axis=1))
+
+        neighbours = min(self.neighbours, len(distances))
+        nearest = np.argpartition(distances, neighbours - 1)[:neighbours]
+
+        history = history[nearest]
+        log_likelihoods = log_likelihoods[nearest]
+
+        length_scale = np.median(distances[nearest])
+
+        if length_scale == 0.0:
+            length_scale = 1.0
+
+        offset = np.mean(log_likelihoods)
+        amplitude = max(np.var(log_likelihoods), 1.0e-8)
+
+        separations = np.sum((history[:, None, :] - history[None, :, :]) ** 2, axis=2)
+
+        covariance = amplitude * np.exp(-0.5 * separations / length_scale ** 2)
+        covariance += 1.0e-6 * amplitude * np.eye(neighbours)
+
+        cross_covariance = amplitude * np.exp(-0.5 * distances[nearest] ** 2 / length_scale ** 2)
+
+        cholesky = np.linalg.cholesky(covariance)
+
+        alpha = np.linalg.solve(cholesky.T, np.linalg.solve(cholesky, log_likelihoods - offset))
+        v = np.linalg.solve(cholesky, cross_covariance)
+
+        mean = offset + np.dot(cross_covariance, alpha)
+        variance = max(amplitude - np.dot(v, v), 0.0)
+
+        return mean, np.sqrt(variance)
+
+    def check_calibration(self):
+        """
+        Disable the surrogate if the fraction of calibration points which were wrongly predicted to be below the
+        threshold exceeds the error tolerance.
+        """
+        if self.calibrations < self.min_calibrations:
+            return
+
+        if self.misses / self.calibrations > self.error_tolerance:
+
+            self.disabled = True
+
+            logger.warning(
+                f"Surrogate mispredicted {self.misses} of {self.calibrations} calibration points, which exceeds the "
+                f"error tolerance of {self.error_tolerance}, disabling the surrogate."
+            )
+
+        self.output_counters()
+
+    @property
+    def counters(self) -> dict:
+        return {
+            "evaluations": self.evaluations,
+            "skipped": self.skipped,
+            "calibrations": self.calibrations,
+            "misses": self.misses,
+            "disabled": self.disabled,
+        }
+
+    def output_counters(self):
+        """
+        Output the counters of this process to the surrogate folder, so they can be summed over all processes.
+        """
+        if self.surrogate_path is None or not path.exists(self.surrogate_path):
+            return
+
+        with open(path.join(self.surrogate_path, f"{os.getpid()}.json"), "w") as outfile:
+            json.dump(self.counters, outfile)
+
+    def output_summary(self, filename):
+        """
+        Sum the counters of every process and output them, with the fraction of evaluations saved, to a .json file.
+
+        Parameters
+        ----------
+        filename : str
+            The .json file the summary is output to.
+        """
+        self.output_counters()
+
+        summary = {"evaluations": 0, "skipped": 0, "calibrations": 0, "misses": 0, "disabled_processes": 0}
+
+        for counters_file in os.listdir(self.surrogate_path):
+
+            try:
+                with open(path.join(self.surrogate_path, counters_file)) as infile:
+                    counters = json.load(infile)
+            except (OSError, ValueError):
+                continue
+
+            for key in ("evaluations", "skipped", "calibrations", "misses"):
+                summary[key] += counters[key]
+
+            summary["disabled_processes"] += int(counters["disabled"])
+
+        proposals = summary["evaluations"] + summary["skipped"]
+
+        summary["fraction_saved"] = summary["skipped"] / proposals if proposals > 0 else 0.0
+
+        with open(filename, "w") as outfile:
+            json.dump(summary, outfile, indent=4)
+
+        return summary
@@ -16,12 +16,17 @@ class Timer:
         """
 
         self.paths = paths
+        self.session_start_time = None
 
     def start(self):
         """
         Record the start time of a `NonLinearSearch` as universal date time, so that the run-time of the search can be
         recorded.
+
+        The start time of this session (e.g. the current job, if the search is resumed) is also recorded.
         """
+        self.session_start_time = time.time()
+
         start_time_path = path.join(self.paths.samples_path, ".start_time")
         try:
             with open(start_time_path) as f:
@@ -42,6 +47,13 @@ class Timer:
         ) as f:
             f.write(execution_time)
 
+    @property
+    def session_time(self):
+        """The time in seconds since the `NonLinearSearch` was started or resumed in this session."""
+        if self.session_start_time is None:
+            return 0.0
+        return time.time() - self.session_start_time
+
     @property
     def start_time(self):
         """Load the start time written to hard disk from the .start_time file."""
@@ -0,0 +1,271 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from multiprocessing import util
+from os import path
+
+from autofit.non_linear.log import logger
+from autofit.non_linear.per_process import PerProcess
+
+_active_tracer = None
+
+
+@contextmanager
+def span(name, category="search", **args):
+    """
+    Record a block of code as a span of the trace of the active tracer of this process, which does nothing if tracing
+    is disabled. Any keyword arguments are output as the arguments of the span.
+    """
+    tracer = _active_tracer
+
+    if tracer is None:
+        yield
+        return
+
+    start = time.time()
+    perf_start = time.perf_counter()
+
+    try:
+        yield
+    finally:
+        tracer.add_span(
+            name=name,
+            category=category,
+            start=start,
+            duration=time.perf_counter() - perf_start,
+            args=args,
+        )
+
+
+class Tracer(PerProcess):
+    def __init__(self, enabled=False, buffer_size=10000, max_events=1000000, flush_interval=1.0):
+        """
+        Traces the timeline of a `NonLinearSearch` or grid search, recording spans for the search starting or
+        resuming, every batch of the sampler, every evaluation of the log likelihood function (with the process it
+        was performed on), the stages of every update, pickling and zipping the output and grid search jobs.
+
+        Every process buffers at most *buffer_size* events in memory, which it appends to its own file in the trace
+        folder in the samples folder when the buffer is full or *flush_interval* seconds have passed. A process stops
+        recording events after *max_events*, so tracing a long run does not exhaust memory or disk space. The files
+        of every process are merged into the file trace.json in the output folder on every update, which is in the
+        Chrome trace event format and can be opened with chrome://tracing or Perfetto.
+
+        Parameters
+        ----------
+        enabled : bool
+            Whether events are traced.
+        buffer_size : int
+            The maximum number of events a process buffers in memory before appending them to its file.
+        max_events : int
+            The maximum number of events a process records, after which further events are dropped.
+        flush_interval : float
+            The maximum time in seconds a process buffers events before appending them to its file.
+        """
+        self.enabled = enabled
+        self.buffer_size = buffer_size
+        self.max_events = max_events
+        self.flush_interval = flush_interval
+
+        self.run_id = None
+        self.trace_path = None
+
+        self._previous_tracer = None
+        self._exit_pid = None
+
+        self.reset()
+
+    def reset(self):
+
+        self.pid = os.getpid()
+
+        self.events = []
+        self.recorded = 0
+        self.dropped = 0
+
+        self.last_flush_time = time.time()
+
+        self._lock = threading.Lock()
+
+    @property
+    def settings(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "buffer_size": self.buffer_size,
+            "max_events": self.max_events,
+            "flush_interval": self.flush_interval,
+        }
+
+    @property
+    def process_attributes(self) -> dict:
+        return {"trace_path": self.trace_path}
+
+    @property
+    def process_run_id(self):
+        return self.run_id if self.enabled else None
+
+    def unpickled_in_process(self):
+        """
+        A tracer unpickled in a process becomes its active tracer, so every process buffers the events of the whole
+        run in one tracer. The process appends its buffered events to its file when it exits, for example when a
+        pool is closed.
+        """
+        self.activate()
+
+        if self.enabled and self._exit_pid != os.getpid():
+            self._exit_pid = os.getpid()
+            util.Finalize(self, self.flush, exitpriority=10)
+
+    def start(self, paths):
+        """
+        Start tracing a run, making this the active tracer of the main process. The trace folder of a resumed run is
+        not cleared, so its trace includes every session of the run.
+
+        Parameters
+        ----------
+        paths : af.Paths
+            Manages all paths, e.g. where the search outputs are stored, the samples, etc.
+        """
+        self.reset()
+
+        self.unregister()
+
+        if not self.enabled:
+            return
+
+        self.register()
+        self.trace_path = path.join(paths.samples_path, "trace")
+
+        os.makedirs(self.trace_path, exist_ok=True)
+
+        self._previous_tracer = _active_tracer
+        self.activate()
+
+    def activate(self):
+        """
+        Make this the active tracer of this process, which records every span.
+        """
+        global _active_tracer
+
+        if self.enabled:
+            _active_tracer = self
+
+    def stop(self):
+        """
+        Stop tracing, appending any buffered events to the file of this process and making the tracer which was
+        active when this tracer started (e.g. the tracer of a grid search performing this search) active again.
+        """
+        global _active_tracer
+
+        if not self.enabled:
+            return
+
+        self.flush()
+
+        if _active_tracer is self:
+            _active_tracer = self._previous_tracer
+
+        self._previous_tracer = None
+
+        self.unregister()
+
+        self.run_id = None
+
+    def add_span(self, name, category, start, duration, args):
+
+        if os.getpid() != self.pid:
+            self.reset()
+
+        with self._lock:
+
+            if self.recorded >= self.max_events:
+                self.dropped += 1
+                return
+
+            self.recorded += 1
+
+            self.events.append(
+                {
+                    "name": name,
+                    "cat": category,
+                    "ph": "X",
+                    "ts": start * 1.0e6,
+                    "dur": duration * 1.0e6,
+                    "pid": self.pid,
+                    "tid": threading.get_ident(),
+                    "args": args,
+                }
+            )
+
+        if len(self.events) >= self.buffer_size or time.time() - self.last_flush_time > self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """
+        Append the buffered events of this process to its file in the trace folder, discarding them if the folder has
+        been removed (e.g. when the output of a finished search is zipped).
+        """
+        if os.getpid() != self.pid:
+            self.reset()
+
+        with self._lock:
+
+            events = self.events
+            self.events = []
+
+            self.last_flush_time = time.time()
+
+        if len(events) == 0 or self.trace_path is None or not path.exists(self.trace_path):
+            return
+
+        with open(path.join(self.trace_path, f"{self.pid}.ndjson"), "a") as outfile:
+            outfile.write("".join(json.dumps(event, default=str) + "\n" for event in events))
+
+    def output(self, output_path):
+        """
+        Merge the events of every process into the file trace.json, streaming the files of every process so the merge
+        does not load the whole trace into memory. A line a process is still appending is skipped.
+
+        Parameters
+        ----------
+        output_path : str
+            The folder the trace is output to.
+        """
+        self.flush()
+
+        filename = path.join(output_path, "trace.json")
+
+        trace_files = sorted(
+            trace_file for trace_file in os.listdir(self.trace_path) if trace_file.endswith(".ndjson")
+        )
+
+        with open(f"{filename}.tmp", "w") as outfile:
+
+            outfile.write('{"traceEvents": [\n')
+
+            for index, trace_file in enumerate(trace_files):
+
+                pid = int(trace_file.split(".")[0])
+
+                metadata = {
+                    "name": "process_name",
+                    "ph": "M",
+                    "pid": pid,
+                    "args": {"name": "main" if pid == os.getpid() else f"worker {pid}"},
+                }
+
+                outfile.write(("" if index == 0 else ",\n") + json.dumps(metadata))
+
+                with open(path.join(self.trace_path, trace_file)) as infile:
+                    for line in infile:
+                        if line.endswith("\n"):
+                            outfile.write(",\n" + line[:-1])
+
+            outfile.write(
+                f'\n], "otherData": {{"dropped_events": {self.dropped}}}}}\n'
+            )
+
+        os.replace(f"{filename}.tmp", filename)
+
+        logger.debug(f"Trace output to {filename}")
@@ -0,0 +1,190 @@
+import json
+import threading
+import time
+
+from autofit.non_linear.log import logger
+
+
+class BackgroundUpdate:
+    def __init__(self):
+        """
+        Runs the output stage of a `NonLinearSearch` update (writing the samples, visualization, the model.results
+        file, etc.) on a single background thread, so that sampling continues whilst the update is performed.
+
+        At most one update is in flight at any time. Submitting a new update (or calling `wait`) blocks until the
+        previous update has finished, which provides backpressure if updates take longer than sampling between them.
+
+        Any exception raised on the background thread is stored and re-raised on the main thread the next time the
+        update is waited on, so errors in visualization or output are never silently lost.
+
+        The time every update takes on the background thread is measured, so that the time it takes from sampling is
+        included in the update time of an `UpdateScheduler` (see `background_time`).
+        """
+        self._thread = None
+        self._exception = None
+
+        self._duration = 0.0
+        self.background_time = 0.0
+
+    @property
+    def in_flight(self) -> bool:
+        """
+        Is an update currently being performed on the background thread?
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def submit(self, func, **kwargs):
+        """
+        Perform func(**kwargs) on the background thread, first waiting for any update already in flight.
+
+        Parameters
+        ----------
+        func
+            The function performing the update.
+        kwargs
+            Keyword arguments passed to the function.
+        """
+        self.wait()
+
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(func,),
+            kwargs=kwargs,
+            name="autofit-update",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _run(self, func, **kwargs):
+        start = time.perf_counter()
+        try:
+            func(**kwargs)
+        except Exception as e:
+            logger.exception(e)
+            self._exception = e
+        finally:
+            self._duration = time.perf_counter() - start
+
+    def wait(self):
+        """
+        Block until the update in flight (if any) has finished, re-raising any exception it raised.
+
+        The time the update took on the background thread, less the time spent waiting for it here (which the main
+        thread measures as part of its own update), is stored as `background_time`. If no update was in flight this
+        is 0.0.
+        """
+        self.background_time = 0.0
+
+        if self._thread is not None:
+            start = time.perf_counter()
+            self._thread.join()
+            self._thread = None
+
+            self.background_time = max(self._duration - (time.perf_counter() - start), 0.0)
+
+        if self._exception is not None:
+            exception = self._exception
+            self._exception = None
+            raise exception
+
+    def __getstate__(self):
+        return {"_thread": None, "_exception": None, "_duration": 0.0, "background_time": 0.0}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+
+class UpdateScheduler:
+    def __init__(self, time_fraction, max_change=10.0):
+        """
+        Adapts the number of iterations performed between updates of a `NonLinearSearch`, such that a target
+        fraction of the wall-clock time is spent performing updates (outputting samples, visualization, etc.).
+
+        After every update the time spent sampling since the previous update and the time spent performing the update
+        are measured. The sampling throughput (iterations per second) is used to choose the number of iterations that
+        are performed before the next update, such that the update time is the input fraction of the total time.
+
+        If updates are performed on a background thread, the time the previous background update took is added to
+        the update time, as the main thread only measures the time taken to snapshot the samples.
+
+        Parameters
+        ----------
+        time_fraction : float
+            The target fraction of wall-clock time spent performing updates (e.g. 0.05 for 5%). If this is not
+            positive the schedule is not adapted and *iterations_per_update* is fixed.
+        max_change : float
+            The maximum factor by which the iterations between updates can increase or decrease after one update,
+            which prevents a single slow or fast update from changing the schedule drastically.
+        """
+        self.time_fraction = time_fraction
+        self.max_change = max_change
+
+        self.schedule = []
+
+        self._update_end_time = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.time_fraction is not None and self.time_fraction > 0.0
+
+    def start(self):
+        """
+        Record the time sampling begins, which the sampling time before the first update is measured from.
+        """
+        self._update_end_time = time.time()
+
+    def iterations_for_next_update(self, iterations, update_start_time, background_time=0.0) -> int:
+        """
+        Record the timings of an update which has just been performed and return the number of iterations that should
+        be performed before the next update.
+
+        Parameters
+        ----------
+        iterations : int
+            The number of iterations performed before this update.
+        update_start_time : float
+            The time this update began, which marks the end of the sampling performed before it.
+        background_time : float
+            The time spent performing an update on a background thread which the main thread did not measure.
+        """
+        update_end_time = time.time()
+
+        if self._update_end_time is None:
+            self._update_end_time = update_end_time
+            return iterations
+
+        sampling_time = max(update_start_time - self._update_end_time, 1.0e-8)
+        update_time = max(update_end_time - update_start_time + background_time, 1.0e-8)
+
+        iterations_per_second = iterations / sampling_time
+
+        target_sampling_time = update_time * (1.0 - self.time_fraction) / self.time_fraction
+
+        next_iterations = iterations_per_second * target_sampling_time
+        next_iterations = min(max(next_iterations, iterations / self.max_change), iterations * self.max_change)
+        next_iterations = max(int(next_iterations), 1)
+
+        self.schedule.append(
+            {
+                "iterations": iterations,
+                "sampling_time": sampling_time,
+                "update_time": update_time,
+                "iterations_per_second": iterations_per_second,
+                "next_iterations": next_iterations,
+            }
+        )
+
+        self._update_end_time = update_end_time
+
+        return next_iterations
+
+    def output_to_json(self, filename):
+        """
+        Output the schedule chosen so far to a .json file.
+        """
+        with open(filename, "w") as outfile:
+            json.dump(
+                {"time_fraction": self.time_fraction, "schedule": self.schedule},
+                outfile,
+                indent=4,
+            )
@@ -83,8 +83,8 @@ def format_string_for_parameter_name(parameter_name: str) -> str:
         pass
 
     logger.warning(
-        "Could not find an entry for the parameter {} in the label_format.ini config at path {}".format(
-            parameter_name, conf.instance.path
+        "Could not find an entry for the parameter {} in the label_format.ini config at paths {}".format(
+            parameter_name, conf.instance.paths
         )
     )
 
@@ -68,7 +68,7 @@ def results_to_file(samples, filename, during_analysis):
     frm.output_list_of_strings_to_file(file=filename, list_of_strings=results)
 
 
-def search_summary_from_samples(samples) -> [str]:
+def search_summary_from_samples(samples, fidelity_switches=None) -> [str]:
 
     line = [f"Total Samples = {samples.total_samples}\n"]
     if hasattr(samples, "total_accepted_samples"):
@@ -76,12 +76,17 @@ def search_summary_from_samples(samples) -> [str]:
         line.append(f"Acceptance Ratio = {samples.acceptance_ratio}\n")
     if samples.time is not None:
         line.append(f"Time To Run = {samples.time}\n")
+    for i, switch in enumerate(fidelity_switches or []):
+        line.append(
+            f"Fidelity Switch {i + 1} = {switch['from_fidelity']} -> {'full' if switch['to_fidelity'] is None else switch['to_fidelity']} "
+            f"({switch['reason']}, after {switch['evaluations']} evaluations)\n"
+        )
     return line
 
 
-def search_summary_to_file(samples, filename):
+def search_summary_to_file(samples, filename, fidelity_switches=None):
 
-    summary = search_summary_from_samples(samples=samples)
+    summary = search_summary_from_samples(samples=samples, fidelity_switches=fidelity_switches)
 
     frm.output_list_of_strings_to_file(file=filename, list_of_strings=summary)
 
@@ -1,4 +1,6 @@
+import os
 from os import path
+
 import pytest
 
 import autofit as af
@@ -24,6 +26,30 @@ class TestLoading:
         assert list(path_aggregator.values("non_linear"))[0]["name"] == "optimizer"
         assert list(path_aggregator.values("nonsense"))[0] is None
 
+    def test_zipped_phases_read_without_extracting(self, path_aggregator, aggregator_directory):
+        assert all(phase.is_zipped for phase in path_aggregator)
+        assert sorted(os.listdir(aggregator_directory)) == ["phase.zip", "phase_completed.zip"]
+
+        phase = path_aggregator[0]
+
+        assert phase.model["name"] == "model"
+        assert phase.directory == path.join(aggregator_directory, "phase", "phase")
+        assert not path.exists(phase.directory)
+
+    def test_extract(self, aggregator_directory):
+        aggregator = af.Aggregator(aggregator_directory, extract=True)
+
+        try:
+            assert not any(phase.is_zipped for phase in aggregator)
+            assert all(path.exists(path.join(phase.directory, "metadata")) for phase in aggregator)
+            assert list(aggregator.values("dataset"))[0]["name"] == "dataset"
+
+            assert len(af.Aggregator(aggregator_directory)) == 2
+        finally:
+            aggregator.remove_unzipped()
+
+        assert sorted(os.listdir(aggregator_directory)) == ["phase.zip", "phase_completed.zip"]
+
 
 @pytest.fixture(name="aggregator_2")
 def make_aggregator_2():
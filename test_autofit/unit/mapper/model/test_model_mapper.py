@@ -534,6 +534,44 @@ class TestModelInstancesRealClasses:
             lower_limit=0.2, upper_limit=0.8
         ) == pytest.approx([0.200068, 0.38140], 1.0e-4)
 
+    def test_vectors_from_unit_vectors(self):
+
+        mapper = af.ModelMapper()
+        mapper.mock_class = af.PriorModel(mock.MockClassx2)
+        mapper.mock_class.two = af.GaussianPrior(mean=1.0, sigma=2.0)
+
+        unit_vectors = np.array([[0.5, 0.5], [0.2, 0.9]])
+
+        vectors = mapper.vectors_from_unit_vectors(unit_vectors=unit_vectors)
+
+        assert vectors.shape == (2, 2)
+        assert list(vectors[0]) == pytest.approx(mapper.vector_from_unit_vector([0.5, 0.5]), 1.0e-8)
+        assert list(vectors[1]) == pytest.approx(mapper.vector_from_unit_vector([0.2, 0.9]), 1.0e-8)
+
+    def test_vectors_within_prior_limits(self):
+
+        mapper = af.ModelMapper()
+        mapper.mock_class = af.PriorModel(mock.MockClassx2)
+        mapper.mock_class.two = af.GaussianPrior(mean=1.0, sigma=2.0, lower_limit=0.0)
+
+        vectors = np.array([[0.5, 1.0], [0.5, -1.0], [1.5, 1.0]])
+
+        assert list(mapper.vectors_within_prior_limits(vectors=vectors)) == [True, False, False]
+
+    def test_log_priors_from_vectors(self):
+
+        mapper = af.ModelMapper()
+        mapper.mock_class = af.PriorModel(mock.MockClassx2)
+        mapper.mock_class.two = af.GaussianPrior(mean=1.0, sigma=2.0)
+
+        vectors = np.array([[0.5, 1.0], [0.2, 3.0]])
+
+        log_priors = mapper.log_priors_from_vectors(vectors=vectors)
+
+        assert list(log_priors) == pytest.approx(
+            [sum(mapper.log_priors_from_vector(vector=vector)) for vector in vectors], 1.0e-8
+        )
+
     def test_random_vector_from_prior_within_limits(self):
         np.random.seed(1)
 
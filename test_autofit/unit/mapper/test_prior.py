@@ -253,6 +253,13 @@ class TestUniformPrior:
     def test_width(self):
         assert af.UniformPrior(2, 5).width == 3
 
+    def test__unit_value_for(self):
+        uniform_half = af.UniformPrior(lower_limit=0.5, upper_limit=1.0)
+
+        assert uniform_half.unit_value_for(0.5) == 0.0
+        assert uniform_half.unit_value_for(1.0) == 1.0
+        assert uniform_half.unit_value_for(0.75) == 0.5
+
     def test_negative_range(self):
         prior = af.UniformPrior(-1, 0)
         assert prior.width == 1
@@ -318,6 +325,13 @@ class TestLogUniformPrior:
 
         assert log_prior == 0.25
 
+    def test__unit_value_for(self):
+        log_uniform_half = af.LogUniformPrior(lower_limit=0.5, upper_limit=1.0)
+
+        assert log_uniform_half.unit_value_for(0.5) == 0.0
+        assert log_uniform_half.unit_value_for(1.0) == 1.0
+        assert log_uniform_half.unit_value_for(0.70710678118) == pytest.approx(0.5, 1.0e-4)
+
     def test__lower_limit_zero_or_below_raises_error(self):
 
         with pytest.raises(exc.PriorException):
@@ -337,6 +351,13 @@ class TestGaussianPrior:
         assert gaussian_simple.value_for(0.9) == pytest.approx(1.281551, 1.0e-4)
         assert gaussian_simple.value_for(0.5) == 0.0
 
+    def test__unit_value_for(self):
+        gaussian = af.GaussianPrior(mean=1.0, sigma=2.0)
+
+        assert gaussian.unit_value_for(1.0) == pytest.approx(0.5, 1.0e-4)
+        assert gaussian.unit_value_for(gaussian.value_for(0.1)) == pytest.approx(0.1, 1.0e-4)
+        assert gaussian.unit_value_for(gaussian.value_for(0.9)) == pytest.approx(0.9, 1.0e-4)
+
     def test__non_zero_mean(self):
         gaussian_half = af.GaussianPrior(mean=0.5, sigma=2.0)
 
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+import autofit as af
+from autofit.mock.mock import Gaussian, MockPaths
+
+x = np.arange(10.0)
+
+
+class GaussianAnalysis(af.Analysis):
+    def __init__(self):
+        self.data = Gaussian(centre=4.0, intensity=2.0, sigma=1.5)(x)
+
+    def log_likelihood_function(self, instance):
+        return -0.5 * np.sum((instance(x) - self.data) ** 2)
+
+
+@pytest.fixture(name="paths")
+def make_paths(tmp_path):
+    return MockPaths(samples_path=str(tmp_path), output_path=str(tmp_path))
+
+
+@pytest.fixture(name="gaussian_model")
+def make_gaussian_model():
+    model = af.PriorModel(Gaussian)
+    model.centre = af.UniformPrior(lower_limit=0.0, upper_limit=10.0)
+    model.intensity = af.UniformPrior(lower_limit=0.0, upper_limit=10.0)
+    model.sigma = af.UniformPrior(lower_limit=0.1, upper_limit=5.0)
+    return model
+
+
+@pytest.fixture(name="analysis")
+def make_analysis():
+    return GaussianAnalysis()
+
+
+@pytest.fixture(name="search")
+def make_search():
+    return af.PySwarmsGlobal(paths=af.Paths(name="search"), n_particles=10, iters=10, iterations_per_update=5)
@@ -1,11 +1,19 @@
+import json
+import multiprocessing
+import os
 import pickle
+from os import path
 
+import numpy as np
 import pytest
 
 import autofit as af
 from autofit import exc
 from autofit.mock import mock
 from autofit.mock.mock import MockAnalysis
+from autofit.mock.mock_search import MockSamples, samples_with_log_likelihoods
+from autofit.non_linear.grid import grid_search as gs
+from autofit.non_linear.per_process import registry
 
 
 @pytest.fixture(name="mapper")
@@ -206,6 +214,258 @@ class TestGridNLOBehaviour:
         assert result.no_dimensions == 2
         assert result.max_log_likelihood_values.shape == (10, 10)
 
+    def test_resumes_from_manifest(self, grid_search_05, mapper, monkeypatch):
+
+        performed = []
+
+        perform = gs.Job.perform
+
+        def perform_and_count(job):
+            performed.append(job.index)
+            return perform(job)
+
+        monkeypatch.setattr(gs.Job, "perform", perform_and_count)
+
+        grid_priors = [
+            mapper.component.one_tuple.one_tuple_0,
+            mapper.component.one_tuple.one_tuple_1,
+        ]
+
+        result = grid_search_05.fit(model=mapper, analysis=MockAnalysis(), grid_priors=grid_priors)
+
+        assert performed == [0, 1, 2, 3]
+
+        filename = path.join(grid_search_05.paths.output_path, "records.ndjson")
+
+        with open(filename) as f:
+            header, *records = [json.loads(line) for line in f]
+
+        assert header["lists"] == [[0.0, 0.0], [0.0, 0.5], [0.5, 0.0], [0.5, 0.5]]
+        assert [record["index"] for record in records] == [0, 1, 2, 3]
+        assert records[1]["values"] == [0.0, 0.5]
+
+        with open(filename, "w") as f:
+            for record in [header] + records[:2] + records[3:]:
+                f.write(json.dumps(record) + "\n")
+
+        resumed = grid_search_05.fit(model=mapper, analysis=MockAnalysis(), grid_priors=grid_priors)
+
+        assert performed == [0, 1, 2, 3, 2]
+        assert len(resumed.results) == 4
+
+        for index in (0, 1, 3):
+            assert resumed.results[index].log_likelihood == result.results[index].log_likelihood
+
+        with open(path.join(grid_search_05.paths.output_path, "results")) as f:
+            assert len(f.readlines()) == 5
+
+        with open(filename) as f:
+            assert [json.loads(line).get("index") for line in f] == [None, 0, 1, 3, 2]
+
+    def test_records__loaded_without_unpickling_results(self, grid_search_05, mapper):
+
+        grid_priors = [
+            mapper.component.one_tuple.one_tuple_0,
+            mapper.component.one_tuple.one_tuple_1,
+        ]
+
+        result = grid_search_05.fit(model=mapper, analysis=MockAnalysis(), grid_priors=grid_priors)
+
+        loaded = af.GridSearchResult.from_output_path(grid_search_05.paths.output_path)
+
+        assert loaded.physical_lower_limits_lists == result.physical_lower_limits_lists
+        assert all(cell._result is None for cell in loaded.results)
+        assert (loaded.max_log_likelihood_values == result.max_log_likelihood_values).all()
+        assert all(cell._result is None for cell in loaded.results)
+
+        assert loaded.best_result.model.prior_count == result.best_result.model.prior_count
+        assert loaded.best_result._result is not None
+
+    def test_records__partial_line_removed(self, grid_search_05, mapper):
+
+        grid_priors = [
+            mapper.component.one_tuple.one_tuple_0,
+            mapper.component.one_tuple.one_tuple_1,
+        ]
+
+        grid_search_05.fit(model=mapper, analysis=MockAnalysis(), grid_priors=grid_priors)
+
+        filename = path.join(grid_search_05.paths.output_path, "records.ndjson")
+
+        with open(filename) as f:
+            lines = f.readlines()
+
+        with open(filename, "w") as f:
+            f.writelines(lines[:-1])
+            f.write(lines[-1][:20])
+
+        manifest = gs.GridSearchManifest(output_path=grid_search_05.paths.output_path)
+
+        assert sorted(manifest.cells) == [0, 1, 2]
+
+        with open(filename) as f:
+            assert f.read() == "".join(lines[:-1])
+
+        with pytest.raises(exc.GridSearchException):
+            manifest.grid_search_result()
+
+    def test_parallel__analysis_shared_by_jobs(self, mapper):
+
+        grid_search = af.SearchGridSearch(
+            search=MockOptimizer(), number_of_steps=2, paths=af.Paths(name="parallel"), parallel=True
+        )
+
+        result = grid_search.fit(
+            model=mapper,
+            analysis=MockAnalysis(),
+            grid_priors=[
+                mapper.component.one_tuple.one_tuple_0,
+                mapper.component.one_tuple.one_tuple_1,
+            ],
+        )
+
+        assert len(result.results) == 4
+        assert result.max_log_likelihood_values.shape == (2, 2)
+        assert registry("Shared") == {}
+
+    def test_job_queue__nodes_fit_cells_of_one_grid(self, mapper, tmp_path):
+
+        grid_priors = [
+            mapper.component.one_tuple.one_tuple_0,
+            mapper.component.one_tuple.one_tuple_1,
+        ]
+
+        def grid_search_on_node():
+            return af.SearchGridSearch(
+                search=MockOptimizer(),
+                number_of_steps=2,
+                paths=af.Paths(name="job_queue"),
+                job_queue=af.FileJobQueue(directory=str(tmp_path), poll_interval=0.01),
+            )
+
+        node = multiprocessing.Process(
+            target=lambda: grid_search_on_node().fit(
+                model=mapper, analysis=MockAnalysis(), grid_priors=grid_priors
+            )
+        )
+        node.start()
+
+        grid_search = grid_search_on_node()
+
+        result = grid_search.fit(model=mapper, analysis=MockAnalysis(), grid_priors=grid_priors)
+
+        node.join()
+
+        assert node.exitcode == 0
+        assert len(result.results) == 4
+        assert result.physical_lower_limits_lists[1] == [0.0, 1.0]
+
+        queue_path = path.join(str(tmp_path), "job_queue", "level_0")
+
+        assert sorted(os.listdir(path.join(queue_path, "results"))) == [f"{index}.pickle" for index in range(4)]
+        assert os.listdir(path.join(queue_path, "leases")) == []
+
+        loaded = af.GridSearchResult.from_output_path(grid_search.paths.output_path)
+
+        assert (loaded.max_log_likelihood_values == result.max_log_likelihood_values).all()
+
+    def test_refinement(self, mapper, monkeypatch):
+
+        monkeypatch.setattr(MockOptimizer, "perform_update", perform_update_at_centre)
+
+        grid_search = af.SearchGridSearch(
+            search=MockOptimizer(),
+            number_of_steps=2,
+            paths=af.Paths(name="refinement"),
+            refinement_depth=2,
+            refinement_threshold=0.05,
+        )
+
+        result = grid_search.fit(
+            model=mapper,
+            analysis=PeakAnalysis(),
+            grid_priors=[
+                mapper.component.one_tuple.one_tuple_0,
+                mapper.component.one_tuple.one_tuple_1,
+            ],
+        )
+
+        assert [len(level.results) for level in result.levels] == [4, 4, 4]
+        assert result.levels[1].lower_limit_lists == [[0.0, 0.0], [0.0, 0.25], [0.25, 0.0], [0.25, 0.25]]
+        assert result.levels[2].step_size == 0.125
+
+        assert result.max_log_likelihood_values.shape == (8, 8)
+        assert result.physical_lower_limits_lists[1] == [0.0, 0.25]
+
+        values = result.max_log_likelihood_values
+
+        assert values[7, 7] == result.levels[0].results[3].log_likelihood
+        assert values[0, 0] == result.levels[2].results[0].log_likelihood
+        assert values[1, 1] == result.levels[2].results[3].log_likelihood
+        assert values[2, 2] == values[3, 3] == result.levels[1].results[3].log_likelihood
+        assert values[4, 4] == values[7, 7]
+        assert result.best_result.log_likelihood == values.max()
+
+        with open(path.join(grid_search.paths.output_path, "refine_2", "results")) as f:
+            assert len(f.readlines()) == 5
+
+    def test_refinement__invalid_figure_of_merit(self):
+
+        with pytest.raises(exc.GridSearchException):
+            af.SearchGridSearch(search=MockOptimizer(), refinement_figure_of_merit="chi_squared")
+
+    def test_warm_start__cells_wait_for_and_are_seeded_by_parents(self, mapper, tmp_path):
+
+        grid_search = af.SearchGridSearch(
+            search=MockOptimizer(), number_of_steps=2, paths=af.Paths(name="warm_start"), warm_start=True
+        )
+
+        grid_priors = [
+            mapper.component.one_tuple.one_tuple_0,
+            mapper.component.one_tuple.one_tuple_1,
+        ]
+
+        lists = grid_search.make_lists(grid_priors)
+
+        manifest = gs.GridSearchManifest(
+            output_path=str(tmp_path),
+            grid_prior_names=list(map(mapper.name_for_prior, grid_priors)),
+            lists=lists,
+        )
+
+        jobs = grid_search.jobs_for_cells(
+            model=mapper,
+            analysis=MockAnalysis(),
+            grid_priors=grid_priors,
+            lists=lists,
+            manifest=manifest,
+            parents=gs.wavefront_parents(number_of_steps=2, no_dimensions=2),
+        )
+
+        first = next(jobs)
+
+        assert first.index == 0
+        assert isinstance(first.search_instance.initializer, af.InitializerPrior)
+        assert next(jobs) is None
+
+        manifest.add(job_result=first.perform())
+
+        second, third = next(jobs), next(jobs)
+
+        assert (second.index, third.index) == (1, 2)
+        assert next(jobs) is None
+
+        initializer = second.search_instance.initializer
+
+        assert isinstance(initializer, af.InitializerFromSamples)
+        assert initializer.samples is manifest.result_for_index(0).samples
+        assert initializer.parameter_names == []
+
+        manifest.add(job_result=second.perform())
+
+        assert next(jobs).index == 3
+        assert next(jobs, "exhausted") == "exhausted"
+
     # def test_results_parallel(self, mapper, container):
     #     grid_search = af.SearchGridSearch(
     #         search=container.MockOptimizer,
@@ -267,6 +527,65 @@ class TestGridNLOBehaviour:
         assert grid_search.paths.output_path != search.paths.output_path
 
 
+def fitness(arguments):
+    return -((arguments[0] - 0.3) ** 2) - (arguments[1] - 0.6) ** 2
+
+
+def fitnesses(points):
+    return -((points[:, 0] - 0.3) ** 2) - (points[:, 1] - 0.6) ** 2
+
+
+class TestGrid:
+    def test_make_lists__chunks_in_order(self):
+
+        lists = gs.make_lists(2, step_size=(0.5, 0.25), centre_steps=False)
+
+        assert lists[:5] == [[0.0, 0.0], [0.0, 0.25], [0.0, 0.5], [0.0, 0.75], [0.5, 0.0]]
+
+        chunks = list(gs.unit_grid_chunks(2, step_size=(0.5, 0.25), centre_steps=False, chunk_size=3))
+
+        assert [len(chunk) for chunk in chunks] == [3, 3, 2]
+        assert np.concatenate(chunks).tolist() == lists
+
+    def test_grid__vectorized_and_pool_match(self):
+
+        best = gs.grid(fitness, no_dimensions=2, step_size=0.1)
+
+        assert best == pytest.approx((0.25, 0.55))
+        assert gs.grid(fitnesses, no_dimensions=2, step_size=0.1, vectorized=True, chunk_size=7) == best
+
+        with multiprocessing.Pool(2) as pool:
+            assert gs.grid(fitness, no_dimensions=2, step_size=0.1, pool=pool) == best
+            assert gs.grid(fitnesses, no_dimensions=2, step_size=0.1, vectorized=True, pool=pool) == best
+
+    def test_grid_surface(self):
+
+        surface = gs.grid_surface(fitnesses, no_dimensions=2, step_size=(0.5, 0.25), vectorized=True)
+
+        assert surface.shape == (2, 4)
+        assert surface[0, 2] == fitness((0.25, 0.625))
+
+
+def test_wavefront_parents():
+
+    assert gs.wavefront_parents(number_of_steps=3, no_dimensions=2) == [None, 0, 1, 0, 1, 2, 3, 4, 5]
+    assert gs.wavefront_parents(number_of_steps=2, no_dimensions=1) == [None, 0]
+
+
+class PeakAnalysis(MockAnalysis):
+    def log_likelihood_function(self, instance):
+        x, y = instance.component.one_tuple
+        return -((x - 0.1) ** 2 + (y - 0.1) ** 2)
+
+
+def perform_update_at_centre(search, model, analysis, during_analysis):
+    instance = model.instance_from_unit_vector(model.prior_count * [0.5])
+    return MockSamples(
+        samples=samples_with_log_likelihoods([analysis.log_likelihood_function(instance)]),
+        gaussian_tuples=[(prior.mean, prior.width) for prior in sorted(model.priors, key=lambda prior: prior.id)],
+    )
+
+
 class MockResult:
     def __init__(self, log_likelihood):
         self.log_likelihood = log_likelihood
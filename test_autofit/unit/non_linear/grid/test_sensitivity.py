@@ -1,3 +1,7 @@
+import os
+import uuid
+from os import path
+
 import numpy as np
 import pytest
 
@@ -62,6 +66,80 @@ def test_sensitivity(sensitivity):
         assert result.log_likelihood_difference > 0
 
 
+def test_sensitivity__job_queue(sensitivity, tmp_path):
+    sensitivity.job_queue = af.FileJobQueue(directory=str(tmp_path))
+    sensitivity.number_of_cores = 1
+
+    results = sensitivity.run()
+
+    assert [result.index for result in results] == list(range(8))
+
+    collected = sensitivity.run()
+
+    assert [
+        result.log_likelihood_difference for result in collected
+    ] == [
+        result.log_likelihood_difference for result in results
+    ]
+
+
+class CountingSearch(GridSearch):
+    def __init__(self, marker):
+        """
+        A search which records every fit in the folder *marker*, with the tag of its paths.
+        """
+        super().__init__()
+        self.marker = marker
+
+    def fit(self, model, analysis):
+        open(path.join(self.marker, f"{uuid.uuid4().hex}{self.paths.tag}"), "w").close()
+        return super().fit(model=model, analysis=analysis)
+
+
+def fits_in(marker, tag):
+    return len([name for name in os.listdir(marker) if name.endswith(tag)])
+
+
+def test_sensitivity__base_fit_shared_by_identical_datasets(sensitivity, tmp_path):
+    sensitivity.search = CountingSearch(marker=str(tmp_path))
+    sensitivity.simulate_function = lambda instance: instance.gaussian(x)
+
+    results = sensitivity.run()
+
+    assert len(results) == 8
+    assert fits_in(str(tmp_path), "[base]") == 1
+    assert fits_in(str(tmp_path), "[perturbed]") == 8
+
+    assert len({result.result.log_likelihood for result in results}) == 1
+
+
+def test_sensitivity__results_output_and_resumed(sensitivity, tmp_path):
+    sensitivity.search = CountingSearch(marker=str(tmp_path))
+
+    results = sensitivity.run()
+
+    assert sorted(os.listdir(sensitivity.cells_path)) == sorted(
+        f"{label}.pickle" for label in sensitivity._labels
+    )
+
+    os.remove(path.join(
+        sensitivity.cells_path,
+        "centre_0.75_intensity_0.25_sigma_0.25.pickle"
+    ))
+
+    resumed = sensitivity.run()
+
+    assert fits_in(str(tmp_path), "[base]") == 9
+    assert fits_in(str(tmp_path), "[perturbed]") == 9
+
+    assert [result.index for result in resumed] == list(range(8))
+    assert [
+        result.log_likelihood_difference for result in resumed
+    ] == [
+        result.log_likelihood_difference for result in results
+    ]
+
+
 def test_tuple_step_size(sensitivity):
     sensitivity.step_size = (0.5, 0.5, 0.25)
     assert len(sensitivity._lists) == 16
@@ -85,22 +163,37 @@ def test_searches(sensitivity):
     assert len(list(sensitivity._searches)) == 8
 
 
-def test_job(perturbation_model):
+def test_fit_jobs(perturbation_model):
     instance = af.ModelInstance()
     instance.gaussian = Gaussian()
     instance.perturbation = Gaussian()
     image = image_function(instance)
+    model = af.Collection(
+        gaussian=af.PriorModel(Gaussian)
+    )
     # noinspection PyTypeChecker
-    job = s.Job(
-        model=af.Collection(
-            gaussian=af.PriorModel(Gaussian)
-        ),
-        perturbation_model=af.PriorModel(Gaussian),
+    base_job = s.FitJob(
+        model=model,
         analysis=Analysis(image),
         search=GridSearch(),
+        index="base_0",
+    )
+    # noinspection PyTypeChecker
+    perturbed_job = s.FitJob(
+        model=s.perturbed_model_from(model, af.PriorModel(Gaussian)),
+        analysis=Analysis(image),
+        search=GridSearch(),
+        index="perturbed_0",
+    )
+    base_result = base_job.perform()
+    perturbed_result = perturbed_job.perform()
+    assert isinstance(base_result, s.FitJobResult)
+    assert base_result.index == "base_0"
+    assert isinstance(perturbed_result.result, af.Result)
+    assert isinstance(base_result.result, af.Result)
+    result = s.JobResult(
+        number=0,
+        result=base_result.result,
+        perturbed_result=perturbed_result.result,
     )
-    result = job.perform()
-    assert isinstance(result, s.JobResult)
-    assert isinstance(result.perturbed_result, af.Result)
-    assert isinstance(result.result, af.Result)
     assert result.log_likelihood_difference > 0
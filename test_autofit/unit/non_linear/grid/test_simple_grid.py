@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+import autofit as af
+from autofit.mock.mock import Gaussian
+from autofit.non_linear.grid.simple_grid import GridSearch
+
+x = np.array(range(10))
+
+
+def image_function(instance: af.ModelInstance):
+    return instance.gaussian(x)
+
+
+class Analysis:
+
+    def __init__(self, image: np.array):
+        self.image = image
+
+    def log_likelihood_function(self, instance):
+        image = image_function(instance)
+        return np.mean(np.multiply(-0.5, np.square(np.subtract(self.image, image))))
+
+
+class BatchAnalysis(af.Analysis):
+
+    def __init__(self, image: np.array):
+        self.image = image
+
+    def log_likelihood_function(self, instance):
+        raise AssertionError("The batch log likelihood is used")
+
+    def log_likelihoods_from_instances(self, instances):
+        return np.asarray([
+            Analysis(self.image).log_likelihood_function(instance)
+            for instance in instances
+        ])
+
+
+@pytest.mark.parametrize("number_of_cores", [1, 2])
+def test_log_likelihood_surface(number_of_cores):
+    instance = af.ModelInstance()
+    instance.gaussian = Gaussian()
+
+    model = af.Collection(gaussian=af.PriorModel(Gaussian))
+
+    search = GridSearch(step_size=0.25, number_of_cores=number_of_cores, chunk_size=5)
+
+    result = search.fit(model=model, analysis=Analysis(image_function(instance)))
+    batch_result = search.fit(model=model, analysis=BatchAnalysis(image_function(instance)))
+
+    assert result.log_likelihood_surface.shape == (4, 4, 4)
+    assert (result.log_likelihood_surface == batch_result.log_likelihood_surface).all()
+    assert result.log_likelihood == result.log_likelihood_surface.max()
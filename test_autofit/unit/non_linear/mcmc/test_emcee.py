@@ -1,11 +1,15 @@
 from os import path
+import json
 import shutil
 
+import numpy as np
 import pytest
 
 import autofit as af
 from autoconf import conf
 from autofit.mock import mock
+from autofit.mock.mock import Gaussian
+from autofit.non_linear.mcmc.emcee import ChunkedPool, gelman_rubin_from_chains
 
 directory = path.dirname(path.realpath(__file__))
 pytestmark = pytest.mark.filterwarnings("ignore::FutureWarning")
@@ -31,6 +35,8 @@ class TestEmceeConfig:
             auto_correlation_required_length=51,
             auto_correlation_change_threshold=0.02,
             number_of_cores=2,
+            ensembles=3,
+            vectorize=True,
         )
 
         assert emcee.prior_passer.sigma == 2.0
@@ -46,6 +52,8 @@ class TestEmceeConfig:
         assert emcee.auto_correlation_required_length == 51
         assert emcee.auto_correlation_change_threshold == 0.02
         assert emcee.number_of_cores == 2
+        assert emcee.ensembles == 3
+        assert emcee.vectorize == True
 
         emcee = af.Emcee()
 
@@ -60,6 +68,8 @@ class TestEmceeConfig:
         assert emcee.auto_correlation_required_length == 50
         assert emcee.auto_correlation_change_threshold == 0.01
         assert emcee.number_of_cores == 1
+        assert emcee.ensembles == 1
+        assert emcee.vectorize == False
 
     def test__tag(self):
         emcee = af.Emcee(nwalkers=11)
@@ -193,3 +203,120 @@ class TestCopyWithNameExtension:
             is search.auto_correlation_change_threshold
         )
         assert copy.number_of_cores is search.number_of_cores
+
+
+x = np.arange(10.0)
+
+
+class Analysis(af.Analysis):
+    def __init__(self):
+        self.data = Gaussian(centre=4.0, intensity=2.0, sigma=1.5)(x)
+
+    def log_likelihood_function(self, instance):
+        return -0.5 * np.sum((instance(x) - self.data) ** 2)
+
+
+@pytest.fixture(name="model")
+def make_model():
+    model = af.PriorModel(Gaussian)
+    model.centre = af.UniformPrior(lower_limit=0.0, upper_limit=10.0)
+    model.intensity = af.UniformPrior(lower_limit=0.0, upper_limit=10.0)
+    model.sigma = af.UniformPrior(lower_limit=0.1, upper_limit=5.0)
+    return model
+
+
+class TestVectorize:
+    def test__log_posteriors_of_batch_match_walkers(self, model):
+
+        search = af.Emcee(paths=af.Paths(name="emcee_vectorize"))
+
+        fitness_function = search.fitness_function_from_model_and_analysis(model=model, analysis=Analysis())
+
+        parameters = [[4.0, 2.0, 1.5], [1.0, 3.0, 2.0], [11.0, 2.0, 1.5], [4.0, 2.0, 0.0]]
+
+        log_posteriors = fitness_function.log_posteriors_from_parameters(parameters=parameters)
+
+        assert log_posteriors == pytest.approx([fitness_function(parameters=vector) for vector in parameters])
+        assert log_posteriors[2] == fitness_function.resample_figure_of_merit
+
+    def test__chunked_pool__one_chunk_per_process(self):
+        class MockPool:
+            _processes = 4
+
+            def map(self, func, iterable, chunksize=1):
+                self.chunksize = chunksize
+                return list(map(func, iterable))
+
+        pool = MockPool()
+
+        assert ChunkedPool(pool=pool).map(abs, range(-10, 0)) == list(range(10, 0, -1))
+        assert pool.chunksize == 3
+
+        ChunkedPool(pool=pool).map(abs, [1])
+
+        assert pool.chunksize == 1
+
+
+def test__gelman_rubin_from_chains():
+
+    chains = np.random.RandomState(1).normal(size=(3, 200, 10, 2))
+
+    assert gelman_rubin_from_chains(chains=chains) == pytest.approx([1.0, 1.0], abs=0.01)
+
+    chains[0, :, :, 1] += 5.0
+
+    gelman_rubin = gelman_rubin_from_chains(chains=chains)
+
+    assert gelman_rubin[0] == pytest.approx(1.0, abs=0.01)
+    assert gelman_rubin[1] > 2.0
+
+
+def test__vectorized_ensembles_fit_outputs_gelman_rubin(model):
+
+    search = af.Emcee(
+        paths=af.Paths(name="emcee_ensembles"),
+        nwalkers=10,
+        nsteps=20,
+        iterations_per_update=10,
+        ensembles=2,
+        vectorize=True,
+    )
+
+    result = search.fit(model=model, analysis=Analysis())
+
+    search.paths.restore()
+
+    assert path.exists(path.join(search.paths.samples_path, "emcee_1.hdf"))
+
+    with open(path.join(search.paths.samples_path, "ensembles.json")) as f:
+        ensembles = json.load(f)
+
+    assert ensembles["ensembles"] == 2
+    assert list(ensembles["gelman_rubin"]) == model.model_component_and_parameter_names
+
+    assert len(result.samples.parameters) == 20 * 10
+
+    shutil.rmtree(search.paths.output_path)
+
+
+def test__ensembles_sampled_in_parallel_with_pool(model):
+
+    search = af.Emcee(
+        paths=af.Paths(name="emcee_ensembles_pool"),
+        nwalkers=10,
+        nsteps=20,
+        iterations_per_update=10,
+        ensembles=2,
+        number_of_cores=2,
+    )
+
+    result = search.fit(model=model, analysis=Analysis())
+
+    search.paths.restore()
+
+    with open(path.join(search.paths.samples_path, "ensembles.json")) as f:
+        assert json.load(f)["ensembles"] == 2
+
+    assert len(result.samples.parameters) == 20 * 10
+
+    shutil.rmtree(search.paths.output_path)
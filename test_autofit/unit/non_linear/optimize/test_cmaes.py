@@ -0,0 +1,174 @@
+import shutil
+from os import path
+
+import numpy as np
+import pytest
+
+from autoconf import conf
+import autofit as af
+from autofit.mock.mock import Gaussian
+from autofit.non_linear.budget import Budget
+from autofit.non_linear.optimize.cmaes import CMAESSampler, reflect_into_unit_hypercube
+
+directory = path.dirname(path.realpath(__file__))
+pytestmark = pytest.mark.filterwarnings("ignore::FutureWarning")
+
+
+@pytest.fixture(autouse=True)
+def set_config_path():
+    conf.instance.push(
+        new_path=path.join(directory, "files", "cmaes", "config"),
+        output_path=path.join(directory, "files", "cmaes", "output"),
+    )
+
+
+@pytest.fixture(autouse=True)
+def remove_output():
+    yield
+    shutil.rmtree(path.join(directory, "files", "cmaes", "output"), ignore_errors=True)
+
+
+class TestCMAESConfig:
+    def test__loads_from_config_file_correct(self):
+
+        cmaes = af.CMAES(
+            prior_passer=af.PriorPasser(sigma=2.0, use_errors=False, use_widths=False),
+            population_size=20,
+            sigma=0.1,
+            iters=50,
+            ftol=1.0e-4,
+            initializer=af.InitializerBall(lower_limit=0.2, upper_limit=0.8),
+            iterations_per_update=10,
+            number_of_cores=2,
+        )
+
+        assert cmaes.prior_passer.sigma == 2.0
+        assert cmaes.prior_passer.use_errors == False
+        assert cmaes.population_size == 20
+        assert cmaes.sigma == 0.1
+        assert cmaes.iters == 50
+        assert cmaes.ftol == 1.0e-4
+        assert isinstance(cmaes.initializer, af.InitializerBall)
+        assert cmaes.iterations_per_update == 10
+        assert cmaes.number_of_cores == 2
+
+        cmaes = af.CMAES()
+
+        assert cmaes.prior_passer.sigma == 3.0
+        assert cmaes.population_size == 10
+        assert cmaes.sigma == 0.2
+        assert cmaes.iters == 1000
+        assert cmaes.ftol == 1.0e-8
+        assert isinstance(cmaes.initializer, af.InitializerPrior)
+        assert cmaes.iterations_per_update == 11
+        assert cmaes.number_of_cores == 1
+
+    def test__tag(self):
+
+        cmaes = af.CMAES(population_size=20, sigma=0.1)
+
+        assert cmaes.tag == "cmaes[pop_20_sigma_0.1]"
+
+        cmaes = af.CMAES(population_size=-1.0, sigma=0.1)
+
+        assert cmaes.tag == "cmaes[sigma_0.1]"
+
+    def test__copy_with_name_extension(self):
+
+        search = af.CMAES(af.Paths("name"))
+
+        copy = search.copy_with_name_extension("one")
+
+        assert copy.paths.name == path.join("name", "one")
+        assert isinstance(copy, af.CMAES)
+        assert copy.population_size is search.population_size
+        assert copy.sigma == search.sigma
+        assert copy.iters is search.iters
+        assert copy.ftol == search.ftol
+        assert copy.initializer is search.initializer
+        assert copy.number_of_cores is search.number_of_cores
+
+
+class TestCMAESSampler:
+    def test__default_population_size(self):
+
+        sampler = CMAESSampler(mean=np.zeros(10), sigma=0.5)
+
+        assert sampler.population_size == 10
+        assert sampler.mu == 5
+        assert np.sum(sampler.weights) == pytest.approx(1.0)
+
+    def test__minimizes_correlated_quadratic(self):
+
+        np.random.seed(1)
+
+        covariance = np.array([[1.0, 0.9, 0.0], [0.9, 1.0, 0.0], [0.0, 0.0, 0.01]])
+        inverse = np.linalg.inv(covariance)
+        centre = np.array([0.3, -0.2, 0.5])
+
+        sampler = CMAESSampler(mean=np.zeros(3), sigma=0.5)
+
+        for _ in range(150):
+            points = sampler.ask()
+            offsets = points - centre
+            sampler.tell(
+                points=points, figures_of_merit=np.einsum("ij,jk,ik->i", offsets, inverse, offsets)
+            )
+
+        assert sampler.mean == pytest.approx(centre, abs=1.0e-3)
+
+    def test__reflect_into_unit_hypercube(self):
+
+        unit_vectors = reflect_into_unit_hypercube(np.array([[0.5, 1.2, -0.3, 2.4]]))
+
+        assert unit_vectors == pytest.approx(np.array([[0.5, 0.8, 0.3, 0.4]]))
+
+
+x = np.arange(10.0)
+
+
+class Analysis(af.Analysis):
+    def __init__(self):
+        self.data = Gaussian(centre=4.0, intensity=2.0, sigma=1.5)(x)
+
+    def log_likelihood_function(self, instance):
+        return -0.5 * np.sum((instance(x) - self.data) ** 2)
+
+
+def make_model():
+    model = af.PriorModel(Gaussian)
+    model.centre = af.UniformPrior(lower_limit=0.0, upper_limit=10.0)
+    model.intensity = af.UniformPrior(lower_limit=0.0, upper_limit=10.0)
+    model.sigma = af.UniformPrior(lower_limit=0.1, upper_limit=5.0)
+    return model
+
+
+class TestCMAESFit:
+    def test__fit_and_resume(self):
+
+        np.random.seed(2)
+
+        cmaes = af.CMAES(paths=af.Paths(name="fit"), iters=4, iterations_per_update=2)
+
+        result = cmaes.fit(model=make_model(), analysis=Analysis())
+
+        cmaes.paths.restore()
+
+        assert len(result.samples.parameters) == 50
+        assert cmaes.samples_via_csv_json_from_model(model=make_model()).total_samples == 50
+
+        cmaes = af.CMAES(paths=af.Paths(name="converge"), iters=200, iterations_per_update=100)
+        cmaes.budget = Budget(max_evaluations=500)
+
+        result = cmaes.fit(model=make_model(), analysis=Analysis())
+
+        assert result.partial is True
+
+        cmaes.budget = Budget()
+
+        result = cmaes.fit(model=make_model(), analysis=Analysis())
+
+        assert result.partial is False
+        assert result.log_likelihood == pytest.approx(0.0, abs=1.0e-4)
+        assert result.instance.centre == pytest.approx(4.0, 1.0e-2)
+        assert result.instance.sigma == pytest.approx(1.5, 1.0e-2)
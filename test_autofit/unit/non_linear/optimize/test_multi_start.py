@@ -0,0 +1,178 @@
+import json
+import shutil
+from os import path
+
+import numpy as np
+import pytest
+
+from autoconf import conf
+import autofit as af
+from autofit.mock.mock import Gaussian
+from autofit.non_linear.budget import Budget
+
+directory = path.dirname(path.realpath(__file__))
+pytestmark = pytest.mark.filterwarnings("ignore::FutureWarning")
+
+
+@pytest.fixture(autouse=True)
+def set_config_path():
+    conf.instance.push(
+        new_path=path.join(directory, "files", "multi_start", "config"),
+        output_path=path.join(directory, "files", "multi_start", "output"),
+    )
+
+
+@pytest.fixture(autouse=True)
+def remove_output():
+    yield
+    shutil.rmtree(path.join(directory, "files", "multi_start", "output"), ignore_errors=True)
+
+
+class TestMultiStartOptimizerConfig:
+    def test__loads_from_config_file_correct(self):
+
+        multi_start = af.MultiStartOptimizer(
+            prior_passer=af.PriorPasser(sigma=2.0, use_errors=False, use_widths=False),
+            n_starts=5,
+            method="Nelder-Mead",
+            maxiter=50,
+            ftol=1.0e-4,
+            epsilon=1.0e-4,
+            mode_tolerance=0.1,
+            initializer=af.InitializerBall(lower_limit=0.2, upper_limit=0.8),
+            iterations_per_update=2,
+            number_of_cores=2,
+        )
+
+        assert multi_start.prior_passer.sigma == 2.0
+        assert multi_start.prior_passer.use_errors == False
+        assert multi_start.n_starts == 5
+        assert multi_start.method == "Nelder-Mead"
+        assert multi_start.maxiter == 50
+        assert multi_start.ftol == 1.0e-4
+        assert multi_start.epsilon == 1.0e-4
+        assert multi_start.mode_tolerance == 0.1
+        assert isinstance(multi_start.initializer, af.InitializerBall)
+        assert multi_start.iterations_per_update == 2
+        assert multi_start.number_of_cores == 2
+
+        multi_start = af.MultiStartOptimizer()
+
+        assert multi_start.prior_passer.sigma == 3.0
+        assert multi_start.n_starts == 10
+        assert multi_start.method == "L-BFGS-B"
+        assert multi_start.maxiter == 1000
+        assert multi_start.ftol == 1.0e-8
+        assert multi_start.epsilon == 1.0e-6
+        assert multi_start.mode_tolerance == 0.01
+        assert isinstance(multi_start.initializer, af.InitializerPrior)
+        assert multi_start.iterations_per_update == 4
+        assert multi_start.number_of_cores == 1
+
+    def test__tag(self):
+
+        multi_start = af.MultiStartOptimizer(n_starts=5, method="Nelder-Mead")
+
+        assert multi_start.tag == "multi_start[starts_5_nelder-mead]"
+
+    def test__copy_with_name_extension(self):
+
+        search = af.MultiStartOptimizer(af.Paths("name"))
+
+        copy = search.copy_with_name_extension("one")
+
+        assert copy.paths.name == path.join("name", "one")
+        assert isinstance(copy, af.MultiStartOptimizer)
+        assert copy.n_starts is search.n_starts
+        assert copy.method == search.method
+        assert copy.maxiter is search.maxiter
+        assert copy.epsilon == search.epsilon
+        assert copy.initializer is search.initializer
+        assert copy.number_of_cores is search.number_of_cores
+
+
+class TestModes:
+    def test__solutions_within_tolerance_are_deduplicated_and_sorted(self):
+
+        multi_start = af.MultiStartOptimizer(mode_tolerance=0.1)
+
+        modes = multi_start.modes_from_local_optimizations(
+            local_optimizations=[
+                {"unit_vector": [0.2, 0.2], "log_posterior": -5.0},
+                {"unit_vector": [0.8, 0.8], "log_posterior": -1.0},
+                {"unit_vector": [0.21, 0.2], "log_posterior": -4.0},
+                {"unit_vector": [0.8, 0.79], "log_posterior": -1.1},
+                {"unit_vector": [0.5, 0.5], "log_posterior": -3.0},
+            ]
+        )
+
+        assert [mode["log_posterior"] for mode in modes] == [-1.0, -3.0, -4.0]
+        assert [mode["total_starts"] for mode in modes] == [2, 1, 2]
+
+
+x = np.arange(10.0)
+
+
+class Analysis(af.Analysis):
+    def __init__(self):
+        self.data = Gaussian(centre=4.0, intensity=2.0, sigma=1.5)(x)
+
+    def log_likelihood_function(self, instance):
+        return -0.5 * np.sum((instance(x) - self.data) ** 2)
+
+
+def make_model():
+    model = af.PriorModel(Gaussian)
+    model.centre = af.UniformPrior(lower_limit=0.0, upper_limit=10.0)
+    model.intensity = af.UniformPrior(lower_limit=0.0, upper_limit=10.0)
+    model.sigma = af.UniformPrior(lower_limit=0.1, upper_limit=5.0)
+    return model
+
+
+class TestMultiStartOptimizerFit:
+    @pytest.mark.parametrize("method", ["L-BFGS-B", "Nelder-Mead"])
+    def test__fit(self, method):
+
+        np.random.seed(1)
+
+        multi_start = af.MultiStartOptimizer(
+            paths=af.Paths(name=method), n_starts=4, method=method, iterations_per_update=2
+        )
+
+        result = multi_start.fit(model=make_model(), analysis=Analysis())
+
+        multi_start.paths.restore()
+
+        assert result.log_likelihood == pytest.approx(0.0, abs=1.0e-4)
+        assert result.instance.centre == pytest.approx(4.0, 1.0e-2)
+        assert result.instance.sigma == pytest.approx(1.5, 1.0e-2)
+
+        with open(path.join(multi_start.paths.samples_path, "modes.json")) as f:
+            modes = json.load(f)
+
+        assert modes[0]["parameters"]["centre"] == pytest.approx(4.0, 1.0e-2)
+        assert sum(mode["total_starts"] for mode in modes) == 4
+
+    def test__stops_early_and_resumes(self):
+
+        np.random.seed(2)
+
+        multi_start = af.MultiStartOptimizer(
+            paths=af.Paths(name="resume"), n_starts=4, iterations_per_update=1
+        )
+        multi_start.budget = Budget(max_evaluations=1)
+
+        result = multi_start.fit(model=make_model(), analysis=Analysis())
+
+        assert result.partial is True
+
+        multi_start.paths.restore()
+
+        assert len(multi_start.load_state["local_optimizations"]) == 1
+
+        multi_start.budget = Budget()
+
+        result = multi_start.fit(model=make_model(), analysis=Analysis())
+
+        assert result.partial is False
+        assert result.log_likelihood == pytest.approx(0.0, abs=1.0e-4)
@@ -1,4 +1,7 @@
+import multiprocessing as mp
 from os import path
+
+import numpy as np
 import pytest
 
 from autoconf import conf
@@ -150,6 +153,80 @@ class TestPySwarmsGlobalConfig:
         assert len(samples.log_likelihoods) == 500
 
 
+x = np.arange(10.0)
+
+
+class Analysis(af.Analysis):
+    def __init__(self):
+        self.data = mock.Gaussian(centre=4.0, intensity=2.0, sigma=1.5)(x)
+
+    def log_likelihood_function(self, instance):
+        return -0.5 * np.sum((instance(x) - self.data) ** 2)
+
+
+class BatchAnalysis(Analysis):
+    def __init__(self):
+        super().__init__()
+        self.batches = []
+
+    def log_likelihoods_from_instances(self, instances):
+        self.batches.append(len(instances))
+        return np.asarray([self.log_likelihood_function(instance=instance) for instance in instances])
+
+
+@pytest.fixture(name="model")
+def make_model():
+    model = af.PriorModel(mock.Gaussian)
+    model.centre = af.UniformPrior(lower_limit=0.0, upper_limit=10.0)
+    model.intensity = af.UniformPrior(lower_limit=0.0, upper_limit=10.0)
+    model.sigma = af.GaussianPrior(mean=1.0, sigma=2.0, lower_limit=0.1, upper_limit=5.0)
+    return model
+
+
+swarm = np.array([[4.0, 2.0, 1.5], [1.0, 1.0, 1.0], [11.0, 1.0, 1.0], [5.0, 3.0, 2.0]])
+
+
+class TestFitness:
+    def test__swarm_evaluated_as_batch__matches_particles(self, model):
+
+        fitness = af.PySwarmsGlobal(paths=af.Paths()).fitness_function_from_model_and_analysis(
+            model=model, analysis=Analysis()
+        )
+
+        figures_of_merit = fitness(swarm)
+
+        assert figures_of_merit[2] == np.inf
+
+        for index in (0, 1, 3):
+            assert figures_of_merit[index] == pytest.approx(
+                fitness.figure_of_merit_from_parameters(parameters=list(swarm[index])), 1.0e-8
+            )
+
+    def test__batch_log_likelihood_of_analysis_called_once_per_batch(self, model):
+
+        search = af.PySwarmsGlobal(paths=af.Paths())
+
+        analysis = BatchAnalysis()
+
+        fitness = search.fitness_function_from_model_and_analysis(model=model, analysis=analysis)
+        expected = search.fitness_function_from_model_and_analysis(model=model, analysis=Analysis())
+
+        assert list(fitness(swarm)) == pytest.approx(list(expected(swarm)), 1.0e-8)
+        assert analysis.batches == [3]
+        assert fitness.max_log_likelihood == 0.0
+
+    def test__pool__swarm_evaluated_in_one_chunk_per_process(self, model):
+
+        fitness = af.PySwarmsGlobal(paths=af.Paths()).fitness_function_from_model_and_analysis(
+            model=model, analysis=Analysis()
+        )
+
+        with mp.Pool(processes=2) as pool:
+            figures_of_merit = fitness(swarm, pool=pool)
+
+        assert list(figures_of_merit) == pytest.approx(list(fitness(swarm)), 1.0e-8)
+
+
 class TestCopyWithNameExtension:
     @staticmethod
     def assert_non_linear_attributes_equal(copy):
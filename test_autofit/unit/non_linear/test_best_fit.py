@@ -0,0 +1,140 @@
+import multiprocessing as mp
+import pickle
+
+import numpy as np
+import pytest
+
+import autofit as af
+from autofit.mock.mock import Gaussian
+from autofit.non_linear import best_fit as bf
+from autofit.non_linear.best_fit import BestFit
+from autofit.non_linear.per_process import registry
+
+
+@pytest.fixture(name="best_fit")
+def make_best_fit():
+    best_fit = BestFit()
+    best_fit.start(dimensions=3)
+    yield best_fit
+    best_fit.stop()
+
+
+def update(best_fit, log_likelihood):
+    return best_fit.update(log_likelihood=log_likelihood, parameters=np.full(3, log_likelihood))
+
+
+class TestBestFit:
+    def test__not_started__updates_ignored(self):
+
+        best_fit = BestFit()
+
+        assert best_fit.update(log_likelihood=1.0, parameters=[1.0, 2.0]) is False
+        assert best_fit.read() == (-np.inf, None)
+
+    def test__only_higher_log_likelihoods_update(self, best_fit):
+
+        assert best_fit.read() == (-np.inf, None)
+
+        assert update(best_fit, 1.0) is True
+        assert update(best_fit, 0.5) is False
+        assert update(best_fit, np.nan) is False
+        assert update(best_fit, 2.0) is True
+
+        log_likelihood, parameters = best_fit.read()
+
+        assert log_likelihood == 2.0
+        assert list(parameters) == [2.0, 2.0, 2.0]
+
+    def test__unpickled_copies_share_best_fit_of_process(self, best_fit):
+
+        assert pickle.loads(pickle.dumps(best_fit)) is best_fit
+
+        assert pickle.loads(pickle.dumps(BestFit())).is_active is False
+
+    def test__stop__shared_array_released(self):
+
+        best_fit = BestFit()
+        best_fit.start(dimensions=2, shared=True)
+
+        run_id = best_fit.run_id
+
+        best_fit.stop()
+
+        assert best_fit.is_active is False
+        assert best_fit.process_arguments == (None, None, 2, None)
+        assert run_id not in registry(BestFit.__name__)
+
+    def test__write_never_completed__last_consistent_value_read(self, best_fit):
+
+        update(best_fit, 1.0)
+
+        assert best_fit.read()[0] == 1.0
+
+        best_fit._array[1] += 1.0
+        best_fit._array[0] = 5.0
+
+        log_likelihood, parameters = best_fit.read()
+
+        assert log_likelihood == 1.0
+        assert list(parameters) == [1.0, 1.0, 1.0]
+
+
+def update_in_process(best_fit, log_likelihood):
+    return update(best_fit, log_likelihood)
+
+
+def test__processes_of_pool_update_shared_best_fit():
+
+    best_fit = BestFit()
+    best_fit.start(dimensions=3, shared=True)
+
+    pool = mp.Pool(processes=2, initializer=bf.init_process, initargs=best_fit.process_arguments)
+
+    try:
+        updated = pool.starmap(update_in_process, [(best_fit, float(value)) for value in np.arange(20.0)])
+    finally:
+        pool.close()
+        pool.join()
+
+    log_likelihood, parameters = best_fit.read()
+
+    assert any(updated)
+    assert log_likelihood == 19.0
+    assert list(parameters) == [19.0, 19.0, 19.0]
+
+    best_fit.stop()
+
+
+class MockSample:
+    def __init__(self, log_likelihood):
+        self.log_likelihood = log_likelihood
+
+
+class MockSamples:
+    def __init__(self, model, log_likelihood):
+        self.model = model
+        self.max_log_likelihood_sample = MockSample(log_likelihood=log_likelihood)
+        self.max_log_likelihood_instance = "samples"
+
+
+def test__update_uses_best_fit_if_it_exceeds_samples():
+
+    model = af.PriorModel(Gaussian)
+    model.centre = af.UniformPrior(lower_limit=0.0, upper_limit=10.0)
+    model.intensity = af.UniformPrior(lower_limit=0.0, upper_limit=10.0)
+    model.sigma = af.UniformPrior(lower_limit=0.0, upper_limit=10.0)
+
+    search = af.MockSearch()
+    search.best_fit.start(dimensions=3)
+
+    samples = MockSamples(model=model, log_likelihood=1.0)
+
+    assert search.max_log_likelihood_instance_from(samples=samples) == "samples"
+
+    search.best_fit.update(log_likelihood=2.0, parameters=[1.0, 2.0, 3.0])
+
+    instance = search.max_log_likelihood_instance_from(samples=samples)
+
+    assert (instance.centre, instance.intensity, instance.sigma) == (1.0, 2.0, 3.0)
+
+    search.best_fit.stop()
@@ -0,0 +1,115 @@
+from os import path
+
+import pytest
+
+import autofit as af
+from autofit.non_linear.budget import Budget
+
+
+class MockTimer:
+    def __init__(self, paths, session_time=0.0):
+        self.paths = paths
+        self.session_time = session_time
+
+
+@pytest.fixture(name="timer")
+def make_timer(paths):
+    return MockTimer(paths=paths)
+
+
+class TestBudget:
+    def test__inactive_by_default(self, timer):
+
+        budget = Budget(max_time=-1, max_evaluations=-1)
+        budget.start(timer=timer)
+        budget.add_evaluations(evaluations=1000)
+
+        assert budget.is_active is False
+        assert budget.check() is False
+        assert budget.iterations_within_budget(iterations=100) == 100
+
+    def test__evaluation_budget(self, timer):
+
+        budget = Budget(max_evaluations=100)
+        budget.start(timer=timer)
+
+        assert budget.iterations_within_budget(iterations=50, evaluations_per_iteration=10) == 10
+
+        budget.add_evaluations(evaluations=60)
+
+        assert budget.check() is False
+        assert budget.iterations_within_budget(iterations=50, evaluations_per_iteration=10) == 4
+
+        budget.add_evaluations(evaluations=40)
+
+        assert budget.check() is True
+        assert budget.stopped is True
+
+    def test__time_budget(self, timer):
+
+        budget = Budget(max_time=10.0)
+        budget.start(timer=timer)
+
+        timer.session_time = 5.0
+        budget.add_evaluations(evaluations=100)
+
+        assert budget.check() is False
+        assert budget.iterations_within_budget(iterations=50, evaluations_per_iteration=10) == 10
+
+        timer.session_time = 10.0
+
+        assert budget.check() is True
+
+    def test__total_evaluations_persist_across_runs_with_fresh_budget(self, timer):
+
+        budget = Budget(max_evaluations=100)
+        budget.start(timer=timer)
+        budget.add_evaluations(evaluations=100)
+
+        assert budget.check() is True
+
+        budget.start(timer=timer)
+
+        assert budget.check() is False
+        assert budget.evaluations == 0
+        assert budget.total_evaluations == 100
+
+        with open(path.join(timer.paths.samples_path, ".evaluations")) as f:
+            assert f.read() == "100"
+
+
+def test__search_stops_early_and_resumes(gaussian_model, analysis):
+
+    search = af.PySwarmsGlobal(
+        paths=af.Paths(name="budget"), n_particles=5, iters=6, iterations_per_update=2
+    )
+    search.budget = Budget(max_evaluations=10)
+
+    result = search.fit(model=gaussian_model, analysis=analysis)
+
+    assert result.partial is True
+
+    search.paths.restore()
+
+    assert search.load_total_iterations == 2
+    assert not path.exists(search.paths.has_completed_path)
+
+    result = search.fit(model=gaussian_model, analysis=analysis)
+
+    assert result.partial is True
+
+    search.paths.restore()
+
+    assert search.load_total_iterations == 4
+    assert search.budget.total_evaluations == 20
+
+    search.budget = Budget()
+
+    result = search.fit(model=gaussian_model, analysis=analysis)
+
+    assert result.partial is False
+
+    search.paths.restore()
+
+    assert search.load_total_iterations == 6
+    assert path.exists(search.paths.has_completed_path)
@@ -0,0 +1,216 @@
+import json
+from os import path
+
+import numpy as np
+import pytest
+
+import autofit as af
+from autofit.mock.mock import Gaussian
+from autofit.non_linear.fidelity import FidelityScheduler
+from autofit.non_linear.samples import NestSamples, Sample
+
+
+class MockFitness:
+    def __init__(self, analysis):
+        self.analysis = analysis
+
+
+x = np.arange(20.0)
+
+
+class Analysis(af.Analysis):
+    def __init__(self, binning=1):
+        self.binning = binning
+        self.data = Gaussian(centre=10.0, intensity=2.0, sigma=2.0)(x)
+
+    def log_likelihood_function(self, instance):
+        residuals = instance(x[:: self.binning]) - self.data[:: self.binning]
+        return -0.5 * np.sum(residuals ** 2)
+
+    @property
+    def fidelity_levels(self):
+        if self.binning > 1:
+            return []
+        return [4, 2]
+
+    def with_fidelity(self, fidelity):
+        return Analysis(binning=fidelity)
+
+
+class TestFidelityScheduler:
+    def test__single_fidelity_analysis__inactive(self, paths):
+
+        scheduler = FidelityScheduler(switch_evaluations=10)
+        scheduler.start(paths=paths, analysis=af.Analysis())
+
+        fitness = MockFitness(analysis=None)
+        scheduler.apply(fitness_function=fitness)
+
+        assert scheduler.is_active is False
+        assert scheduler.applied is False
+        assert fitness.analysis is None
+        assert scheduler.update(fitness_function=fitness, evaluations=100, converged=True) is False
+
+    def test__switches_on_evaluations_and_convergence(self, paths):
+
+        analysis = Analysis()
+
+        scheduler = FidelityScheduler(switch_evaluations=100)
+        scheduler.start(paths=paths, analysis=analysis)
+
+        fitness = MockFitness(analysis=analysis)
+        scheduler.apply(fitness_function=fitness)
+
+        assert fitness.analysis.binning == 4
+
+        assert scheduler.update(fitness_function=fitness, evaluations=60) is False
+        assert scheduler.update(fitness_function=fitness, evaluations=60) is True
+        assert fitness.analysis.binning == 2
+
+        assert scheduler.update(fitness_function=fitness, evaluations=10, converged=True, reason="dlogz") is True
+        assert fitness.analysis is analysis
+        assert scheduler.is_full_fidelity is True
+
+        assert scheduler.update(fitness_function=fitness, evaluations=1000, converged=True) is False
+
+        assert [(switch["from_fidelity"], switch["to_fidelity"], switch["reason"], switch["evaluations"])
+                for switch in scheduler.switches] == [(4, 2, "evaluations", 120), (2, None, "dlogz", 10)]
+
+    def test__resumes_from_json(self, paths):
+
+        analysis = Analysis()
+
+        scheduler = FidelityScheduler(switch_evaluations=100)
+        scheduler.start(paths=paths, analysis=analysis)
+        scheduler.apply(fitness_function=MockFitness(analysis=analysis))
+        scheduler.update(fitness_function=MockFitness(analysis=analysis), evaluations=150)
+        scheduler.update(fitness_function=MockFitness(analysis=analysis), evaluations=30)
+
+        scheduler = FidelityScheduler(switch_evaluations=100)
+        scheduler.start(paths=paths, analysis=analysis)
+
+        fitness = MockFitness(analysis=analysis)
+        scheduler.apply(fitness_function=fitness)
+
+        assert scheduler.level == 1
+        assert scheduler.evaluations_at_level == 30
+        assert len(scheduler.switches) == 1
+        assert fitness.analysis.binning == 2
+
+    def test__convergence_signals(self):
+
+        scheduler = FidelityScheduler(switch_dlogz=1.0, stall_tolerance=0.1)
+
+        assert scheduler.is_dlogz_converged(dlogz=0.5) is True
+        assert scheduler.is_dlogz_converged(dlogz=1.5) is False
+        assert scheduler.is_stalled(log_posterior=-1.0, previous_log_posterior=None) is False
+        assert scheduler.is_stalled(log_posterior=-1.0, previous_log_posterior=-1.05) is True
+        assert scheduler.is_stalled(log_posterior=-1.0, previous_log_posterior=-2.0) is False
+
+        scheduler = FidelityScheduler(switch_dlogz=-1.0, stall_tolerance=-1.0)
+
+        assert scheduler.is_dlogz_converged(dlogz=0.0) is False
+        assert scheduler.is_stalled(log_posterior=-1.0, previous_log_posterior=-1.0) is False
+
+    def test__samples_reevaluated_and_reweighted_at_full_fidelity(self, paths):
+
+        model = make_model()
+        analysis = Analysis()
+
+        scheduler = FidelityScheduler()
+        scheduler.start(paths=paths, analysis=analysis)
+
+        parameters = [[10.0, 2.0, 2.0], [9.0, 2.0, 2.0], [12.0, 1.0, 3.0]]
+
+        coarse_log_likelihoods = [
+            analysis.with_fidelity(4).log_likelihood_function(instance=model.instance_from_vector(vector))
+            for vector in parameters
+        ]
+
+        samples = NestSamples(
+            model=model,
+            samples=Sample.from_lists(
+                model=model,
+                parameters=parameters,
+                log_likelihoods=coarse_log_likelihoods,
+                log_priors=[0.0, 0.0, 0.0],
+                weights=[0.5, 0.3, 0.2],
+            ),
+            number_live_points=1,
+            log_evidence=-1.0,
+            total_samples=3,
+        )
+
+        full_samples = scheduler.samples_at_full_fidelity(samples=samples)
+
+        full_log_likelihoods = [
+            analysis.log_likelihood_function(instance=model.instance_from_vector(vector))
+            for vector in parameters
+        ]
+
+        weights = np.array([0.5, 0.3, 0.2]) * np.exp(
+            np.array(full_log_likelihoods) - np.array(coarse_log_likelihoods)
+        )
+
+        assert full_samples.log_likelihoods == pytest.approx(full_log_likelihoods)
+        assert full_samples.weights == pytest.approx(list(weights / np.sum(weights)))
+        assert full_samples.log_evidence == pytest.approx(-1.0 + np.log(np.sum(weights)))
+        assert samples.log_likelihoods == pytest.approx(coarse_log_likelihoods)
+
+
+def make_model():
+    model = af.PriorModel(Gaussian)
+    model.centre = af.UniformPrior(lower_limit=0.0, upper_limit=20.0)
+    model.intensity = af.UniformPrior(lower_limit=0.0, upper_limit=10.0)
+    model.sigma = af.UniformPrior(lower_limit=0.1, upper_limit=5.0)
+    return model
+
+
+def test__pyswarms_switches_fidelity_and_records_switches():
+
+    np.random.seed(1)
+
+    search = af.PySwarmsGlobal(
+        paths=af.Paths(name="fidelity"), n_particles=10, iters=6, iterations_per_update=2
+    )
+    search.fidelity = FidelityScheduler(switch_evaluations=20, stall_tolerance=-1.0)
+
+    analysis = Analysis()
+
+    result = search.fit(model=make_model(), analysis=analysis)
+
+    search.paths.restore()
+
+    assert [switch["to_fidelity"] for switch in search.fidelity.switches] == [2, None]
+    assert result.log_likelihood == pytest.approx(
+        analysis.log_likelihood_function(instance=result.instance)
+    )
+
+    with open(search.paths.file_search_summary) as f:
+        summary = f.read()
+
+    assert "Fidelity Switch 1 = 4 -> 2 (evaluations, after 20 evaluations)" in summary
+    assert "Fidelity Switch 2 = 2 -> full (evaluations, after 20 evaluations)" in summary
+
+    with open(path.join(search.paths.samples_path, "fidelity.json")) as f:
+        assert json.load(f)["level"] == 2
+
+
+def test__dynesty_switches_fidelity_on_dlogz():
+
+    np.random.seed(1)
+
+    search = af.DynestyStatic(
+        paths=af.Paths(name="fidelity"), n_live_points=20, iterations_per_update=100
+    )
+    search.fidelity = FidelityScheduler(switch_dlogz=5.0)
+
+    analysis = Analysis()
+
+    result = search.fit(model=make_model(), analysis=analysis)
+
+    search.paths.restore()
+
+    assert [switch["reason"] for switch in search.fidelity.switches] == ["dlogz", "dlogz"]
+    assert sum(result.samples.weights) == pytest.approx(1.0)
+    assert result.instance.centre == pytest.approx(10.0, abs=0.5)
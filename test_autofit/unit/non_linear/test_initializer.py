@@ -1,5 +1,11 @@
+import multiprocessing as mp
+
+import pytest
+
 import autofit as af
+from autofit import exc
 from autofit.mock.mock import MockClassx4
+from autofit.non_linear.samples import OptimizerSamples, Sample
 
 
 class MockFitness:
@@ -7,6 +13,13 @@ class MockFitness:
         return 1.0
 
 
+class MockFitnessReject:
+    def figure_of_merit_from_parameters(self, parameters):
+        if parameters[0] > 0.5:
+            raise exc.FitException
+        return parameters[0]
+
+
 class TestInitializePrior:
     def test__prior__initial_samples_sample_priors(self):
 
@@ -126,3 +139,155 @@ class TestInitializeBall:
         assert 3.199 < initial_parameters[1][3] < 3.201
 
         assert initial_figures_of_merit == 2 * [1.0]
+
+
+class TestInitializeBatched:
+    def test__rejected_points_are_resampled(self):
+
+        model = af.PriorModel(MockClassx4)
+
+        initializer = af.InitializerPrior()
+
+        initial_unit_parameters, initial_parameters, initial_figures_of_merit = initializer.initial_samples_from_model(
+            total_points=50, model=model, fitness_function=MockFitnessReject()
+        )
+
+        assert len(initial_parameters) == 50
+        assert len(initial_unit_parameters) == 50
+        assert all(parameters[0] <= 0.5 for parameters in initial_parameters)
+        assert initial_figures_of_merit == [parameters[0] for parameters in initial_parameters]
+
+    def test__points_outside_prior_limits_are_not_evaluated(self):
+
+        model = af.PriorModel(MockClassx4)
+        model.one = af.GaussianPrior(mean=0.0, sigma=1.0, lower_limit=0.0)
+
+        initializer = af.InitializerPrior()
+
+        initial_unit_parameters, initial_parameters, initial_figures_of_merit = initializer.initial_samples_from_model(
+            total_points=20, model=model, fitness_function=MockFitness()
+        )
+
+        index = model.prior_tuples_ordered_by_id.index(("one", model.one))
+
+        assert len(initial_parameters) == 20
+        assert all(parameters[index] >= 0.0 for parameters in initial_parameters)
+
+    def test__points_evaluated_via_pool(self):
+
+        model = af.PriorModel(MockClassx4)
+
+        initializer = af.InitializerPrior()
+
+        pool = mp.Pool(processes=2)
+
+        try:
+            initial_unit_parameters, initial_parameters, initial_figures_of_merit = initializer.initial_samples_from_model(
+                total_points=10, model=model, fitness_function=MockFitnessReject(), pool=pool
+            )
+        finally:
+            pool.close()
+            pool.join()
+
+        assert len(initial_parameters) == 10
+        assert all(parameters[0] <= 0.5 for parameters in initial_parameters)
+
+
+class MockLogLikelihoodFitness:
+    def figure_of_merit_from_parameters(self, parameters):
+        return -1.0
+
+    def figure_of_merit_from_log_likelihood(self, parameters, log_likelihood):
+        return 2.0 * log_likelihood
+
+
+def make_samples(model, total_samples):
+
+    return OptimizerSamples(
+        model=model,
+        samples=[
+            Sample(
+                log_likelihood=float(index),
+                log_prior=0.0,
+                weights=1.0 if index % 2 == 0 else 0.0,
+                **{
+                    name: 0.1 * (parameter + 1) + 0.01 * index
+                    for parameter, name in enumerate(model.model_component_and_parameter_names)
+                }
+            )
+            for index in range(total_samples)
+        ],
+    )
+
+
+class TestInitializeFromSamples:
+    def test__samples_drawn_by_weight_and_path(self):
+
+        model = af.PriorModel(MockClassx4)
+
+        initializer = af.InitializerFromSamples(samples=make_samples(model=model, total_samples=10))
+
+        initial_unit_parameters, initial_parameters, initial_figures_of_merit = initializer.initial_samples_from_model(
+            total_points=5, model=model, fitness_function=MockFitness()
+        )
+
+        assert len(initial_parameters) == 5
+        assert sorted(round(parameters[0], 2) for parameters in initial_parameters) == [0.1, 0.12, 0.14, 0.16, 0.18]
+        assert model.vector_from_unit_vector(initial_unit_parameters[0]) == pytest.approx(initial_parameters[0], 1.0e-4)
+        assert initial_figures_of_merit == 5 * [1.0]
+
+    def test__gaps_filled_from_priors(self):
+
+        previous_model = af.PriorModel(MockClassx4)
+        previous_model.four = 0.5
+
+        model = af.PriorModel(MockClassx4)
+        model.four = af.UniformPrior(lower_limit=10.0, upper_limit=20.0)
+
+        index = model.prior_tuples_ordered_by_id.index(("four", model.four))
+
+        initializer = af.InitializerFromSamples(samples=make_samples(model=previous_model, total_samples=6))
+
+        initial_unit_parameters, initial_parameters, initial_figures_of_merit = initializer.initial_samples_from_model(
+            total_points=5, model=model, fitness_function=MockFitness()
+        )
+
+        assert len(initial_parameters) == 5
+        assert all(10.0 <= parameters[index] <= 20.0 for parameters in initial_parameters)
+        assert sorted(round(parameters[0], 2) for parameters in initial_parameters[:3]) == [0.1, 0.12, 0.14]
+
+    def test__reuse_log_likelihoods(self):
+
+        model = af.PriorModel(MockClassx4)
+
+        initializer = af.InitializerFromSamples(
+            samples=make_samples(model=model, total_samples=10), reuse_log_likelihoods=True
+        )
+
+        initial_unit_parameters, initial_parameters, initial_figures_of_merit = initializer.initial_samples_from_model(
+            total_points=5, model=model, fitness_function=MockLogLikelihoodFitness()
+        )
+
+        assert sorted(initial_figures_of_merit) == [0.0, 4.0, 8.0, 12.0, 16.0]
+
+    def test__only_named_parameters_drawn_from_samples(self):
+
+        model = af.PriorModel(MockClassx4)
+
+        samples = make_samples(model=model, total_samples=10)
+
+        model.four = af.UniformPrior(lower_limit=10.0, upper_limit=20.0)
+
+        index = model.prior_tuples_ordered_by_id.index(("four", model.four))
+
+        initializer = af.InitializerFromSamples(
+            samples=samples,
+            parameter_names=[name for name in model.model_component_and_parameter_names if name != "four"],
+        )
+
+        initial_unit_parameters, initial_parameters, initial_figures_of_merit = initializer.initial_samples_from_model(
+            total_points=5, model=model, fitness_function=MockFitness()
+        )
+
+        assert sorted(round(parameters[0], 2) for parameters in initial_parameters) == [0.1, 0.12, 0.14, 0.16, 0.18]
+        assert all(10.0 <= parameters[index] <= 20.0 for parameters in initial_parameters)
@@ -0,0 +1,145 @@
+import json
+import os
+import pickle
+from os import path
+
+import numpy as np
+import pytest
+
+from autofit.non_linear.metrics import Metrics, prometheus_lines_from
+
+
+@pytest.fixture(name="metrics")
+def make_metrics(paths):
+    metrics = Metrics(enabled=True, interval=1.0e6)
+    metrics.start(paths=paths, number_of_cores=2)
+    yield metrics
+    metrics.stop()
+
+
+class TestMetrics:
+    def test__disabled__evaluations_not_counted(self, paths):
+
+        metrics = Metrics(enabled=False)
+        metrics.start(paths=paths)
+
+        metrics.add_evaluation(log_likelihood=1.0, elapsed=0.1)
+        metrics.stop()
+
+        assert metrics.evaluations == 0
+        assert not path.exists(path.join(paths.output_path, "metrics.prom"))
+
+    def test__snapshot_sums_counters_of_processes(self, metrics):
+
+        metrics.add_evaluation(log_likelihood=1.0, elapsed=0.5)
+        metrics.add_evaluation(log_likelihood=3.0, elapsed=0.5)
+
+        with open(path.join(metrics.metrics_path, "1.json"), "w") as f:
+            json.dump({"evaluations": 10, "busy": 2.0, "max_log_likelihood": 2.0, "memory": 100}, f)
+
+        snapshot = metrics.snapshot()
+
+        assert snapshot["evaluations"] == 12
+        assert snapshot["busy"] == pytest.approx(3.0)
+        assert snapshot["max_log_likelihood"] == 3.0
+        assert snapshot["processes"] == 2
+        assert snapshot["memory_bytes"] > 100
+
+        metrics.add_evaluation(log_likelihood=0.0, elapsed=0.0)
+        metrics._previous_snapshot["time"] -= 2.0
+
+        snapshot = metrics.snapshot()
+
+        assert snapshot["evaluation_rate"] == pytest.approx(0.5, rel=1.0e-2)
+        assert snapshot["core_utilisation"] == pytest.approx(0.0)
+
+    def test__prometheus_format(self, metrics, paths):
+
+        metrics.add_evaluation(log_likelihood=-2.0, elapsed=0.1)
+        metrics.set_progress(acceptance_ratio=0.25)
+
+        metrics.output()
+
+        with open(path.join(paths.output_path, "metrics.prom")) as f:
+            lines = f.read().splitlines()
+
+        assert "# TYPE autofit_evaluations_total counter" in lines
+        assert 'autofit_evaluations_total{search="search"} 1.0' in lines
+        assert 'autofit_max_log_likelihood{search="search"} -2.0' in lines
+        assert 'autofit_acceptance_ratio{search="search"} 0.25' in lines
+
+    def test__ndjson_format__lines_appended_and_non_finite_values_null(self, paths):
+
+        metrics = Metrics(enabled=True, interval=1.0e6, format="ndjson")
+        metrics.start(paths=paths)
+
+        metrics.output()
+        metrics.add_evaluation(log_likelihood=-2.0, elapsed=0.1)
+        metrics.stop()
+
+        with open(path.join(paths.output_path, "metrics.ndjson")) as f:
+            snapshots = [json.loads(line) for line in f]
+
+        assert [snapshot["evaluations"] for snapshot in snapshots] == [0, 1]
+        assert snapshots[0]["max_log_likelihood"] is None
+        assert snapshots[1]["search"] == "search"
+
+    def test__prometheus_lines__non_finite_values(self):
+
+        lines = prometheus_lines_from(snapshot={"max_log_likelihood": -np.inf, "dlogz": np.nan}, name="search")
+
+        assert 'autofit_max_log_likelihood{search="search"} -Inf' in lines
+        assert 'autofit_dlogz{search="search"} NaN' in lines
+
+        lines = prometheus_lines_from(snapshot={"information_gain": np.inf}, name="inference_financial")
+
+        assert 'autofit_information_gain{search="inference_financial"} +Inf' in lines
+
+    def test__prometheus_lines__busy_exported_as_counter(self):
+
+        lines = prometheus_lines_from(snapshot={"busy": 2.5}, name="search")
+
+        assert "# TYPE autofit_busy_total counter" in lines
+        assert 'autofit_busy_total{search="search"} 2.5' in lines
+
+    def test__unpickled_copies_share_metrics_of_process(self, metrics):
+
+        assert pickle.loads(pickle.dumps(metrics)) is metrics
+
+        disabled = pickle.loads(pickle.dumps(Metrics(enabled=False, interval=3.0)))
+
+        assert disabled.enabled is False
+        assert disabled.interval == 3.0
+
+    def test__worker_outputs_counters__forked_copy_discards_counters_of_parent(self, metrics):
+
+        worker = Metrics(enabled=True, interval=0.0)
+        worker.metrics_path = metrics.metrics_path
+
+        worker.add_evaluation(log_likelihood=1.0, elapsed=0.1)
+        worker.pid = -1
+        worker.add_evaluation(log_likelihood=0.0, elapsed=0.1)
+
+        with open(path.join(metrics.metrics_path, f"{os.getpid()}.json")) as f:
+            counters = json.load(f)
+
+        assert counters["evaluations"] == 1
+        assert counters["max_log_likelihood"] == 0.0
+
+
+def test__search_outputs_metrics(search, gaussian_model, analysis):
+
+    search.metrics = Metrics(enabled=True, interval=0.01)
+
+    search.fit(model=gaussian_model, analysis=analysis)
+
+    search.paths.restore()
+
+    with open(path.join(search.paths.output_path, "metrics.prom")) as f:
+        lines = f.read().splitlines()
+
+    evaluations = [line for line in lines if line.startswith("autofit_evaluations_total")]
+
+    assert float(evaluations[0].split()[-1]) >= 100
+    assert any(line.startswith("autofit_core_utilisation") for line in lines)
+    assert search.metrics._thread is None
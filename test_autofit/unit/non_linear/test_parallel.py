@@ -0,0 +1,333 @@
+import multiprocessing
+import os
+import pickle
+import threading
+import time
+from os import path
+
+import numpy as np
+import pytest
+
+from autofit import exc
+from autofit.non_linear.parallel import AbstractJob, AbstractJobResult, FileJobQueue, Process, Shared, shared_value
+from autofit.non_linear.per_process import registry
+
+
+class JobResult(AbstractJobResult):
+    def __init__(self, number, pid):
+        super().__init__(number)
+        self.pid = pid
+
+
+class Job(AbstractJob):
+    def perform(self):
+        return JobResult(self.number, os.getpid())
+
+
+class PoolJob(AbstractJob):
+    def perform(self):
+        with multiprocessing.Pool(processes=1) as pool:
+            return JobResult(self.number, pool.apply(os.getpid))
+
+
+class ExceptionJob(AbstractJob):
+    def perform(self):
+        raise ValueError("job failed")
+
+
+class CrashJob(AbstractJob):
+    def __init__(self, marker, crashes):
+        """
+        A job which stops its process the first *crashes* times it is performed.
+        """
+        super().__init__()
+        self.marker = marker
+        self.crashes = crashes
+
+    def perform(self):
+
+        attempts = len(os.listdir(self.marker))
+
+        if attempts < self.crashes:
+            open(path.join(self.marker, str(attempts)), "w").close()
+            os._exit(1)
+
+        return JobResult(self.number, os.getpid())
+
+
+class IndexJob(AbstractJob):
+    def __init__(self, index, marker, duration=0.0, fail=False):
+        """
+        A job of a job queue, which records every time it is performed in the folder *marker*.
+        """
+        super().__init__()
+        self.index = index
+        self.marker = marker
+        self.duration = duration
+        self.fail = fail
+
+    def perform(self):
+
+        open(path.join(self.marker, f"{self.index}.{os.getpid()}"), "w").close()
+
+        time.sleep(self.duration)
+
+        if self.fail:
+            raise ValueError("job failed")
+
+        result = JobResult(self.number, os.getpid())
+        result.index = self.index
+        return result
+
+
+class SharedJob(AbstractJob):
+    def __init__(self, data):
+        super().__init__()
+        self.data = data
+
+    def perform(self):
+        result = JobResult(self.number, os.getpid())
+        result.data_id = id(shared_value(self.data))
+        result.total = shared_value(self.data).sum()
+        return result
+
+
+def test__shared_object_sent_once_per_process():
+
+    with Shared(np.arange(1000000)) as data:
+
+        assert len(pickle.dumps(SharedJob(data))) < 1000
+
+        results = list(Process.run_jobs([SharedJob(data) for _ in range(10)], number_of_cores=2))
+
+        assert SharedJob(data).perform().total == data.value.sum()
+
+    assert data.key not in registry("Shared")
+
+    assert all(result.total == 499999500000 for result in results)
+
+    data_ids = {}
+
+    for result in results:
+        data_ids.setdefault(result.pid, set()).add(result.data_id)
+
+    assert all(len(ids) == 1 for ids in data_ids.values())
+
+
+def test__shared_object_not_sent__exception_raised():
+
+    data = Shared([1, 2, 3])
+    job = pickle.dumps(SharedJob(data))
+    data.close()
+
+    with pytest.raises(exc.GridSearchException, match="was not sent to this process"):
+        pickle.loads(job)
+
+
+def test__all_jobs_completed_on_every_core():
+
+    jobs = [Job() for _ in range(20)]
+
+    results = list(Process.run_jobs(jobs, number_of_cores=2))
+
+    assert sorted(result.number for result in results) == sorted(job.number for job in jobs)
+    assert os.getpid() not in {result.pid for result in results}
+
+
+def test__jobs_may_start_processes():
+
+    results = list(Process.run_jobs([PoolJob(), PoolJob()], number_of_cores=2))
+
+    assert len(results) == 2
+
+
+def test__jobs_taken_as_processes_become_free():
+
+    taken = []
+
+    def jobs():
+        for _ in range(20):
+            job = Job()
+            taken.append(job)
+            yield job
+
+    results = Process.run_jobs(jobs(), number_of_cores=2, jobs_per_process=2)
+
+    next(results)
+
+    assert len(taken) <= 5
+
+    assert len(list(results)) == 19
+
+
+def test__exception_of_job_raised():
+
+    with pytest.raises(exc.GridSearchException, match="job failed"):
+        list(Process.run_jobs([Job(), ExceptionJob(), Job()], number_of_cores=2))
+
+
+def test__job_of_stopped_process_sent_again(tmp_path):
+
+    job = CrashJob(marker=str(tmp_path), crashes=1)
+
+    results = list(Process.run_jobs([job, Job(), Job()], number_of_cores=2))
+
+    assert len(results) == 3
+    assert job.number in [result.number for result in results]
+
+
+def test__job_of_stopped_process_not_sent_again_beyond_max_retries(tmp_path):
+
+    with pytest.raises(exc.GridSearchException, match="stopped 2 times"):
+        list(Process.run_jobs([CrashJob(marker=str(tmp_path), crashes=2)], number_of_cores=1, max_retries=1))
+
+
+def index_jobs(marker, number_of_jobs, duration=0.0):
+    return [IndexJob(index=index, marker=marker, duration=duration) for index in range(number_of_jobs)]
+
+
+def run_node(directory, marker, number_of_jobs, duration):
+    queue = FileJobQueue(directory=directory, poll_interval=0.01)
+    list(queue.run_jobs(index_jobs(marker, number_of_jobs, duration)))
+
+
+@pytest.fixture(name="marker")
+def make_marker(tmp_path):
+    marker = tmp_path / "marker"
+    marker.mkdir()
+    return str(marker)
+
+
+class TestFileJobQueue:
+    def test__nodes_share_jobs__every_node_collects_every_result(self, tmp_path, marker):
+
+        directory = str(tmp_path / "queue")
+
+        nodes = [
+            multiprocessing.Process(target=run_node, args=(directory, marker, 20, 0.05)) for _ in range(2)
+        ]
+
+        for node in nodes:
+            node.start()
+
+        queue = FileJobQueue(directory=directory, poll_interval=0.01)
+        results = list(queue.run_jobs(index_jobs(marker, 20, 0.05)))
+
+        for node in nodes:
+            node.join()
+
+        assert sorted(result.index for result in results) == list(range(20))
+        assert all(node.exitcode == 0 for node in nodes)
+
+        performed = os.listdir(marker)
+
+        assert sorted(int(name.split(".")[0]) for name in performed) == list(range(20))
+        assert len({name.split(".")[1] for name in performed}) > 1
+
+        assert os.listdir(path.join(directory, "jobs", "leases")) == []
+
+    def test__job_leased_by_other_node_collected(self, tmp_path, marker):
+
+        queue = FileJobQueue(directory=str(tmp_path), poll_interval=0.01)
+        queue_path = path.join(str(tmp_path), "jobs")
+
+        os.makedirs(path.join(queue_path, "leases"))
+        open(queue.lease_filename(queue_path, 0), "w").close()
+
+        other = FileJobQueue(directory=str(tmp_path))
+
+        result = JobResult(number=-1, pid=-1)
+        result.index = 0
+
+        timer = threading.Timer(0.2, other.complete, kwargs=dict(queue_path=queue_path, index=0, result=result))
+        timer.start()
+
+        results = list(queue.run_jobs(index_jobs(marker, 2)))
+
+        timer.join()
+
+        assert [result.pid for result in results] == [os.getpid(), -1]
+        assert os.listdir(marker) == [f"1.{os.getpid()}"]
+
+    def test__expired_lease_claimed(self, tmp_path, marker):
+
+        queue = FileJobQueue(directory=str(tmp_path), lease_time=1.0, heartbeat_interval=0.1)
+        queue_path = path.join(str(tmp_path), "jobs")
+
+        os.makedirs(path.join(queue_path, "leases"))
+
+        lease = queue.lease_filename(queue_path, 0)
+        open(lease, "w").close()
+        os.utime(lease, (time.time() - 10.0, time.time() - 10.0))
+
+        results = list(queue.run_jobs(index_jobs(marker, 1)))
+
+        assert [result.index for result in results] == [0]
+        assert not path.exists(lease)
+
+    def test__heartbeat_keeps_lease_of_long_job(self, tmp_path, marker):
+
+        directory = str(tmp_path / "queue")
+
+        queue = FileJobQueue(directory=directory, lease_time=0.3, heartbeat_interval=0.05, poll_interval=0.01)
+        other = FileJobQueue(directory=directory, lease_time=0.3, heartbeat_interval=0.05, poll_interval=0.01)
+
+        thread = threading.Thread(target=lambda: list(queue.run_jobs(index_jobs(marker, 1, duration=1.0))))
+        thread.start()
+
+        time.sleep(0.1)
+
+        results = list(other.run_jobs(index_jobs(marker, 1)))
+
+        thread.join()
+
+        assert len(results) == 1
+        assert len(os.listdir(marker)) == 1
+
+    def test__exception_of_job_on_multiple_cores_raised_on_every_node(self, tmp_path, marker):
+
+        directory = str(tmp_path)
+
+        with pytest.raises(exc.GridSearchException, match="job failed"):
+            list(
+                FileJobQueue(directory=directory, poll_interval=0.01).run_jobs(
+                    [IndexJob(index=0, marker=marker, fail=True)], number_of_cores=2
+                )
+            )
+
+        assert os.listdir(path.join(directory, "jobs", "errors")) == ["0.txt"]
+
+        with pytest.raises(exc.GridSearchException, match="job failed"):
+            list(FileJobQueue(directory=directory).run_jobs([IndexJob(index=0, marker=marker)], number_of_cores=2))
+
+        assert len(os.listdir(marker)) == 1
+
+    def test__dependent_jobs_performed_by_one_set_of_processes(self, tmp_path, marker):
+
+        results = []
+
+        def dependent_jobs():
+            for index in range(6):
+                while len(results) < index:
+                    yield None
+                yield IndexJob(index=index, marker=marker)
+
+        queue = FileJobQueue(directory=str(tmp_path), poll_interval=0.01)
+
+        for result in queue.run_jobs(dependent_jobs(), number_of_cores=2):
+            results.append(result)
+
+        assert sorted(result.index for result in results) == list(range(6))
+        assert len({result.pid for result in results}) <= 2
+
+    def test__exception_of_job_raised_on_every_node(self, tmp_path, marker):
+
+        directory = str(tmp_path)
+
+        with pytest.raises(exc.GridSearchException, match="job failed"):
+            list(FileJobQueue(directory=directory).run_jobs([IndexJob(index=0, marker=marker, fail=True)]))
+
+        with pytest.raises(exc.GridSearchException, match="job failed"):
+            list(FileJobQueue(directory=directory).run_jobs([IndexJob(index=0, marker=marker)]))
+
+        assert len(os.listdir(marker)) == 1
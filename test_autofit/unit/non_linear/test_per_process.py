@@ -0,0 +1,61 @@
+import pickle
+
+from autofit.non_linear.per_process import PerProcess, registry
+
+
+class Component(PerProcess):
+    def __init__(self, size=1):
+        self.size = size
+        self.path = None
+        self.unpickled = 0
+
+    @property
+    def settings(self) -> dict:
+        return {"size": self.size}
+
+    @property
+    def process_attributes(self) -> dict:
+        return {"path": self.path}
+
+    def unpickled_in_process(self):
+        self.unpickled += 1
+
+
+class TestPerProcess:
+    def test__registered__unpickled_to_instance_of_process(self):
+
+        component = Component()
+        component.register()
+
+        assert pickle.loads(pickle.dumps(component)) is component
+        assert component.unpickled == 1
+
+        component.unregister()
+
+        assert component.run_id not in registry(Component.__name__)
+
+    def test__not_registered__created_from_settings_and_attributes(self):
+
+        component = Component(size=3)
+        component.register()
+        component.path = "path"
+
+        data = pickle.dumps(component)
+
+        component.unregister()
+
+        unpickled = pickle.loads(data)
+
+        assert unpickled is not component
+        assert (unpickled.size, unpickled.path, unpickled.run_id) == (3, "path", component.run_id)
+        assert pickle.loads(data) is unpickled
+
+        unpickled.unregister()
+
+    def test__no_run_id__new_instance_every_time(self):
+
+        component = Component()
+
+        data = pickle.dumps(component)
+
+        assert pickle.loads(data) is not pickle.loads(data)
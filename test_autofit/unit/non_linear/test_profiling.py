@@ -0,0 +1,146 @@
+import json
+import os
+import pickle
+import time
+from os import path
+
+import pytest
+
+from autofit.non_linear import profiling
+from autofit.non_linear.profiling import Profiler, profile_table_from_summary
+
+
+@pytest.fixture(name="profiler")
+def make_profiler(paths):
+    profiler = Profiler(enabled=True)
+    profiler.start(paths=paths)
+    yield profiler
+    profiler.stop()
+
+
+class TestProfiler:
+    def test__disabled__sections_not_timed(self, paths):
+
+        profiler = Profiler(enabled=False)
+        profiler.start(paths=paths)
+
+        with profiling.section("outer"):
+            pass
+
+        assert profiler.sections == {}
+        assert not path.exists(path.join(paths.samples_path, "profile"))
+
+    def test__nested_sections__self_time_excludes_inner_sections(self, profiler):
+
+        for _ in range(3):
+            with profiling.section("outer"):
+                with profiling.section("inner"):
+                    time.sleep(0.01)
+
+        outer = profiler.sections["outer"]
+        inner = profiler.sections["inner"]
+
+        assert outer.count == 3
+        assert inner.count == 3
+        assert outer.total >= inner.total >= 0.03
+        assert outer.self_total == pytest.approx(outer.total - inner.total)
+        assert profiler.busy == pytest.approx(outer.total)
+        assert profiler.top_level_sections == 3
+
+    def test__histogram_buckets_powers_of_two_microseconds(self):
+
+        timing = profiling.SectionTiming()
+
+        timing.add(elapsed=3.0e-6, self_elapsed=3.0e-6)
+        timing.add(elapsed=1.5e-3, self_elapsed=1.0e-3)
+        timing.add(elapsed=1.0e6, self_elapsed=1.0e6)
+
+        assert timing.histogram[2] == 1
+        assert timing.histogram[11] == 1
+        assert timing.histogram[-1] == 1
+        assert timing.minimum == 3.0e-6
+        assert timing.maximum == 1.0e6
+
+    def test__summary_sums_timings_of_processes(self, profiler):
+
+        with profiling.section("log_likelihood_function"):
+            pass
+
+        with open(path.join(profiler.profile_path, "0.json"), "w") as f:
+            json.dump(
+                {
+                    "busy": 2.0,
+                    "sections": {
+                        "log_likelihood_function": {
+                            "count": 10,
+                            "total": 2.0,
+                            "self_total": 2.0,
+                            "minimum": 0.1,
+                            "maximum": 0.5,
+                            "histogram": [1] * profiling.total_buckets,
+                        }
+                    },
+                },
+                f,
+            )
+
+        summary = profiler.summary(session_time=3.0, number_of_cores=2)
+
+        timing = summary["sections"]["log_likelihood_function"]
+
+        assert summary["processes"] == 2
+        assert timing["count"] == 11
+        assert timing["total"] == pytest.approx(2.0 + profiler.sections["log_likelihood_function"].total)
+        assert timing["maximum"] == 0.5
+        assert sum(timing["histogram"]) == profiling.total_buckets + 1
+        assert summary["pool_ipc_and_idle"] == pytest.approx(4.0)
+
+        table = profile_table_from_summary(summary=summary)
+
+        assert table[1].startswith("log_likelihood_function")
+        assert "Processes = 2" in table
+        assert "Pool IPC And Idle Time = 4.0000" in table
+
+    def test__unpickled_copies_share_profiler_of_process(self, profiler):
+
+        assert pickle.loads(pickle.dumps(profiler)) is profiler
+
+        disabled = pickle.loads(pickle.dumps(Profiler(enabled=False)))
+
+        assert disabled.enabled is False
+
+        profiler.stop()
+
+        with profiling.section("outer"):
+            pass
+
+        assert "outer" not in profiler.sections
+
+        assert pickle.loads(pickle.dumps(profiler)) is profiler
+
+        with profiling.section("outer"):
+            pass
+
+        assert profiler.sections["outer"].count == 1
+
+
+def test__search_outputs_profile(search, gaussian_model, analysis):
+
+    search.profiler = Profiler(enabled=True)
+
+    search.fit(model=gaussian_model, analysis=analysis)
+
+    search.paths.restore()
+
+    with open(path.join(search.paths.output_path, "profile.json")) as f:
+        summary = json.load(f)
+
+    assert summary["processes"] == 1
+    assert summary["sections"]["log_likelihood_function"]["count"] >= 100
+    assert summary["sections"]["instance_from_vector"]["count"] >= 100
+    assert summary["sections"]["log_priors"]["count"] >= 10
+    assert summary["sections"]["perform_update"]["count"] >= 1
+    assert summary["sections"]["model_results"]["count"] >= 1
+
+    assert path.exists(path.join(search.paths.output_path, "profile.summary"))
+    assert os.listdir(path.join(search.paths.samples_path, "profile")) == [f"{os.getpid()}.json"]
@@ -0,0 +1,170 @@
+import json
+import pickle
+from os import path
+
+import numpy as np
+import pytest
+
+import autofit as af
+from autofit import exc
+from autofit.non_linear.surrogate import Surrogate
+
+
+def quadratic(parameters):
+    return -0.5 * np.sum(np.asarray(parameters) ** 2)
+
+
+@pytest.fixture(name="surrogate")
+def make_surrogate(paths):
+    surrogate = Surrogate(
+        enabled=True, min_samples=50, neighbours=20, sigma=3.0, log_likelihood_offset=5.0, calibration_interval=5
+    )
+    surrogate.start(paths=paths)
+    return surrogate
+
+
+class TestSurrogate:
+    def test__disabled__every_point_evaluated(self):
+
+        surrogate = Surrogate(enabled=False)
+
+        for parameters in np.random.uniform(-5.0, 5.0, size=(200, 2)):
+            assert surrogate.log_likelihood_from(
+                parameters=parameters, log_likelihood_function=quadratic
+            ) == quadratic(parameters)
+
+        assert surrogate.evaluations == 200
+        assert surrogate.skipped == 0
+        assert surrogate.log_likelihoods == []
+
+    def test__prediction_interpolates_history(self, surrogate):
+
+        np.random.seed(1)
+
+        for parameters in np.random.uniform(-5.0, 5.0, size=(200, 2)):
+            surrogate.evaluate(parameters=parameters, log_likelihood_function=quadratic)
+
+        mean, error = surrogate.prediction_from(parameters=[1.0, -2.0])
+
+        assert mean == pytest.approx(-2.5, abs=0.1)
+        assert np.abs(mean + 2.5) < 3.0 * error + 0.1
+
+    def test__skips_confidently_low_points_and_calibrates(self, surrogate):
+
+        np.random.seed(1)
+
+        points = np.random.uniform(-5.0, 5.0, size=(400, 2))
+
+        skipped = []
+
+        for parameters in points:
+            try:
+                log_likelihood = surrogate.log_likelihood_from(
+                    parameters=parameters, log_likelihood_function=quadratic
+                )
+            except exc.FitException:
+                skipped.append(parameters)
+                continue
+
+            assert log_likelihood == quadratic(parameters)
+
+        assert len(skipped) == surrogate.skipped > 0
+        assert surrogate.evaluations + surrogate.skipped == 400
+        assert surrogate.calibrations > 0
+        assert surrogate.misses == 0
+        assert surrogate.is_active is True
+
+        threshold = np.max(surrogate.log_likelihoods) - surrogate.log_likelihood_offset
+
+        for parameters in skipped:
+            assert quadratic(parameters) < threshold
+
+    def test__mispredicting_surrogate_is_disabled(self, surrogate):
+
+        np.random.seed(1)
+
+        for parameters in np.random.uniform(-5.0, 5.0, size=(100, 2)):
+            surrogate.evaluate(parameters=parameters, log_likelihood_function=quadratic)
+
+        for parameters in np.random.uniform(-5.0, 5.0, size=(500, 2)):
+            try:
+                surrogate.log_likelihood_from(parameters=parameters, log_likelihood_function=lambda _: 0.0)
+            except exc.FitException:
+                pass
+
+        assert surrogate.calibrations == surrogate.min_calibrations
+        assert surrogate.misses == surrogate.min_calibrations
+        assert surrogate.is_active is False
+
+    def test__summary_sums_counters_of_processes(self, surrogate):
+
+        for parameters in np.random.uniform(-5.0, 5.0, size=(200, 2)):
+            try:
+                surrogate.log_likelihood_from(parameters=parameters, log_likelihood_function=quadratic)
+            except exc.FitException:
+                pass
+
+        with open(path.join(surrogate.surrogate_path, "0.json"), "w") as f:
+            json.dump({"evaluations": 10, "skipped": 5, "calibrations": 1, "misses": 0, "disabled": True}, f)
+
+        summary = surrogate.output_summary(filename=path.join(surrogate.surrogate_path, "..", "surrogate.json"))
+
+        assert summary["evaluations"] == surrogate.evaluations + 10
+        assert summary["skipped"] == surrogate.skipped + 5
+        assert summary["disabled_processes"] == 1
+        assert summary["fraction_saved"] == pytest.approx(summary["skipped"] / 215)
+
+    def test__unpickled_copies_share_surrogate_of_process(self, surrogate):
+
+        surrogate.evaluate(parameters=[1.0, 1.0], log_likelihood_function=quadratic)
+
+        assert pickle.loads(pickle.dumps(surrogate)) is surrogate
+
+        never_started = pickle.loads(pickle.dumps(Surrogate(enabled=True, sigma=2.0)))
+
+        assert never_started.sigma == 2.0
+        assert never_started is not pickle.loads(pickle.dumps(never_started))
+
+
+def test__search_with_surrogate(gaussian_model, analysis):
+
+    np.random.seed(1)
+
+    search = af.PySwarmsGlobal(
+        paths=af.Paths(name="surrogate"), n_particles=20, iters=30, iterations_per_update=10
+    )
+    search.surrogate = Surrogate(enabled=True, min_samples=50)
+
+    search.fit(model=gaussian_model, analysis=analysis)
+
+    search.paths.restore()
+
+    with open(path.join(search.paths.samples_path, "surrogate.json")) as f:
+        summary = json.load(f)
+
+    assert summary["skipped"] > 0
+    assert summary["evaluations"] + summary["skipped"] == 620
+
+
+def test__surrogate_values_never_in_samples(gaussian_model, analysis):
+
+    np.random.seed(1)
+
+    search = af.DynestyStatic(
+        paths=af.Paths(name="surrogate_samples"), n_live_points=20, evidence_tolerance=0.01,
+        iterations_per_update=5000
+    )
+    search.surrogate = Surrogate(enabled=True, min_samples=20, log_likelihood_offset=1.0)
+
+    result = search.fit(model=gaussian_model, analysis=analysis)
+
+    search.paths.restore()
+
+    with open(path.join(search.paths.samples_path, "surrogate.json")) as f:
+        assert json.load(f)["skipped"] > 0
+
+    samples = result.samples
+
+    for parameters, log_likelihood in zip(samples.parameters, samples.log_likelihoods):
+        instance = gaussian_model.instance_from_vector(vector=parameters)
+        assert log_likelihood == pytest.approx(analysis.log_likelihood_function(instance=instance))
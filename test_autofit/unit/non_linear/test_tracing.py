@@ -0,0 +1,205 @@
+import json
+import os
+import pickle
+from os import path
+
+import pytest
+
+import autofit as af
+from autofit.mock import mock
+from autofit.mock.mock import MockAnalysis, MockPaths
+from autofit.non_linear import tracing
+from autofit.non_linear.tracing import Tracer
+
+
+@pytest.fixture(name="tracer")
+def make_tracer(paths):
+    tracer = Tracer(enabled=True, buffer_size=5, max_events=20, flush_interval=1.0e6)
+    tracer.start(paths=paths)
+    yield tracer
+    tracer.stop()
+
+
+def trace_events_from(filename):
+    with open(filename) as f:
+        return json.load(f)["traceEvents"]
+
+
+class TestTracer:
+    def test__disabled__spans_not_recorded(self, paths):
+
+        tracer = Tracer(enabled=False)
+        tracer.start(paths=paths)
+
+        with tracing.span("search"):
+            pass
+
+        assert tracer.events == []
+        assert not path.exists(path.join(paths.samples_path, "trace"))
+
+    def test__spans_buffered_and_appended_to_process_file(self, tracer):
+
+        for index in range(7):
+            with tracing.span("sampler", iterations=index):
+                pass
+
+        with open(path.join(tracer.trace_path, f"{os.getpid()}.ndjson")) as f:
+            events = [json.loads(line) for line in f]
+
+        assert [event["args"]["iterations"] for event in events] == [0, 1, 2, 3, 4]
+        assert len(tracer.events) == 2
+
+        event = events[0]
+
+        assert event["name"] == "sampler"
+        assert event["cat"] == "search"
+        assert event["ph"] == "X"
+        assert event["pid"] == os.getpid()
+        assert event["dur"] >= 0.0
+
+    def test__events_beyond_max_events_dropped(self, tracer):
+
+        for _ in range(25):
+            with tracing.span("sampler"):
+                pass
+
+        assert tracer.recorded == 20
+        assert tracer.dropped == 5
+
+    def test__output_merges_processes_and_skips_partial_lines(self, tracer, tmp_path):
+
+        with tracing.span("perform_update"):
+            pass
+
+        with open(path.join(tracer.trace_path, "1.ndjson"), "w") as f:
+            f.write(json.dumps({"name": "log_likelihood_from_parameters", "ph": "X", "pid": 1, "ts": 0, "dur": 1}))
+            f.write("\n")
+            f.write('{"name": "log_lik')
+
+        tracer.output(output_path=str(tmp_path))
+
+        events = trace_events_from(path.join(str(tmp_path), "trace.json"))
+
+        assert [event["name"] for event in events] == [
+            "process_name", "log_likelihood_from_parameters", "process_name", "perform_update"
+        ]
+        assert events[0]["args"]["name"] == "worker 1"
+        assert events[2]["args"]["name"] == "main"
+
+    def test__sections_recorded_as_spans(self, tracer):
+
+        from autofit.non_linear import profiling
+
+        with profiling.section("log_likelihood_function"):
+            pass
+
+        assert tracer.events[0]["name"] == "log_likelihood_function"
+        assert tracer.events[0]["cat"] == "section"
+
+    def test__unpickled_copies_share_tracer_of_process(self, tracer):
+
+        assert pickle.loads(pickle.dumps(tracer)) is tracer
+
+        disabled = pickle.loads(pickle.dumps(Tracer(enabled=False, buffer_size=3)))
+
+        assert disabled.enabled is False
+        assert disabled.buffer_size == 3
+
+    def test__forked_copy_discards_events_of_parent(self, tracer):
+
+        with tracing.span("search"):
+            pass
+
+        tracer.pid = -1
+
+        with tracing.span("job"):
+            pass
+
+        assert [event["name"] for event in tracer.events] == ["job"]
+
+    def test__stop_restores_previous_tracer(self, tracer, tmp_path):
+
+        inner = Tracer(enabled=True)
+        inner.start(paths=MockPaths(samples_path=str(tmp_path / "inner")))
+
+        with tracing.span("search"):
+            pass
+
+        inner.stop()
+
+        with tracing.span("job"):
+            pass
+
+        with open(path.join(inner.trace_path, f"{os.getpid()}.ndjson")) as f:
+            assert [json.loads(line)["name"] for line in f] == ["search"]
+
+        assert inner.run_id is None
+        assert [event["name"] for event in tracer.events] == ["job"]
+
+
+def test__search_outputs_trace(search, gaussian_model, analysis):
+
+    search.tracer = Tracer(enabled=True)
+
+    search.fit(model=gaussian_model, analysis=analysis)
+
+    search.paths.restore()
+
+    events = trace_events_from(path.join(search.paths.output_path, "trace.json"))
+
+    names = [event["name"] for event in events]
+
+    assert names.count("sampler") == 2
+    assert names.count("log_likelihood_from_parameters") >= 100
+    assert names.count("save_samples") >= 2
+    assert "search" in names
+    assert "perform_update" in names
+
+    search_event = events[names.index("search")]
+
+    assert search_event["args"]["resumed"] is False
+    assert search_event["args"]["name_of_search"] == "search"
+
+
+def test__search_on_multiple_cores__trace_includes_workers(search, gaussian_model, analysis):
+
+    search.number_of_cores = 2
+    search.tracer = Tracer(enabled=True)
+
+    search.fit(model=gaussian_model, analysis=analysis)
+
+    search.paths.restore()
+
+    events = trace_events_from(path.join(search.paths.output_path, "trace.json"))
+
+    worker_pids = {
+        event["pid"] for event in events if event["name"] == "log_likelihood_from_parameters"
+    } - {os.getpid()}
+
+    assert len(worker_pids) == 2
+
+
+def test__grid_search_traces_jobs():
+
+    model = af.ModelMapper()
+    model.component = mock.MockClassx2Tuple
+
+    grid_search = af.SearchGridSearch(
+        search=af.MockSearch(fit_fast=False), number_of_steps=2, paths=af.Paths(name="grid_tracing")
+    )
+    grid_search.tracer = Tracer(enabled=True)
+
+    grid_search.fit(
+        model=model,
+        analysis=MockAnalysis(),
+        grid_priors=[model.component.one_tuple.one_tuple_0],
+    )
+
+    events = trace_events_from(path.join(grid_search.paths.output_path, "trace.json"))
+
+    names = [event["name"] for event in events]
+
+    assert names.count("grid_search") == 1
+    assert names.count("job") == 2
+    assert names.count("search") == 2
+    assert names.count("zip_remove") == 2
@@ -0,0 +1,163 @@
+import json
+import pickle
+import threading
+import time
+
+import pytest
+
+from autofit.non_linear.update import BackgroundUpdate, UpdateScheduler
+
+
+class TestBackgroundUpdate:
+    def test__update_performed_on_background_thread(self):
+
+        threads = []
+
+        background_update = BackgroundUpdate()
+        background_update.submit(lambda: threads.append(threading.current_thread()))
+        background_update.wait()
+
+        assert len(threads) == 1
+        assert threads[0] is not threading.current_thread()
+        assert background_update.in_flight is False
+
+    def test__at_most_one_update_in_flight(self):
+
+        release = threading.Event()
+        order = []
+
+        def first():
+            release.wait()
+            order.append("first")
+
+        background_update = BackgroundUpdate()
+        background_update.submit(first)
+
+        assert background_update.in_flight is True
+
+        release.set()
+        background_update.submit(lambda: order.append("second"))
+        background_update.wait()
+
+        assert order == ["first", "second"]
+
+    def test__exception_reraised_on_wait(self):
+
+        def fail():
+            raise ValueError("update failed")
+
+        background_update = BackgroundUpdate()
+        background_update.submit(fail)
+
+        with pytest.raises(ValueError):
+            background_update.wait()
+
+        background_update.wait()
+
+    def test__pickle(self):
+
+        background_update = BackgroundUpdate()
+        background_update.submit(lambda: None)
+
+        background_update = pickle.loads(pickle.dumps(background_update))
+
+        assert background_update.in_flight is False
+
+    def test__background_time_measured_on_background_thread(self):
+
+        background_update = BackgroundUpdate()
+        background_update.submit(lambda: time.sleep(0.2))
+
+        while background_update.in_flight:
+            time.sleep(0.01)
+
+        background_update.wait()
+
+        # The update took 0.2 seconds on the background thread, none of which was spent waiting for it.
+
+        assert background_update.background_time >= 0.19
+
+        background_update.wait()
+
+        assert background_update.background_time == 0.0
+
+
+class TestUpdateScheduler:
+    def test__inactive_for_non_positive_time_fraction(self):
+
+        assert UpdateScheduler(time_fraction=-1.0).is_active is False
+        assert UpdateScheduler(time_fraction=0.05).is_active is True
+
+    def test__iterations_chosen_to_match_time_fraction(self, monkeypatch):
+
+        times = iter([0.0, 10.0])
+
+        monkeypatch.setattr("autofit.non_linear.update.time.time", lambda: next(times))
+
+        update_scheduler = UpdateScheduler(time_fraction=0.5)
+        update_scheduler.start()
+
+        # 100 iterations in 8 seconds then a 2 second update -> sampling for 2 seconds gives 25 iterations.
+
+        next_iterations = update_scheduler.iterations_for_next_update(
+            iterations=100, update_start_time=8.0
+        )
+
+        assert next_iterations == 25
+        assert update_scheduler.schedule[0]["iterations_per_second"] == pytest.approx(12.5)
+        assert update_scheduler.schedule[0]["update_time"] == pytest.approx(2.0)
+
+    def test__background_time_included_in_update_time(self, monkeypatch):
+
+        times = iter([0.0, 10.0])
+
+        monkeypatch.setattr("autofit.non_linear.update.time.time", lambda: next(times))
+
+        update_scheduler = UpdateScheduler(time_fraction=0.5)
+        update_scheduler.start()
+
+        # 100 iterations in 8 seconds then a 2 second update plus 2 seconds on the background thread -> sampling for
+        # 4 seconds gives 50 iterations.
+
+        next_iterations = update_scheduler.iterations_for_next_update(
+            iterations=100, update_start_time=8.0, background_time=2.0
+        )
+
+        assert next_iterations == 50
+        assert update_scheduler.schedule[0]["update_time"] == pytest.approx(4.0)
+
+    def test__change_in_iterations_is_clamped(self, monkeypatch):
+
+        times = iter([0.0, 1.0, 101.0])
+
+        monkeypatch.setattr("autofit.non_linear.update.time.time", lambda: next(times))
+
+        update_scheduler = UpdateScheduler(time_fraction=0.5, max_change=2.0)
+        update_scheduler.start()
+
+        # A fast update after slow sampling would reduce the iterations to 1, but this is clamped to half.
+
+        assert update_scheduler.iterations_for_next_update(
+            iterations=100, update_start_time=1.0
+        ) == 50
+
+        # A slow update after fast sampling would increase the iterations by 100x, but this is clamped to double.
+
+        assert update_scheduler.iterations_for_next_update(
+            iterations=50, update_start_time=2.0
+        ) == 100
+
+    def test__output_to_json(self, tmp_path):
+
+        update_scheduler = UpdateScheduler(time_fraction=0.1)
+        update_scheduler.start()
+        update_scheduler.iterations_for_next_update(iterations=10, update_start_time=time.time())
+
+        filename = tmp_path / "update_schedule.json"
+        update_scheduler.output_to_json(filename=str(filename))
+
+        with open(filename) as infile:
+            schedule = json.load(infile)
+
+        assert schedule["time_fraction"] == 0.1
+        assert len(schedule["schedule"]) == 1